@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+Measure the import time of the package with ``python -X importtime``.
+Each statement is executed in a fresh interpreter, and the best of the repeats is reported.
+
+Usage:
+    python benchmark/bench_import.py [NUM_REPEATS]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import re
+import subprocess
+import sys
+
+
+STATEMENTS = (
+    "import simplesqlite",
+    "import simplesqlite.query",
+    "from simplesqlite import SimpleSQLite",
+    "from simplesqlite import connect_memdb; connect_memdb().fetch_table_names()",
+)
+DEPENDENCIES = (
+    "six",
+    "pathvalidate",
+    "mbstrdecoder",
+    "typepy",
+    "dataproperty",
+    "tabledata",
+    "sqliteschema",
+    "logbook",
+)
+RE_IMPORT_TIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+
+def measure(statement):
+    """
+    :return:
+        Pair of the total import time of the statement [usec], and
+        a mapping of module names to their cumulative import time [usec].
+    :rtype: tuple
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+        + [path for path in [env.get("PYTHONPATH")] if path]
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    _, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode("utf-8"))
+
+    total_time = 0
+    cumulative_times = {}
+    for line in stderr.decode("utf-8").splitlines():
+        match = RE_IMPORT_TIME.search(line)
+        if match is None:
+            continue
+
+        cumulative_time = int(match.group(2))
+        cumulative_times[match.group(4)] = cumulative_time
+        if len(match.group(3)) == 1:
+            # top-level import
+            total_time += cumulative_time
+
+    return (total_time, cumulative_times)
+
+
+def main():
+    num_repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # imports of the interpreter startup (site, encodings, etc.)
+    baseline_time = min(measure("pass")[0] for _ in range(num_repeats))
+
+    for statement in STATEMENTS:
+        total_time, cumulative_times = min(measure(statement) for _ in range(num_repeats))
+
+        print(statement)
+        print("  total: {:.1f} [msec]".format((total_time - baseline_time) / 1000.0))
+        for module_name in DEPENDENCIES:
+            if module_name not in cumulative_times:
+                continue
+
+            print(
+                "  {}: {:.1f} [msec]".format(module_name, cumulative_times[module_name] / 1000.0)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+Measure the overhead of debug logging while the logger is disabled (default).
+
+Usage:
+    python benchmark/bench_logging.py [NUM_ROWS]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+
+from simplesqlite import connect_memdb
+from simplesqlite._logger import logger
+from tabledata import TableData
+
+
+def make_table_data(num_rows):
+    return TableData(
+        "bench",
+        ["attr_a", "attr_b", "attr_c"],
+        [[i, "value{:d}".format(i), i * 0.1] for i in range(num_rows)],
+    )
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    num_calls = 100000
+    table_data = make_table_data(num_rows)
+
+    eager_time = timeit.timeit(lambda: "tbldata={}".format(table_data), number=1)
+    lazy_time = timeit.timeit(lambda: logger.debug("tbldata={}", table_data), number=num_calls)
+    noop_time = timeit.timeit(lambda: None, number=num_calls)
+
+    def create_table():
+        con = connect_memdb()
+        con.create_table_from_tabledata(table_data)
+        con.close()
+
+    create_time = timeit.timeit(create_table, number=1)
+
+    print("rows: {:d}".format(num_rows))
+    print("eager formatting of the table data (per call): {:.6f} [sec]".format(eager_time))
+    print(
+        "disabled logger.debug with deferred arguments (per call): {:.9f} [sec]".format(
+            (lazy_time - noop_time) / num_calls
+        )
+    )
+    print("create_table_from_tabledata: {:.6f} [sec]".format(create_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+Measure the time to build SELECT/INSERT queries for a wide table.
+
+Usage:
+    python benchmark/bench_query.py [NUM_COLUMNS]
+"""
+
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+
+from simplesqlite.query import AttrList, Insert, Select
+
+
+def main():
+    num_columns = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    num_calls = 1000
+    columns = ["attr {:d}".format(i) for i in range(num_columns)]
+
+    def build_select():
+        return Select(AttrList(columns), "bench table").to_query()
+
+    def build_insert():
+        return Insert("bench table", AttrList(columns)).to_query()
+
+    # load the dependencies that deferred until the first query build
+    Select(AttrList(["warmup"]), "warmup").to_query()
+
+    # the first calls render/validate every name, the following calls hit the caches
+    first_select_time = timeit.timeit(build_select, number=1)
+    first_insert_time = timeit.timeit(build_insert, number=1)
+    select_time = timeit.timeit(build_select, number=num_calls)
+    insert_time = timeit.timeit(build_insert, number=num_calls)
+
+    print("columns: {:d}".format(num_columns))
+    print("SELECT (first call): {:.6f} [sec]".format(first_select_time))
+    print("INSERT (first call): {:.6f} [sec]".format(first_insert_time))
+    print("SELECT (per call): {:.6f} [sec]".format(select_time / num_calls))
+    print("INSERT (per call): {:.6f} [sec]".format(insert_time / num_calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,19 +6,86 @@
 
 from __future__ import absolute_import
 
-import simplesqlite.query
+import sys
 
 from .__version__ import __author__, __copyright__, __email__, __license__, __version__
-from ._func import append_table, copy_table
-from ._logger import set_log_level, set_logger
-from ._sanitizer import SQLiteTableDataSanitizer
-from .core import SQLITE_SYSTEM_TABLES, SimpleSQLite, connect_memdb
-from .error import (
-    AttributeNotFoundError,
-    DatabaseError,
-    NameValidationError,
-    NullDatabaseConnectionError,
-    OperationalError,
-    SqlSyntaxError,
-    TableNotFoundError,
-)
+
+
+# attribute name -> module that provides the attribute.
+# modules are imported at the first access to one of the attributes,
+# so that importing the package does not load the heavy dependencies
+# (typepy, tabledata, sqliteschema, etc.).
+_LAZY_ATTRS = {
+    "append_table": "._func",
+    "copy_table": "._func",
+    "set_log_level": "._logger",
+    "set_logger": "._logger",
+    "SQLiteTableDataSanitizer": "._sanitizer",
+    "SQLITE_SYSTEM_TABLES": "sqliteschema",
+    "SimpleSQLite": ".core",
+    "connect_memdb": ".core",
+    "AttributeNotFoundError": ".error",
+    "DatabaseError": ".error",
+    "NameValidationError": ".error",
+    "NullDatabaseConnectionError": ".error",
+    "OperationalError": ".error",
+    "PoolTimeoutError": ".error",
+    "SqlSyntaxError": ".error",
+    "TableNotFoundError": ".error",
+    "PartitionedTable": ".partition",
+    "SimpleSQLitePool": ".pool",
+    "ShardedSimpleSQLite": ".shard",
+    "WriterService": ".writer",
+}
+
+__all__ = sorted(_LAZY_ATTRS)
+
+
+if sys.version_info >= (3, 7):
+    import importlib
+
+    def __getattr__(name):
+        try:
+            module_name = _LAZY_ATTRS[name]
+        except KeyError:
+            # submodules. e.g. simplesqlite.query
+            submodule_name = "{}.{}".format(__name__, name)
+            try:
+                return importlib.import_module(submodule_name)
+            except ModuleNotFoundError as e:
+                if e.name != submodule_name:
+                    raise
+
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+        value = getattr(importlib.import_module(module_name, __name__), name)
+        globals()[name] = value
+
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+else:
+    import simplesqlite.query
+    from sqliteschema import SQLITE_SYSTEM_TABLES
+
+    from ._func import append_table, copy_table
+    from ._logger import set_log_level, set_logger
+    from ._sanitizer import SQLiteTableDataSanitizer
+    from .core import SimpleSQLite, connect_memdb
+    from .error import (
+        AttributeNotFoundError,
+        DatabaseError,
+        NameValidationError,
+        NullDatabaseConnectionError,
+        OperationalError,
+        PoolTimeoutError,
+        SqlSyntaxError,
+        TableNotFoundError,
+    )
+    from .partition import PartitionedTable
+    from .pool import SimpleSQLitePool
+    from .shard import ShardedSimpleSQLite
+    from .writer import WriterService
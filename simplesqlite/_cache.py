@@ -0,0 +1,264 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+
+class SchemaCache(object):
+    """
+    Cache of table names and attribute names of a database.
+    An instance can be shared among multiple connections to the same database.
+    Cached values are discarded when the ``schema_version`` of the database changed.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.__lock:
+            self.__schema_version = None
+            self.__table_names = {}
+            self.__attr_names = {}
+
+    def fetch_table_names(self, con, include_system_table=False):
+        schema_version = self.__sync(con)
+        key = bool(include_system_table)
+
+        with self.__lock:
+            table_names = self.__table_names.get(key)
+
+        if table_names is None:
+            table_names = con.schema_extractor.fetch_table_names(include_system_table)
+
+            with self.__lock:
+                if schema_version == self.__schema_version:
+                    self.__table_names[key] = table_names
+
+        return list(table_names)
+
+    def fetch_attr_names(self, con, table_name):
+        schema_version = self.__sync(con)
+
+        with self.__lock:
+            attr_names = self.__attr_names.get(table_name)
+
+        if attr_names is None:
+            attr_names = con.schema_extractor.fetch_table_schema(table_name).get_attr_names()
+
+            with self.__lock:
+                if schema_version == self.__schema_version:
+                    self.__attr_names[table_name] = attr_names
+
+        return list(attr_names)
+
+    def __sync(self, con):
+        schema_version = con.connection.execute("PRAGMA schema_version").fetchone()[0]
+
+        with self.__lock:
+            if schema_version != self.__schema_version:
+                self.__schema_version = schema_version
+                self.__table_names = {}
+                self.__attr_names = {}
+
+        return schema_version
+
+
+class ResultCache(object):
+    """
+    LRU cache of query results that bounded by the number of entries and
+    time-to-live of each entry.
+
+    Entries are discarded when :py:meth:`.validate` is called with a token
+    that differs from the previous one. The token represents the state of
+    the database. e.g. total changes of the connection.
+    """
+
+    @property
+    def info(self):
+        with self.__lock:
+            return CacheInfo(
+                hits=self.__hits,
+                misses=self.__misses,
+                maxsize=self.__maxsize,
+                currsize=len(self.__entries),
+            )
+
+    def __init__(self, maxsize=128, ttl=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be greater than zero: actual={}".format(maxsize))
+
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()  # key -> (value, stored time)
+        self.__token = None
+        self.__hits = 0
+        self.__misses = 0
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def validate(self, token):
+        with self.__lock:
+            if token != self.__token:
+                self.__entries.clear()
+                self.__token = token
+
+    def get(self, key):
+        """
+        :return: Pair of a boolean that indicates cache hit or not, and the cached value.
+        :rtype: tuple
+        """
+
+        with self.__lock:
+            try:
+                value, stored_time = self.__entries[key]
+            except KeyError:
+                self.__misses += 1
+                return (False, None)
+
+            if self.__ttl is not None and time.time() - stored_time > self.__ttl:
+                del self.__entries[key]
+                self.__misses += 1
+                return (False, None)
+
+            # move to the end as the most recently used entry
+            del self.__entries[key]
+            self.__entries[key] = (value, stored_time)
+            self.__hits += 1
+
+            return (True, value)
+
+    def set(self, key, value):
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = (value, time.time())
+
+            while len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+
+
+class IdentifierCache(object):
+    """
+    Cache of values that derived from identifiers (table/attribute names).
+    e.g. names rendered for SQLite queries, and results of name validations.
+
+    The number of entries is bounded by ``maxsize``: all of the entries are discarded
+    when the cache is full, since the number of distinct names that
+    an application uses is usually small.
+    Lookups are lock-free to keep query building cheap.
+    """
+
+    @property
+    def maxsize(self):
+        return self.__maxsize
+
+    def __init__(self, maxsize=4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be greater than zero: actual={}".format(maxsize))
+
+        self.__maxsize = maxsize
+        self.__entries = {}
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        self.__entries.clear()
+
+    def get(self, key, default=None):
+        return self.__entries.get(key, default)
+
+    def set(self, key, value):
+        if len(self.__entries) >= self.__maxsize:
+            self.__entries.clear()
+
+        self.__entries[key] = value
+
+
+StatementCacheStats = namedtuple(
+    "StatementCacheStats",
+    "cached_statements executions hits misses hit_rate window_size max_distinct_per_window",
+)
+
+
+class StatementCacheProfiler(object):
+    """
+    Estimate reuse of the statement cache of a |sqlite3| connection,
+    which caches compiled statements keyed by SQL texts in LRU order.
+
+    Executed SQL texts are replayed on an LRU cache of the same size to estimate
+    hits and misses. In addition, distinct SQL texts are counted in each window of
+    ``window_size`` executions: windows with more distinct texts than
+    ``cached_statements`` indicate that the cache is too small for the query mix.
+    """
+
+    @property
+    def stats(self):
+        with self.__lock:
+            executions = self.__hits + self.__misses
+
+            return StatementCacheStats(
+                cached_statements=self.__cached_statements,
+                executions=executions,
+                hits=self.__hits,
+                misses=self.__misses,
+                hit_rate=(float(self.__hits) / executions) if executions else None,
+                window_size=self.__window_size,
+                max_distinct_per_window=max(
+                    self.__max_distinct_per_window, len(self.__window_queries)
+                ),
+            )
+
+    def __init__(self, cached_statements, window_size=1000):
+        if window_size < 1:
+            raise ValueError("window_size must be greater than zero: actual={}".format(window_size))
+
+        self.__cached_statements = cached_statements
+        self.__window_size = window_size
+
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__window_queries = set()
+        self.__window_count = 0
+        self.__max_distinct_per_window = 0
+
+    def record(self, query):
+        with self.__lock:
+            if query in self.__entries:
+                del self.__entries[query]
+                self.__entries[query] = None
+                self.__hits += 1
+            else:
+                self.__misses += 1
+
+                if self.__cached_statements > 0:
+                    self.__entries[query] = None
+
+                    while len(self.__entries) > self.__cached_statements:
+                        self.__entries.popitem(last=False)
+
+            self.__window_queries.add(query)
+            self.__window_count += 1
+
+            if self.__window_count >= self.__window_size:
+                self.__max_distinct_per_window = max(
+                    self.__max_distinct_per_window, len(self.__window_queries)
+                )
+                self.__window_queries = set()
+                self.__window_count = 0
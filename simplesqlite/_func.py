@@ -6,8 +6,10 @@
 
 from __future__ import absolute_import, unicode_literals
 
+from decimal import Decimal, InvalidOperation
 from textwrap import dedent
 
+import six
 from pathvalidate import (
     InvalidCharError,
     InvalidReservedNameError,
@@ -15,10 +17,80 @@ from pathvalidate import (
     ValidReservedNameError,
 )
 
-from ._common import extract_table_metadata
 from ._logger import logger
 from ._validator import validate_sqlite_attr_name, validate_sqlite_table_name
-from .error import NameValidationError
+
+
+def is_null_string(value):
+    """
+    Same as ``typepy.is_null_string``, without importing :py:mod:`typepy`.
+    """
+
+    if value is None:
+        return True
+
+    try:
+        return len(value.strip()) == 0
+    except AttributeError:
+        return False
+
+
+def is_not_null_string(value):
+    """
+    Same as ``typepy.is_not_null_string``, without importing :py:mod:`typepy`.
+    """
+
+    try:
+        return len(value.strip()) > 0
+    except AttributeError:
+        return False
+
+
+def is_empty_sequence(value):
+    """
+    Same as ``typepy.is_empty_sequence``, without importing :py:mod:`typepy`.
+    """
+
+    try:
+        return value is None or len(value) == 0
+    except TypeError:
+        return False
+
+
+def is_not_empty_sequence(value):
+    """
+    Same as ``typepy.is_not_empty_sequence``, without importing :py:mod:`typepy`.
+    """
+
+    try:
+        return len(value) > 0
+    except TypeError:
+        return False
+
+
+def is_number(value):
+    """
+    :return:
+        |True| if the value is a finite number or a string of a finite number:
+        same as ``typepy.Integer(value).is_type() or typepy.RealNumber(value).is_type()``.
+    :rtype: bool
+    """
+
+    if isinstance(value, bool):
+        return False
+
+    if isinstance(value, six.integer_types):
+        return True
+
+    if isinstance(value, (float, Decimal, six.text_type)):
+        try:
+            return Decimal(value).is_finite()
+        except (InvalidOperation, ValueError):
+            return False
+
+    import typepy
+
+    return typepy.Integer(value).is_type() or typepy.RealNumber(value).is_type()
 
 
 def validate_table_name(name):
@@ -30,8 +102,12 @@ def validate_table_name(name):
     try:
         validate_sqlite_table_name(name)
     except (InvalidCharError, InvalidReservedNameError) as e:
+        from .error import NameValidationError
+
         raise NameValidationError(e)
     except NullNameError:
+        from .error import NameValidationError
+
         raise NameValidationError("table name is empty")
     except ValidReservedNameError:
         pass
@@ -46,8 +122,12 @@ def validate_attr_name(name):
     try:
         validate_sqlite_attr_name(name)
     except (InvalidCharError, InvalidReservedNameError) as e:
+        from .error import NameValidationError
+
         raise NameValidationError(e)
     except NullNameError:
+        from .error import NameValidationError
+
         raise NameValidationError("attribute name is empty")
 
 
@@ -67,12 +147,11 @@ def append_table(src_con, dst_con, table_name):
     """
 
     logger.debug(
-        "append table: src={src_db}.{src_tbl}, dst={dst_db}.{dst_tbl}".format(
-            src_db=src_con.database_path,
-            src_tbl=table_name,
-            dst_db=dst_con.database_path,
-            dst_tbl=table_name,
-        )
+        "append table: src={src_db}.{src_tbl}, dst={dst_db}.{dst_tbl}",
+        src_db=src_con.database_path,
+        src_tbl=table_name,
+        dst_db=dst_con.database_path,
+        dst_tbl=table_name,
     )
 
     src_con.verify_table_existence(table_name)
@@ -94,6 +173,8 @@ def append_table(src_con, dst_con, table_name):
                 )
             )
 
+    from ._common import extract_table_metadata
+
     primary_key, index_attrs, type_hints = extract_table_metadata(src_con, table_name)
 
     dst_con.create_table_from_tabledata(
@@ -123,12 +204,11 @@ def copy_table(src_con, dst_con, src_table_name, dst_table_name, is_overwrite=Tr
     """
 
     logger.debug(
-        "copy table: src={src_db}.{src_tbl}, dst={dst_db}.{dst_tbl}".format(
-            src_db=src_con.database_path,
-            src_tbl=src_table_name,
-            dst_db=dst_con.database_path,
-            dst_tbl=dst_table_name,
-        )
+        "copy table: src={src_db}.{src_tbl}, dst={dst_db}.{dst_tbl}",
+        src_db=src_con.database_path,
+        src_tbl=src_table_name,
+        dst_db=dst_con.database_path,
+        dst_tbl=dst_table_name,
     )
 
     src_con.verify_table_existence(src_table_name)
@@ -140,10 +220,14 @@ def copy_table(src_con, dst_con, src_table_name, dst_table_name, is_overwrite=Tr
         else:
             logger.error(
                 "failed to copy table: the table already exists "
-                "(src_table={}, dst_table={})".format(src_table_name, dst_table_name)
+                "(src_table={}, dst_table={})",
+                src_table_name,
+                dst_table_name,
             )
             return False
 
+    from ._common import extract_table_metadata
+
     primary_key, index_attrs, _ = extract_table_metadata(src_con, src_table_name)
 
     result = src_con.select(select="*", table_name=src_table_name)
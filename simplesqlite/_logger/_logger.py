@@ -6,9 +6,6 @@
 
 from __future__ import absolute_import, unicode_literals
 
-import sqliteschema
-import tabledata
-
 from ._null_logger import NullLogger
 
 
@@ -46,6 +43,9 @@ def set_logger(is_enable):
     else:
         _disable_logger(logger)
 
+    import sqliteschema
+    import tabledata
+
     tabledata.set_logger(is_enable)
     sqliteschema.set_logger(is_enable)
     try:
@@ -82,6 +82,9 @@ def set_log_level(log_level):
     else:
         set_logger(is_enable=True)
 
+    import sqliteschema
+    import tabledata
+
     logger.level = log_level
     tabledata.set_log_level(log_level)
     sqliteschema.set_log_level(log_level)
@@ -0,0 +1,49 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+
+Page = namedtuple("Page", "records cursor")
+
+
+def encode_page_cursor(table_name, key_columns, key_values):
+    try:
+        serialized = json.dumps(
+            {"table": table_name, "keys": list(key_columns), "values": list(key_values)},
+            separators=(",", ":"),
+        )
+    except TypeError as e:
+        raise ValueError("key values of a page cursor must be JSON serializable: {}".format(e))
+
+    return base64.urlsafe_b64encode(serialized.encode("utf-8")).decode("ascii")
+
+
+def decode_page_cursor(cursor, table_name, key_columns):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        cursor_table_name = data["table"]
+        cursor_key_columns = data["keys"]
+        key_values = data["values"]
+    except (AttributeError, TypeError, KeyError, UnicodeError, binascii.Error, ValueError):
+        raise ValueError("invalid page cursor: {}".format(cursor))
+
+    if cursor_table_name != table_name or cursor_key_columns != list(key_columns):
+        raise ValueError(
+            "page cursor mismatch: expected table={}, keys={}, actual table={}, keys={}".format(
+                table_name, list(key_columns), cursor_table_name, cursor_key_columns
+            )
+        )
+
+    if len(key_values) != len(key_columns):
+        raise ValueError("invalid page cursor: {}".format(cursor))
+
+    return key_values
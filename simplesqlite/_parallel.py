@@ -0,0 +1,329 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import six
+
+from .query import Attr, Table
+
+
+# read-only connections opened in a worker process: database path -> SimpleSQLite
+_worker_connections = {}
+
+
+def get_default_workers():
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def fetch_key_ranges(con, table_name, key, where, workers, chunk_size):
+    """
+    Split records of a table into contiguous ranges of an integer ``key`` column,
+    so that each range has ``chunk_size`` records
+    (more than that if the ``key`` values are duplicated at the bounds).
+    Bounds of the ranges are found by skipping ``chunk_size`` records in the order of
+    the ``key`` with ``LIMIT/OFFSET`` queries, which seek by an index of the ``key``
+    (e.g. ``rowid``/``INTEGER PRIMARY KEY``) if exists:
+    the ranges are balanced even if the ``key`` values are sparse or skewed.
+
+    :return: List of pairs of the lower and upper bounds of ranges (inclusive).
+    :rtype: list
+    """
+
+    def make_query(select, condition=None, extra=""):
+        conditions = [condition for condition in (condition, where) if condition]
+        query = "SELECT {} FROM {}".format(select, Table(table_name))
+        if conditions:
+            query += " WHERE {}".format(" AND ".join(["({})".format(cond) for cond in conditions]))
+
+        return query + extra
+
+    attr = Attr(key)
+    min_key, max_key, num_records = con.execute_query(
+        make_query("MIN({key}),MAX({key}),COUNT({key})".format(key=attr))
+    ).fetchone()
+    if min_key is None:
+        return []
+
+    for value in (min_key, max_key):
+        if not isinstance(value, six.integer_types):
+            raise ValueError(
+                "partition key must be an integer column: key={}, value={}".format(key, value)
+            )
+
+    if chunk_size is None:
+        # a few chunks per worker to balance loads among workers
+        num_chunks = workers * 4
+        chunk_size = max(1, -(-num_records // num_chunks))
+    elif chunk_size < 1:
+        raise ValueError("chunk_size must be greater than zero: actual={}".format(chunk_size))
+
+    upper_query = make_query(
+        attr, "{} >= ?".format(attr), " ORDER BY {} LIMIT 1 OFFSET ?".format(attr)
+    )
+    lower_query = make_query("MIN({})".format(attr), "{} > ?".format(attr))
+
+    key_ranges = []
+    lower = min_key
+    while lower is not None:
+        row = con.execute_query(upper_query, params=[lower, chunk_size - 1]).fetchone()
+        upper = max_key if row is None else row[0]
+        key_ranges.append((lower, upper))
+
+        if upper == max_key:
+            break
+
+        lower = con.execute_query(lower_query, params=[upper]).fetchone()[0]
+
+    return key_ranges
+
+
+def run_in_processes(worker_func, tasks, workers):
+    """
+    :return: Iterator of the results of the ``worker_func`` in the order of the ``tasks``.
+    """
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(worker_func, tasks):
+            yield result
+
+
+def fetch_range(task):
+    database_path, query, params = task[:3]
+
+    return _get_worker_connection(database_path).execute_query(query, params=params).fetchall()
+
+
+def map_range(task):
+    func = task[3]
+
+    return func(fetch_range(task))
+
+
+def load_shard(task):
+    """
+    Create a table in a shard database file, and insert records into the table.
+
+    :return:
+        Pair of the (sanitized) table name and a list of pairs of the attribute names and
+        the attribute types of the shard table.
+        Types are |None| for attributes that have only NULL values in the shard.
+    :rtype: tuple
+    """
+
+    from .core import SimpleSQLite
+
+    shard_path, table_name, attr_names, records, dup_col_handler = task
+
+    # shard files are temporary: skip journaling and syncs to the disk
+    con = SimpleSQLite(shard_path, "w", delayed_connection=False, journal_mode="OFF")
+    try:
+        con.execute_query("PRAGMA synchronous=OFF")
+        con.dup_col_handler = dup_col_handler
+        con.create_table_from_data_matrix(table_name, attr_names, records)
+
+        shard_table_name = con.fetch_table_names()[0]
+        attr_types = [
+            (row[1], row[2])
+            for row in con.execute_query(
+                "PRAGMA table_info({})".format(Table(shard_table_name))
+            ).fetchall()
+        ]
+        counts = con.execute_query(
+            "SELECT {} FROM {}".format(
+                ",".join(["COUNT({})".format(Attr(name)) for name, _type in attr_types]),
+                Table(shard_table_name),
+            )
+        ).fetchone()
+    finally:
+        con.close()
+
+    return (
+        shard_table_name,
+        [
+            (name, attr_type if count else None)
+            for (name, attr_type), count in zip(attr_types, counts)
+        ],
+    )
+
+
+def merge_attr_types(shard_attr_types):
+    """
+    Merge attribute types of shard tables into the widest type of each attribute:
+    ``INTEGER`` < ``REAL`` < ``TEXT``.
+
+    :param list shard_attr_types: Return values of :py:func:`load_shard` for each shard.
+    :return: List of pairs of the attribute names and the merged attribute types.
+    :rtype: list
+    """
+
+    type_order = {"INTEGER": 0, "REAL": 1, "TEXT": 2}
+    attr_names = [name for name, _type in shard_attr_types[0]]
+    merged_types = [None] * len(attr_names)
+
+    for attr_types in shard_attr_types:
+        if [name for name, _type in attr_types] != attr_names:
+            raise ValueError(
+                "mismatch attributes of shards: expected={}, actual={}".format(
+                    attr_names, [name for name, _type in attr_types]
+                )
+            )
+
+        for i, (_name, attr_type) in enumerate(attr_types):
+            if attr_type is None:
+                continue
+
+            attr_type = attr_type if attr_type in type_order else "TEXT"
+            if merged_types[i] is None or type_order[attr_type] > type_order[merged_types[i]]:
+                merged_types[i] = attr_type
+
+    # attributes that have only NULL values are created as TEXT as well as a single process
+    return [(name, attr_type or "TEXT") for name, attr_type in zip(attr_names, merged_types)]
+
+
+def _get_worker_connection(database_path):
+    from .core import SimpleSQLite
+
+    con = _worker_connections.get(database_path)
+    if con is None:
+        con = SimpleSQLite(database_path, "r", delayed_connection=False)
+        _worker_connections[database_path] = con
+
+    return con
+
+
+class PartialAggregator(object):
+    """
+    Merge partial results of aggregate functions that computed for each partition.
+    Averages are computed from partial sums and counts.
+    """
+
+    __FUNCTIONS = ("sum", "count", "min", "max", "avg")
+
+    @property
+    def names(self):
+        return [name for name, _func, _num_columns in self.__specs]
+
+    @property
+    def partial_columns(self):
+        return self.__partial_columns
+
+    def __init__(self, aggregates):
+        self.__specs = []  # (name, function, number of partial columns)
+        self.__partial_columns = []
+        self.__groups = {}
+
+        for func, columns in six.iteritems(aggregates):
+            func = func.lower()
+            if func not in self.__FUNCTIONS:
+                raise ValueError(
+                    "unsupported aggregate function: expected={}, actual={}".format(
+                        self.__FUNCTIONS, func
+                    )
+                )
+
+            if isinstance(columns, six.string_types):
+                columns = [columns]
+
+            for column in columns:
+                column_query = column if column == "*" else Attr(column).to_query()
+
+                if func == "avg":
+                    self.__partial_columns.extend(
+                        ["SUM({:s})".format(column_query), "COUNT({:s})".format(column_query)]
+                    )
+                    self.__specs.append(("{:s}({:s})".format(func, column), func, 2))
+                else:
+                    self.__partial_columns.append("{:s}({:s})".format(func.upper(), column_query))
+                    self.__specs.append(("{:s}({:s})".format(func, column), func, 1))
+
+        if not self.__specs:
+            raise ValueError("aggregates must not be empty")
+
+    def merge(self, rows, num_group_columns):
+        for row in rows:
+            group = tuple(row[:num_group_columns])
+            partials = row[num_group_columns:]
+            merged = self.__groups.get(group)
+
+            if merged is None:
+                self.__groups[group] = list(partials)
+                continue
+
+            i = 0
+            for _name, func, num_columns in self.__specs:
+                if func in ("sum", "avg"):
+                    merged[i] = self.__add(merged[i], partials[i])
+                    if func == "avg":
+                        merged[i + 1] += partials[i + 1]
+                elif func == "count":
+                    merged[i] += partials[i]
+                elif partials[i] is not None:
+                    if merged[i] is None:
+                        merged[i] = partials[i]
+                    elif func == "min":
+                        merged[i] = min(merged[i], partials[i], key=self.__value_sort_key)
+                    else:
+                        merged[i] = max(merged[i], partials[i], key=self.__value_sort_key)
+
+                i += num_columns
+
+    def results(self):
+        """
+        :return: List of pairs of a group and the aggregated values, sorted by the groups.
+        :rtype: list
+        """
+
+        results = []
+
+        for group in sorted(self.__groups, key=self.__sort_key):
+            merged = self.__groups[group]
+            values = []
+            i = 0
+
+            for _name, func, num_columns in self.__specs:
+                if func == "avg":
+                    total, count = merged[i], merged[i + 1]
+                    values.append(float(total) / count if count else None)
+                else:
+                    values.append(merged[i])
+
+                i += num_columns
+
+            results.append((group, values))
+
+        return results
+
+    @staticmethod
+    def __add(x, y):
+        if x is None:
+            return y
+        if y is None:
+            return x
+
+        return x + y
+
+    @classmethod
+    def __sort_key(cls, group):
+        return tuple(cls.__value_sort_key(value) for value in group)
+
+    @staticmethod
+    def __value_sort_key(value):
+        # order of values by SQLite: NULL < numbers < texts < BLOBs
+        if value is None:
+            return (0, 0)
+        if isinstance(value, (six.integer_types, float)):
+            return (1, value)
+        if isinstance(value, six.text_type):
+            return (2, value)
+
+        return (3, value)
@@ -0,0 +1,100 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import random
+import re
+from collections import namedtuple
+
+
+RetryStats = namedtuple(
+    "RetryStats", "num_lock_errors num_retries num_failures lock_wait_time backoff_time"
+)
+
+
+class RetryPolicy(object):
+    """
+    Policy to retry statements that failed because the database was locked/busy
+    by other connections. Backoff time grows exponentially with the number of attempts.
+
+    :param int max_attempts: Maximum number of attempts, including the first one.
+    :param float initial_backoff: Seconds to wait before the first retry.
+    :param float max_backoff: Upper limit of the seconds to wait before a retry.
+    :param float backoff_multiplier: Growth rate of the backoff time per attempt.
+    :param bool jitter:
+        Randomize the backoff time between zero and the computed value (full jitter),
+        to avoid contending connections retrying in lockstep.
+    """
+
+    # SQLITE_BUSY and SQLITE_LOCKED (primary result codes)
+    __LOCK_ERROR_CODES = (5, 6)
+    __RE_LOCK_ERROR = re.compile(r"\b(locked|busy)\b", re.IGNORECASE)
+
+    @property
+    def max_attempts(self):
+        return self.__max_attempts
+
+    def __init__(
+        self,
+        max_attempts=5,
+        initial_backoff=0.01,
+        max_backoff=1.0,
+        backoff_multiplier=2.0,
+        jitter=True,
+    ):
+        if max_attempts < 1:
+            raise ValueError(
+                "max_attempts must be greater than zero: actual={}".format(max_attempts)
+            )
+        if initial_backoff < 0 or max_backoff < 0:
+            raise ValueError(
+                "backoff must be greater than or equal to zero: initial={}, max={}".format(
+                    initial_backoff, max_backoff
+                )
+            )
+        if backoff_multiplier < 1:
+            raise ValueError(
+                "backoff_multiplier must be greater than or equal to one: actual={}".format(
+                    backoff_multiplier
+                )
+            )
+
+        self.__max_attempts = max_attempts
+        self.__initial_backoff = initial_backoff
+        self.__max_backoff = max_backoff
+        self.__backoff_multiplier = backoff_multiplier
+        self.__jitter = jitter
+
+    @classmethod
+    def is_lock_error(cls, error):
+        """
+        :return: |True| if the ``error`` caused by a locked/busy database.
+        :rtype: bool
+        """
+
+        # sqlite_errorcode attribute is available since Python 3.11
+        error_code = getattr(error, "sqlite_errorcode", None)
+        if error_code is not None:
+            return (error_code & 0xFF) in cls.__LOCK_ERROR_CODES
+
+        return cls.__RE_LOCK_ERROR.search("{}".format(error)) is not None
+
+    def get_backoff(self, attempt):
+        """
+        :param int attempt: Number of attempts that failed so far.
+        :return: Seconds to wait before the next attempt.
+        :rtype: float
+        """
+
+        backoff = min(
+            self.__max_backoff, self.__initial_backoff * self.__backoff_multiplier ** (attempt - 1)
+        )
+
+        if self.__jitter:
+            return random.uniform(0, backoff)
+
+        return backoff
@@ -0,0 +1,86 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+
+class PreparedSelect(object):
+    """
+    SELECT statement that built once, and executed with parameters bound.
+    Instances are created by :py:meth:`simplesqlite.SimpleSQLite.prepare_select`.
+
+    The same query text is passed to |sqlite3| on every call, so that
+    the compiled statement is reused from the statement cache of the connection.
+    """
+
+    __slots__ = ("__query", "__execute")
+
+    @property
+    def query(self):
+        return self.__query
+
+    def __init__(self, query, execute):
+        self.__query = query
+        self.__execute = execute
+
+    def __repr__(self):
+        return "PreparedSelect(query={})".format(self.__query)
+
+    def __call__(self, *params, **named_params):
+        """
+        Execute the statement.
+
+        :param params: Values bound to the ``?`` placeholders of the statement.
+        :param named_params: Values bound to the ``:name`` placeholders of the statement.
+        :return: Result of the query execution.
+        :rtype: sqlite3.Cursor
+        :raises ValueError: If both of ``params`` and ``named_params`` are specified.
+        """
+
+        if named_params:
+            if params:
+                raise ValueError("positional and named parameters cannot be mixed")
+
+            return self.__execute(named_params)
+
+        return self.__execute(params)
+
+
+class PreparedInsert(object):
+    """
+    INSERT statement that built once, and executed with records bound.
+    Instances are created by :py:meth:`simplesqlite.SimpleSQLite.prepare_insert`.
+    """
+
+    __slots__ = ("__query", "__attr_names", "__execute")
+
+    @property
+    def query(self):
+        return self.__query
+
+    @property
+    def attr_names(self):
+        return self.__attr_names
+
+    def __init__(self, query, attr_names, execute):
+        self.__query = query
+        self.__attr_names = attr_names
+        self.__execute = execute
+
+    def __repr__(self):
+        return "PreparedInsert(query={})".format(self.__query)
+
+    def __call__(self, records):
+        """
+        Insert records.
+
+        :param records: Records to be inserted.
+        :type records: list of |dict|/|namedtuple|/|list|/|tuple|
+        :return: Number of inserted records.
+        :rtype: int
+        """
+
+        return self.__execute(records)
@@ -12,139 +12,145 @@ from pathvalidate.error import (
     ValidReservedNameError,
 )
 
-
-__SQLITE_VALID_RESERVED_KEYWORDS = [
-    "ABORT",
-    "ACTION",
-    "AFTER",
-    "ANALYZE",
-    "ASC",
-    "ATTACH",
-    "BEFORE",
-    "BEGIN",
-    "BY",
-    "CASCADE",
-    "CAST",
-    "COLUMN",
-    "CONFLICT",
-    "CROSS",
-    "CURRENT_DATE",
-    "CURRENT_TIME",
-    "CURRENT_TIMESTAMP",
-    "DATABASE",
-    "DEFERRED",
-    "DESC",
-    "DETACH",
-    "EACH",
-    "END",
-    "EXCLUSIVE",
-    "EXPLAIN",
-    "FAIL",
-    "FOR",
-    "FULL",
-    "GLOB",
-    "IGNORE",
-    "IMMEDIATE",
-    "INDEXED",
-    "INITIALLY",
-    "INNER",
-    "INSTEAD",
-    "KEY",
-    "LEFT",
-    "LIKE",
-    "MATCH",
-    "NATURAL",
-    "NO",
-    "OF",
-    "OFFSET",
-    "OUTER",
-    "PLAN",
-    "PRAGMA",
-    "QUERY",
-    "RAISE",
-    "RECURSIVE",
-    "REGEXP",
-    "REINDEX",
-    "RELEASE",
-    "RENAME",
-    "REPLACE",
-    "RESTRICT",
-    "RIGHT",
-    "ROLLBACK",
-    "ROW",
-    "SAVEPOINT",
-    "TEMP",
-    "TEMPORARY",
-    "TRIGGER",
-    "VACUUM",
-    "VIEW",
-    "VIRTUAL",
-    "WITH",
-    "WITHOUT",
-]
-__SQLITE_INVALID_RESERVED_KEYWORDS = [
-    "ADD",
-    "ALL",
-    "ALTER",
-    "AND",
-    "AS",
-    "AUTOINCREMENT",
-    "BETWEEN",
-    "CASE",
-    "CHECK",
-    "COLLATE",
-    "COMMIT",
-    "CONSTRAINT",
-    "CREATE",
-    "DEFAULT",
-    "DEFERRABLE",
-    "DELETE",
-    "DISTINCT",
-    "DROP",
-    "ELSE",
-    "ESCAPE",
-    "EXCEPT",
-    "EXISTS",
-    "FOREIGN",
-    "FROM",
-    "GROUP",
-    "HAVING",
-    "IN",
-    "INDEX",
-    "INSERT",
-    "INTERSECT",
-    "INTO",
-    "IS",
-    "ISNULL",
-    "JOIN",
-    "LIMIT",
-    "NOT",
-    "NOTNULL",
-    "NULL",
-    "ON",
-    "OR",
-    "ORDER",
-    "PRIMARY",
-    "REFERENCES",
-    "SELECT",
-    "SET",
-    "TABLE",
-    "THEN",
-    "TO",
-    "TRANSACTION",
-    "UNION",
-    "UNIQUE",
-    "UPDATE",
-    "USING",
-    "VALUES",
-    "WHEN",
-    "WHERE",
-]
+from ._cache import IdentifierCache
+
+
+__SQLITE_VALID_RESERVED_KEYWORDS = frozenset(
+    [
+        "ABORT",
+        "ACTION",
+        "AFTER",
+        "ANALYZE",
+        "ASC",
+        "ATTACH",
+        "BEFORE",
+        "BEGIN",
+        "BY",
+        "CASCADE",
+        "CAST",
+        "COLUMN",
+        "CONFLICT",
+        "CROSS",
+        "CURRENT_DATE",
+        "CURRENT_TIME",
+        "CURRENT_TIMESTAMP",
+        "DATABASE",
+        "DEFERRED",
+        "DESC",
+        "DETACH",
+        "EACH",
+        "END",
+        "EXCLUSIVE",
+        "EXPLAIN",
+        "FAIL",
+        "FOR",
+        "FULL",
+        "GLOB",
+        "IGNORE",
+        "IMMEDIATE",
+        "INDEXED",
+        "INITIALLY",
+        "INNER",
+        "INSTEAD",
+        "KEY",
+        "LEFT",
+        "LIKE",
+        "MATCH",
+        "NATURAL",
+        "NO",
+        "OF",
+        "OFFSET",
+        "OUTER",
+        "PLAN",
+        "PRAGMA",
+        "QUERY",
+        "RAISE",
+        "RECURSIVE",
+        "REGEXP",
+        "REINDEX",
+        "RELEASE",
+        "RENAME",
+        "REPLACE",
+        "RESTRICT",
+        "RIGHT",
+        "ROLLBACK",
+        "ROW",
+        "SAVEPOINT",
+        "TEMP",
+        "TEMPORARY",
+        "TRIGGER",
+        "VACUUM",
+        "VIEW",
+        "VIRTUAL",
+        "WITH",
+        "WITHOUT",
+    ]
+)
+__SQLITE_INVALID_RESERVED_KEYWORDS = frozenset(
+    [
+        "ADD",
+        "ALL",
+        "ALTER",
+        "AND",
+        "AS",
+        "AUTOINCREMENT",
+        "BETWEEN",
+        "CASE",
+        "CHECK",
+        "COLLATE",
+        "COMMIT",
+        "CONSTRAINT",
+        "CREATE",
+        "DEFAULT",
+        "DEFERRABLE",
+        "DELETE",
+        "DISTINCT",
+        "DROP",
+        "ELSE",
+        "ESCAPE",
+        "EXCEPT",
+        "EXISTS",
+        "FOREIGN",
+        "FROM",
+        "GROUP",
+        "HAVING",
+        "IN",
+        "INDEX",
+        "INSERT",
+        "INTERSECT",
+        "INTO",
+        "IS",
+        "ISNULL",
+        "JOIN",
+        "LIMIT",
+        "NOT",
+        "NOTNULL",
+        "NULL",
+        "ON",
+        "OR",
+        "ORDER",
+        "PRIMARY",
+        "REFERENCES",
+        "SELECT",
+        "SET",
+        "TABLE",
+        "THEN",
+        "TO",
+        "TRANSACTION",
+        "UNION",
+        "UNIQUE",
+        "UPDATE",
+        "USING",
+        "VALUES",
+        "WHEN",
+        "WHERE",
+    ]
+)
 
 __SQLITE_VALID_RESERVED_KEYWORDS_TABLE = __SQLITE_VALID_RESERVED_KEYWORDS
-__SQLITE_INVALID_RESERVED_KEYWORDS_TABLE = __SQLITE_INVALID_RESERVED_KEYWORDS + ["IF"]
+__SQLITE_INVALID_RESERVED_KEYWORDS_TABLE = __SQLITE_INVALID_RESERVED_KEYWORDS | frozenset(["IF"])
 
-__SQLITE_VALID_RESERVED_KEYWORDS_ATTR = __SQLITE_VALID_RESERVED_KEYWORDS + ["IF"]
+__SQLITE_VALID_RESERVED_KEYWORDS_ATTR = __SQLITE_VALID_RESERVED_KEYWORDS | frozenset(["IF"])
 __SQLITE_INVALID_RESERVED_KEYWORDS_ATTR = __SQLITE_INVALID_RESERVED_KEYWORDS
 
 __RE_INVALID_CHARS = re.compile(
@@ -152,6 +158,44 @@ __RE_INVALID_CHARS = re.compile(
 )
 
 
+# name -> (exception class, message) of the validation. ``None`` if the name is valid.
+__table_name_validation_cache = IdentifierCache()
+__attr_name_validation_cache = IdentifierCache()
+__NOT_CACHED = object()
+
+
+def __validate_name(name, cache, invalid_keywords, valid_keywords):
+    if not name:
+        raise NullNameError("null name")
+
+    result = cache.get(name, __NOT_CACHED)
+
+    if result is __NOT_CACHED:
+        result = None
+
+        if __RE_INVALID_CHARS.search(name):
+            result = (InvalidCharError, "unprintable character found")
+        else:
+            upper_name = name.upper()
+
+            if upper_name in invalid_keywords:
+                result = (
+                    InvalidReservedNameError,
+                    "'{}' is a reserved keyword by sqlite".format(upper_name),
+                )
+            elif upper_name in valid_keywords:
+                result = (
+                    ValidReservedNameError,
+                    "'{}' is a reserved keyword by sqlite".format(upper_name),
+                )
+
+        cache.set(name, result)
+
+    if result is not None:
+        error_class, message = result
+        raise error_class(message)
+
+
 def validate_sqlite_table_name(name):
     """
     :param str name: Name to validate.
@@ -166,19 +210,12 @@ def validate_sqlite_table_name(name):
         However, valid as a table name.
     """
 
-    if not name:
-        raise NullNameError("null name")
-
-    if __RE_INVALID_CHARS.search(name):
-        raise InvalidCharError("unprintable character found")
-
-    name = name.upper()
-
-    if name in __SQLITE_INVALID_RESERVED_KEYWORDS_TABLE:
-        raise InvalidReservedNameError("'{:s}' is a reserved keyword by sqlite".format(name))
-
-    if name in __SQLITE_VALID_RESERVED_KEYWORDS_TABLE:
-        raise ValidReservedNameError("'{:s}' is a reserved keyword by sqlite".format(name))
+    __validate_name(
+        name,
+        __table_name_validation_cache,
+        __SQLITE_INVALID_RESERVED_KEYWORDS_TABLE,
+        __SQLITE_VALID_RESERVED_KEYWORDS_TABLE,
+    )
 
 
 def validate_sqlite_attr_name(name):
@@ -195,16 +232,9 @@ def validate_sqlite_attr_name(name):
         However, valid as an attribute name.
     """
 
-    if not name:
-        raise NullNameError("null name")
-
-    if __RE_INVALID_CHARS.search(name):
-        raise InvalidCharError("unprintable character found")
-
-    name = name.upper()
-
-    if name in __SQLITE_INVALID_RESERVED_KEYWORDS_ATTR:
-        raise InvalidReservedNameError("'{}' is a reserved keyword by sqlite".format(name))
-
-    if name in __SQLITE_VALID_RESERVED_KEYWORDS_ATTR:
-        raise ValidReservedNameError("'{}' is a reserved keyword by sqlite".format(name))
+    __validate_name(
+        name,
+        __attr_name_validation_cache,
+        __SQLITE_INVALID_RESERVED_KEYWORDS_ATTR,
+        __SQLITE_VALID_RESERVED_KEYWORDS_ATTR,
+    )
@@ -0,0 +1,391 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import asyncio
+import functools
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ._logger import logger
+from .core import MEMORY_DB_NAME, SimpleSQLite
+
+
+_READ_METHODS = (
+    "fetch_attr_names",
+    "fetch_attr_type",
+    "fetch_data_types",
+    "fetch_num_records",
+    "fetch_sqlite_master",
+    "fetch_table_names",
+    "fetch_value",
+    "fetch_values",
+    "has_attr",
+    "has_attrs",
+    "has_table",
+    "select_as_dataframe",
+    "select_as_dict",
+    "select_as_tabledata",
+    "verify_attr_existence",
+    "verify_table_existence",
+)
+# options of SimpleSQLite constructor that are not available for read-only connections
+_WRITE_ONLY_OPTIONS = ("journal_mode",)
+
+# asyncio.get_running_loop is available since Python 3.7.
+# asyncio.get_event_loop returns the running loop when called from a coroutine.
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+_WRITE_METHODS = (
+    "commit",
+    "create_index",
+    "create_index_list",
+    "create_table",
+    "create_table_from_csv",
+    "create_table_from_data_matrix",
+    "create_table_from_dataframe",
+    "create_table_from_json",
+    "create_table_from_tabledata",
+    "delete_many",
+    "drop_table",
+    "insert",
+    "insert_many",
+    "rollback",
+    "update_many",
+    "upsert_many",
+)
+
+
+class _Worker(object):
+    """
+    A thread that owns a |SimpleSQLite| connection.
+    """
+
+    def __init__(self, database_path, mode, con_kwargs, name):
+        self.__database_path = database_path
+        self.__mode = mode
+        self.__con_kwargs = con_kwargs
+        self.__name = name
+
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.con = None
+
+    def call(self, func, *args, **kwargs):
+        # executed in the worker thread
+        if self.con is None:
+            threading.current_thread().name = self.__name
+            self.con = SimpleSQLite(
+                self.__database_path, self.__mode, delayed_connection=False, **self.__con_kwargs
+            )
+
+        return func(self.con, *args, **kwargs)
+
+    def interrupt(self):
+        # sqlite3.Connection.interrupt can be called from any thread
+        con = self.con
+        if con is not None and con.is_connected():
+            con.connection.interrupt()
+
+    def close(self):
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+
+class _RowIterator(object):
+    """
+    Asynchronous iterator of the result rows of a query, fetched by chunks
+    in the thread of a worker.
+    """
+
+    def __init__(self, get_worker, run, execute, chunk_size):
+        self.__get_worker = get_worker
+        self.__run = run
+        self.__execute = execute
+        self.__chunk_size = chunk_size
+
+        self.__worker = None
+        self.__cursor = None
+        self.__rows = deque()
+        self.__is_closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.__rows:
+            if self.__is_closed:
+                raise StopAsyncIteration
+
+            try:
+                rows = await self.__fetch_chunk()
+            except Exception:
+                await self.aclose()
+                raise
+
+            if not rows:
+                await self.aclose()
+                raise StopAsyncIteration
+
+            self.__rows.extend(rows)
+
+        return self.__rows.popleft()
+
+    async def aclose(self):
+        if self.__is_closed:
+            return
+
+        self.__is_closed = True
+        self.__rows.clear()
+
+        if self.__cursor is not None:
+            await _get_running_loop().run_in_executor(self.__worker.executor, self.__cursor.close)
+            self.__cursor = None
+
+    async def __fetch_chunk(self):
+        if self.__cursor is None:
+            self.__worker = await self.__get_worker()
+            self.__cursor = await self.__run(self.__worker, self.__execute)
+
+        cursor = self.__cursor
+        chunk_size = self.__chunk_size
+
+        return await self.__run(self.__worker, lambda _con: cursor.fetchmany(chunk_size))
+
+
+class AsyncSimpleSQLite(object):
+    """
+    asyncio front-end of |SimpleSQLite|.
+    Database operations are executed in dedicated connection threads,
+    so that they do not block the event loop.
+
+    Write operations are executed by a single writer connection.
+    Read operations are executed by a pool of read-only connections
+    if ``num_readers`` is greater than zero, otherwise by the writer connection.
+    Reader connections are suitable for a database in ``"wal"`` journal mode,
+    which allows reads to proceed concurrently with a write.
+    Options only for writable connections (e.g. ``journal_mode``) are applied to
+    the writer connection only.
+
+    Coroutine methods that have the same name as the methods of |SimpleSQLite|
+    accept the same arguments, e.g. :py:meth:`.insert_many`/:py:meth:`.select_as_dict`.
+    Methods that return a |Cursor| in |SimpleSQLite| return fetched rows or
+    the number of affected rows instead.
+
+    Cancelling an awaiting coroutine interrupts the query running on the connection.
+
+    :param str database_path: Path to the SQLite database file.
+    :param str mode: Open mode of the writer connection.
+    :param int num_readers: Number of read-only connections.
+    :param int chunk_size:
+        Default number of rows fetched at once by :py:meth:`.aselect`.
+    :param kwargs: Keyword arguments passed to |SimpleSQLite| constructor.
+
+    :Sample Code:
+        .. code:: python
+
+            import asyncio
+
+            from simplesqlite.aio import AsyncSimpleSQLite
+
+            async def main():
+                async with AsyncSimpleSQLite(
+                    "sample.sqlite", "a", num_readers=2, journal_mode="wal"
+                ) as con:
+                    await con.insert_many("sample_table", [[1, "a"], [2, "b"]])
+                    await con.commit()
+
+                    async for row in con.aselect("*", "sample_table"):
+                        print(row)
+
+            asyncio.get_event_loop().run_until_complete(main())
+    """
+
+    @property
+    def database_path(self):
+        return self.__database_path
+
+    def __init__(self, database_path, mode="a", num_readers=0, chunk_size=1000, **kwargs):
+        if num_readers:
+            if database_path == MEMORY_DB_NAME:
+                raise ValueError("reader connections are not available for an in-memory database")
+            if kwargs.get("uri"):
+                raise ValueError("reader connections are not available with uri option")
+
+        self.__database_path = database_path
+        self.__chunk_size = chunk_size
+
+        reader_kwargs = dict(
+            [(key, value) for key, value in kwargs.items() if key not in _WRITE_ONLY_OPTIONS]
+        )
+        self.__writer = _Worker(database_path, mode, kwargs, "simplesqlite-writer")
+        self.__readers = [
+            _Worker(database_path, "r", reader_kwargs, "simplesqlite-reader-{:d}".format(i))
+            for i in range(num_readers)
+        ]
+        self.__reader_cycle = itertools.cycle(self.__readers) if self.__readers else None
+        self.__is_writer_connected = False
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connect(self):
+        """
+        Connect the writer connection to the database.
+        Reader connections are connected when they are used for the first time.
+        """
+
+        await self.__run(self.__writer, SimpleSQLite.check_connection)
+        self.__is_writer_connected = True
+
+    async def close(self):
+        """
+        Commit and close all of the connections.
+        """
+
+        for worker in [self.__writer] + self.__readers:
+            await _get_running_loop().run_in_executor(worker.executor, worker.close)
+            worker.executor.shutdown(wait=True)
+
+        logger.debug("close async connections: path='{}'", self.database_path)
+
+    async def execute_query(self, query):
+        """
+        Execute an arbitrary query with the writer connection.
+
+        :return: Fetched rows.
+        :rtype: list
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.execute_query`
+        """
+
+        return await self.__run(self.__writer, self.__execute_and_fetchall, query)
+
+    async def select(self, select, table_name, where=None, extra=None):
+        """
+        :return: Fetched rows.
+        :rtype: list
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.select`
+        """
+
+        worker = await self.__get_reader()
+
+        return await self.__run(
+            worker,
+            lambda con: con.select(select, table_name, where=where, extra=extra).fetchall(),
+        )
+
+    async def update(self, table_name, set_query, where=None):
+        """
+        :return: Number of updated rows.
+        :rtype: int
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.update`
+        """
+
+        return await self.__run(
+            self.__writer, lambda con: con.update(table_name, set_query, where=where).rowcount
+        )
+
+    async def delete(self, table_name, where=None):
+        """
+        :return: Number of deleted rows.
+        :rtype: int
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.delete`
+        """
+
+        return await self.__run(
+            self.__writer, lambda con: con.delete(table_name, where=where).rowcount
+        )
+
+    def aselect(self, select, table_name, where=None, extra=None, chunk_size=None):
+        """
+        Execute a SELECT query and stream the result rows.
+        Rows are fetched from the database by chunks of ``chunk_size`` rows,
+        and the next chunk is not fetched until the current chunk is consumed.
+        The query is executed at the first iteration.
+
+        :return:
+            Asynchronous iterator of result rows.
+            Call ``aclose()`` of the iterator to release the cursor
+            when stopping the iteration before the end.
+
+        :Sample Code:
+            .. code:: python
+
+                async for row in con.aselect("*", "sample_table", chunk_size=500):
+                    print(row)
+        """
+
+        if chunk_size is None:
+            chunk_size = self.__chunk_size
+
+        return _RowIterator(
+            self.__get_reader,
+            self.__run,
+            lambda con: con.select(select, table_name, where=where, extra=extra),
+            chunk_size,
+        )
+
+    async def _dispatch(self, name, is_read, *args, **kwargs):
+        if is_read:
+            worker = await self.__get_reader()
+        else:
+            worker = self.__writer
+
+        return await self.__run(worker, getattr(SimpleSQLite, name), *args, **kwargs)
+
+    async def __get_reader(self):
+        if self.__reader_cycle is None:
+            return self.__writer
+
+        if not self.__is_writer_connected:
+            # connect the writer first to apply the open mode before reading
+            await self.connect()
+
+        return next(self.__reader_cycle)
+
+    async def __run(self, worker, func, *args, **kwargs):
+        future = _get_running_loop().run_in_executor(
+            worker.executor, functools.partial(worker.call, func, *args, **kwargs)
+        )
+
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            worker.interrupt()
+            raise
+
+    @staticmethod
+    def __execute_and_fetchall(con, query):
+        result = con.execute_query(query)
+        if result is None:
+            return []
+
+        return result.fetchall()
+
+
+def _make_method(name, is_read):
+    async def coroutine(self, *args, **kwargs):
+        return await self._dispatch(name, is_read, *args, **kwargs)
+
+    coroutine.__name__ = name
+    coroutine.__doc__ = ".. seealso:: :py:meth:`simplesqlite.SimpleSQLite.{:s}`".format(name)
+
+    return coroutine
+
+
+for _name in _READ_METHODS:
+    setattr(AsyncSimpleSQLite, _name, _make_method(_name, is_read=True))
+for _name in _WRITE_METHODS:
+    setattr(AsyncSimpleSQLite, _name, _make_method(_name, is_read=False))
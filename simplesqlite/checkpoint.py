@@ -0,0 +1,262 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from ._logger import logger
+from .error import OperationalError
+
+
+CheckpointMetrics = namedtuple(
+    "CheckpointMetrics",
+    " ".join(
+        [
+            "wal_size",
+            "num_checkpoints",
+            "num_busy_checkpoints",
+            "last_checkpoint_mode",
+            "last_checkpoint_duration",
+            "total_checkpoint_duration",
+        ]
+    ),
+)
+
+
+class CheckpointManager(object):
+    """
+    Run WAL checkpoints of a SQLite database file from a background thread.
+
+    A ``PASSIVE`` checkpoint is executed when the WAL file has grown by
+    ``wal_size_threshold`` since the last checkpoint, or when ``interval`` seconds
+    have elapsed since the last checkpoint.
+    A ``TRUNCATE`` checkpoint is executed when no write to the database
+    has been detected for ``idle_interval`` seconds,
+    to reset the WAL file size to zero.
+
+    :param str database_path: Path to a SQLite database file in WAL mode.
+    :param int wal_size_threshold:
+        Growth of the WAL file size in bytes to trigger a checkpoint.
+    :param float interval: Maximum seconds between checkpoints.
+    :param float idle_interval:
+        Seconds without writes to regard the database as idle.
+    :param float poll_interval: Seconds between each WAL file check.
+    :param float busy_timeout:
+        Seconds to wait for locks when executing a checkpoint.
+
+    .. seealso::
+        :py:meth:`simplesqlite.SimpleSQLite.start_checkpoint_manager`
+    """
+
+    @property
+    def database_path(self):
+        return self.__database_path
+
+    @property
+    def wal_path(self):
+        return self.__database_path + "-wal"
+
+    @property
+    def wal_size(self):
+        """
+        :return: Current size of the WAL file in bytes.
+        :rtype: int
+        """
+
+        try:
+            return os.path.getsize(self.wal_path)
+        except OSError:
+            return 0
+
+    @property
+    def metrics(self):
+        """
+        :return:
+            WAL file size and checkpoint statistics.
+            Durations are in seconds.
+        :rtype: CheckpointMetrics
+        """
+
+        with self.__lock:
+            return CheckpointMetrics(
+                wal_size=self.wal_size,
+                num_checkpoints=self.__num_checkpoints,
+                num_busy_checkpoints=self.__num_busy_checkpoints,
+                last_checkpoint_mode=self.__last_checkpoint_mode,
+                last_checkpoint_duration=self.__last_checkpoint_duration,
+                total_checkpoint_duration=self.__total_checkpoint_duration,
+            )
+
+    def __init__(
+        self,
+        database_path,
+        wal_size_threshold=4 * 1024 ** 2,
+        interval=60.0,
+        idle_interval=5.0,
+        poll_interval=0.5,
+        busy_timeout=1.0,
+    ):
+        self.__database_path = database_path
+        self.__wal_size_threshold = wal_size_threshold
+        self.__interval = interval
+        self.__idle_interval = idle_interval
+        self.__poll_interval = poll_interval
+        self.__busy_timeout = busy_timeout
+
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+        self.__num_checkpoints = 0
+        self.__num_busy_checkpoints = 0
+        self.__last_checkpoint_mode = None
+        self.__last_checkpoint_duration = None
+        self.__total_checkpoint_duration = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def is_running(self):
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+
+        logger.debug("start checkpoint manager: path='{}'", self.database_path)
+
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name="simplesqlite-checkpoint")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self, timeout=None):
+        if self.__thread is None:
+            return
+
+        logger.debug("stop checkpoint manager: path='{}'", self.database_path)
+
+        self.__stop_event.set()
+        self.__thread.join(timeout)
+        self.__thread = None
+
+    def checkpoint(self, mode="PASSIVE", connection=None):
+        """
+        Execute a WAL checkpoint.
+
+        :param str mode:
+            Checkpoint mode: ``"PASSIVE"``/``"FULL"``/``"RESTART"``/``"TRUNCATE"``.
+        :return: |True| if the checkpoint completed without being blocked.
+        :rtype: bool
+        :raises ValueError: If the ``mode`` is invalid.
+        :raises simplesqlite.OperationalError: If failed to execute the checkpoint.
+        """
+
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError("invalid checkpoint mode: {}".format(mode))
+
+        if connection is None:
+            connection = self.__connect()
+            try:
+                return self.checkpoint(mode, connection)
+            finally:
+                connection.close()
+
+        start_time = time.time()
+        try:
+            busy, _, _ = connection.execute("PRAGMA wal_checkpoint({:s})".format(mode)).fetchone()
+        except sqlite3.OperationalError as e:
+            raise OperationalError(e)
+        elapse_time = time.time() - start_time
+
+        with self.__lock:
+            self.__num_checkpoints += 1
+            if busy:
+                self.__num_busy_checkpoints += 1
+            self.__last_checkpoint_mode = mode
+            self.__last_checkpoint_duration = elapse_time
+            self.__total_checkpoint_duration += elapse_time
+
+        logger.debug(
+            "checkpoint: path='{}', mode={}, busy={}, elapse={:f}",
+            self.database_path,
+            mode,
+            busy,
+            elapse_time,
+        )
+
+        return busy == 0
+
+    def __connect(self):
+        return sqlite3.connect(self.database_path, timeout=self.__busy_timeout)
+
+    def __fetch_data_version(self, connection):
+        try:
+            return connection.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(
+                "failed to fetch the data version: path='{}', error={}", self.database_path, e
+            )
+            return None
+
+    def __run(self):
+        connection = self.__connect()
+
+        try:
+            # data_version is None until fetched successfully
+            data_version = self.__fetch_data_version(connection)
+            last_write_time = last_checkpoint_time = time.time()
+            is_checkpointed = is_truncated = False
+
+            # a PASSIVE checkpoint does not shrink the WAL file:
+            # the threshold is applied to the size growth since the last checkpoint
+            checkpointed_wal_size = 0
+
+            while not self.__stop_event.wait(self.__poll_interval):
+                now = time.time()
+                new_data_version = self.__fetch_data_version(connection)
+                if new_data_version is None:
+                    # the database is locked or removed: retry at the next poll
+                    continue
+
+                if new_data_version != data_version:
+                    data_version = new_data_version
+                    last_write_time = now
+                    is_checkpointed = is_truncated = False
+
+                wal_size = self.wal_size
+                if wal_size < checkpointed_wal_size:
+                    # the WAL file is truncated by another connection
+                    checkpointed_wal_size = 0
+                if wal_size == 0:
+                    continue
+
+                try:
+                    if not is_checkpointed and (
+                        wal_size - checkpointed_wal_size >= self.__wal_size_threshold
+                        or now - last_checkpoint_time >= self.__interval
+                    ):
+                        is_checkpointed = self.checkpoint("PASSIVE", connection)
+                        last_checkpoint_time = now
+                        checkpointed_wal_size = self.wal_size
+                    elif not is_truncated and now - last_write_time >= self.__idle_interval:
+                        is_checkpointed = is_truncated = self.checkpoint("TRUNCATE", connection)
+                        last_checkpoint_time = now
+                        checkpointed_wal_size = self.wal_size
+                except OperationalError as e:
+                    logger.debug("failed to checkpoint: {}", e)
+        finally:
+            connection.close()
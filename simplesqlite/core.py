@@ -6,33 +6,42 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import itertools
+import json
 import logging
 import os
 import re
 import sqlite3
+import time
 import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
 
 import pathvalidate
 import six
-import typepy
-from mbstrdecoder import MultiByteStrDecoder
-from sqliteschema import SQLITE_SYSTEM_TABLES, SQLiteSchemaExtractor
-from tabledata import TableData
 
-from ._common import extract_table_metadata
-from ._func import copy_table, validate_table_name
+from ._cache import ResultCache, StatementCacheProfiler
+from ._func import (
+    copy_table,
+    is_empty_sequence,
+    is_not_empty_sequence,
+    is_not_null_string,
+    is_null_string,
+    validate_table_name,
+)
 from ._logger import logger
-from ._sanitizer import SQLiteTableDataSanitizer
+from ._pagination import Page, decode_page_cursor, encode_page_cursor
+from ._retry import RetryPolicy, RetryStats
+from ._statement import PreparedInsert, PreparedSelect
 from .converter import RecordConvertor
 from .error import (
     AttributeNotFoundError,
     DatabaseError,
-    NameValidationError,
     NullDatabaseConnectionError,
     OperationalError,
     TableNotFoundError,
 )
-from .query import Attr, AttrList, Insert, Select, Table, Value, make_index_name
+from .query import Attr, AttrList, Insert, Select, Table, Upsert, Value, make_index_name
 from .sqlquery import SqlQuery
 
 
@@ -54,15 +63,52 @@ class SimpleSQLite(object):
         if the value is |True|.
     :param bool profile:
         Recording SQL query execution time profile, if the value is |True|.
+    :param bool immutable:
+        Open the database file as an immutable file, if the value is |True|.
+        Only available for ``"r"`` mode.
+    :param str journal_mode:
+        Journal mode of the database to be set when connecting.
+        e.g. ``"wal"``.
+    :param bool check_same_thread:
+        If |False|, the connection can be used from threads other than the creating thread.
+        Passed to :py:func:`sqlite3.connect`.
+    :param schema_cache:
+        Cache of table/attribute names to use for schema lookups.
+        A cache can be shared among connections to the same database.
+    :type schema_cache: simplesqlite._cache.SchemaCache
+    :param float timeout:
+        Seconds to wait for a lock of the database to be released.
+        Passed to :py:func:`sqlite3.connect`.
+    :param int detect_types:
+        Type detection flags. Passed to :py:func:`sqlite3.connect`.
+    :param str isolation_level:
+        Isolation level of implicitly started transactions.
+        Passed to :py:func:`sqlite3.connect`.
+    :param int cached_statements:
+        Number of compiled statements to be cached by the connection.
+        Passed to :py:func:`sqlite3.connect`.
+    :param bool uri:
+        Interpret the ``database_src`` as a URI, if the value is |True|.
+        Passed to :py:func:`sqlite3.connect`.
 
     .. seealso::
         :py:meth:`.connect`
         :py:meth:`.get_profile`
+        :py:meth:`.get_statement_cache_profile`
     """
 
     dup_col_handler = "error"
     global_debug_query = False
 
+    __JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+    __TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+    __RE_SELECT = re.compile(r"^\s*SELECT\s", re.IGNORECASE)
+    __ROW_COUNTER_TABLE = "simplesqlite_row_counter"
+    __WHERE_IN_METHODS = ("temp_table", "json")
+    __RETURNING_VERSION = (3, 35, 0)
+    __ON_ERROR_BEHAVIORS = ("raise", "quarantine")
+    __QUARANTINE_CHUNK_SIZE = 10000
+
     @property
     def database_path(self):
         """
@@ -97,6 +143,8 @@ class SimpleSQLite(object):
 
     @property
     def schema_extractor(self):
+        from sqliteschema import SQLiteSchemaExtractor
+
         return SQLiteSchemaExtractor(self)
 
     @property
@@ -121,12 +169,113 @@ class SimpleSQLite(object):
 
         return self.__mode
 
-    def __init__(self, database_src, mode="a", delayed_connection=True, profile=False):
+    @property
+    def journal_mode(self):
+        """
+        :return: Current journal mode of the database. e.g. ``"wal"``.
+        :rtype: str
+        """
+
+        self.check_connection()
+
+        return self.connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+    @property
+    def checkpoint_manager(self):
+        """
+        :return:
+            Running checkpoint manager of the connection.
+            |None| if the checkpoint manager is not started.
+        :rtype: simplesqlite.checkpoint.CheckpointManager
+
+        .. seealso:: :py:meth:`.start_checkpoint_manager`
+        """
+
+        return self.__checkpoint_manager
+
+    @property
+    def retry_stats(self):
+        """
+        :return:
+            Statistics of lock errors and retries of the connection:
+
+                - ``num_lock_errors``: number of attempts failed by locked/busy database
+                - ``num_retries``: number of retried attempts
+                - ``num_failures``: number of operations failed after the retries
+                - ``lock_wait_time``: seconds spent in the failed attempts
+                  (including waits of the busy timeout)
+                - ``backoff_time``: seconds slept between the attempts
+
+        :rtype: |namedtuple|
+
+        .. seealso:: :py:meth:`.set_retry_policy`
+        """
+
+        return RetryStats(
+            num_lock_errors=self.__num_lock_errors,
+            num_retries=self.__num_retries,
+            num_failures=self.__num_lock_failures,
+            lock_wait_time=self.__lock_wait_time,
+            backoff_time=self.__backoff_time,
+        )
+
+    @property
+    def result_cache_info(self):
+        """
+        :return:
+            Statistics of the result cache: ``hits``, ``misses``, ``maxsize`` and ``currsize``.
+            |None| if the result cache is disabled.
+        :rtype: |namedtuple|
+
+        .. seealso:: :py:meth:`.enable_result_cache`
+        """
+
+        if self.__result_cache is None:
+            return None
+
+        return self.__result_cache.info
+
+    def __init__(
+        self,
+        database_src,
+        mode="a",
+        delayed_connection=True,
+        profile=False,
+        immutable=False,
+        journal_mode=None,
+        check_same_thread=True,
+        schema_cache=None,
+        timeout=5.0,
+        detect_types=0,
+        isolation_level="",
+        cached_statements=128,
+        uri=False,
+    ):
         self.debug_query = False
 
         self.__initialize_connection()
         self.__mode = mode
         self.__is_profile = profile
+        self.__immutable = immutable
+        self.__journal_mode = journal_mode
+        self.__check_same_thread = check_same_thread
+        self.__timeout = timeout
+        self.__detect_types = detect_types
+        self.__isolation_level = isolation_level
+        self.__cached_statements = cached_statements
+        self.__uri = uri
+        self.__schema_cache = schema_cache
+        self.__autocommit_max_rows = None
+        self.__autocommit_max_interval = None
+        self.__retry_policy = None
+        self.__num_lock_errors = 0
+        self.__num_retries = 0
+        self.__num_lock_failures = 0
+        self.__lock_wait_time = 0.0
+        self.__backoff_time = 0.0
+        self.__result_cache = None
+        self.__is_detect_external_changes = True
+        self.__where_in_table_ids = itertools.count()
 
         if database_src is None:
             raise TypeError("database_src must be not None")
@@ -146,7 +295,18 @@ class SimpleSQLite(object):
             self.__delayed_connection_path = database_src
             return
 
-        self.connect(database_src, mode)
+        self.connect(
+            database_src,
+            mode,
+            immutable=immutable,
+            journal_mode=journal_mode,
+            check_same_thread=check_same_thread,
+            timeout=timeout,
+            detect_types=detect_types,
+            isolation_level=isolation_level,
+            cached_statements=cached_statements,
+            uri=uri,
+        )
 
     def __del__(self):
         self.close()
@@ -213,7 +373,19 @@ class SimpleSQLite(object):
             if not self.__delayed_connect():
                 raise NullDatabaseConnectionError("null database connection")
 
-    def connect(self, database_path, mode="a"):
+    def connect(
+        self,
+        database_path,
+        mode="a",
+        immutable=False,
+        journal_mode=None,
+        check_same_thread=True,
+        timeout=5.0,
+        detect_types=0,
+        isolation_level="",
+        cached_statements=128,
+        uri=False,
+    ):
         """
         Connect to a SQLite database.
 
@@ -221,11 +393,47 @@ class SimpleSQLite(object):
             Path to the SQLite database file to be connected.
         :param str mode:
             ``"r"``: Open for read only.
+            The database file is opened with the ``mode=ro`` URI parameter
+            (``PRAGMA query_only`` with Python 2), so that SQLite itself rejects any writes.
             ``"w"``: Open for read/write.
             Delete existing tables when connecting.
             ``"a"``: Open for read/write. Append to the existing tables.
+        :param bool immutable:
+            Open the database file with the ``immutable=1`` URI parameter,
+            if the value is |True|.
+            SQLite skips file locking and change detection for an immutable file.
+            Only use this for database files that are never modified while connected.
+            Not available with Python 2.
+        :param str journal_mode:
+            Journal mode to set to the database:
+            ``"delete"``/``"truncate"``/``"persist"``/``"memory"``/``"wal"``/``"off"``.
+            Keep the current journal mode of the database if the value is |None|.
+            ``"wal"`` mode allows readers to proceed concurrently with a writer.
+        :param bool check_same_thread:
+            If |False|, the connection can be used from threads other than the creating thread.
+            The caller is responsible for serializing access to the connection.
+        :param float timeout:
+            Seconds to wait for a lock of the database to be released
+            before raising an error.
+        :param int detect_types:
+            Type detection flags. e.g. ``sqlite3.PARSE_DECLTYPES``.
+        :param str isolation_level:
+            Isolation level of transactions that |sqlite3| implicitly begins before
+            data modification statements:
+            ``""`` (``DEFERRED``)/``"IMMEDIATE"``/``"EXCLUSIVE"``.
+            |None| to disable implicit transactions (autocommit mode).
+        :param int cached_statements:
+            Number of compiled statements to be cached by the connection.
+            Increase the value if many distinct statements are executed repeatedly.
+            Statement cache reuse can be estimated with :py:meth:`.get_statement_cache_profile`.
+        :param bool uri:
+            Interpret the ``database_path`` as a URI. e.g. ``"file:sample.sqlite?cache=shared"``.
+            Not available for ``"r"`` mode: use ``mode=ro`` URI parameter instead.
+            Not available with Python 2.
         :raises ValueError:
             If ``database_path`` is invalid or |attr_mode| is invalid.
+            Or ``immutable``/``journal_mode``/``uri`` is specified with
+            an unsupported |attr_mode|.
         :raises simplesqlite.DatabaseError:
             If the file is encrypted or is not a database.
         :raises simplesqlite.OperationalError:
@@ -233,41 +441,101 @@ class SimpleSQLite(object):
         """
 
         self.close()
+        if self.__result_cache is not None:
+            self.__result_cache.clear()
 
-        logger.debug("connect to a SQLite database: path='{}', mode={}".format(database_path, mode))
+        logger.debug("connect to a SQLite database: path='{}', mode={}", database_path, mode)
+
+        if mode not in ["r", "w", "a"]:
+            raise ValueError("unknown connection mode: " + mode)
 
-        if mode == "r":
+        if uri:
+            if six.PY2:
+                raise ValueError("uri option is not available with Python 2")
+            if mode == "r":
+                raise ValueError("uri option is not available for 'r' mode")
+        elif mode == "r":
             self.__verify_db_file_existence(database_path)
-        elif mode in ["w", "a"]:
-            self.__validate_db_path(database_path)
         else:
-            raise ValueError("unknown connection mode: " + mode)
+            self.__validate_db_path(database_path)
 
-        if database_path == MEMORY_DB_NAME:
+        if immutable:
+            if mode != "r":
+                raise ValueError("immutable option is only available for 'r' mode")
+            if six.PY2:
+                raise ValueError("immutable option is not available with Python 2")
+        if journal_mode:
+            if mode == "r":
+                raise ValueError("journal_mode option is not available for 'r' mode")
+            if journal_mode.lower() not in self.__JOURNAL_MODES:
+                raise ValueError("unknown journal mode: {}".format(journal_mode))
+
+        if database_path == MEMORY_DB_NAME or uri:
             self.__database_path = database_path
         else:
             self.__database_path = os.path.realpath(database_path)
 
+        connect_kwargs = {
+            "timeout": timeout,
+            "detect_types": detect_types,
+            "isolation_level": isolation_level,
+            "check_same_thread": check_same_thread,
+            "cached_statements": cached_statements,
+        }
+
         try:
-            self.__connection = sqlite3.connect(database_path)
+            if mode == "r" and six.PY2:
+                # sqlite3 module of Python 2 does not support URI filenames
+                self.__connection = sqlite3.connect(database_path, **connect_kwargs)
+                self.__connection.execute("PRAGMA query_only = ON")
+            elif mode == "r":
+                self.__connection = sqlite3.connect(
+                    self.__make_readonly_uri(self.__database_path, immutable),
+                    uri=True,
+                    **connect_kwargs
+                )
+            elif uri:
+                self.__connection = sqlite3.connect(database_path, uri=True, **connect_kwargs)
+            else:
+                self.__connection = sqlite3.connect(database_path, **connect_kwargs)
         except sqlite3.OperationalError as e:
             raise OperationalError(e)
 
         self.__mode = mode
+        self.__immutable = immutable
+        self.__journal_mode = journal_mode
+        self.__check_same_thread = check_same_thread
+        self.__timeout = timeout
+        self.__detect_types = detect_types
+        self.__isolation_level = isolation_level
+        self.__cached_statements = cached_statements
+        self.__uri = uri
+
+        if self.__is_profile:
+            self.__statement_cache_profiler = StatementCacheProfiler(cached_statements)
 
         try:
-            # validate connection after connect
-            self.fetch_table_names()
+            # validate connection after connect:
+            # read the schema without the schema extractor to keep the connection lightweight
+            self.__connection.execute("SELECT name FROM sqlite_master LIMIT 1").fetchall()
         except sqlite3.DatabaseError as e:
             raise DatabaseError(e)
 
+        if journal_mode:
+            self.__set_journal_mode(journal_mode)
+
         if mode != "w":
             return
 
         for table in self.fetch_table_names():
             self.drop_table(table)
 
-    def execute_query(self, query, caller=None):
+        # the row counter table is not included in fetch_table_names()
+        if self.__has_row_counter_table():
+            self.execute_query("DROP TABLE {:s}".format(Table(self.__ROW_COUNTER_TABLE)))
+            self.commit()
+
+    def execute_query(self, query, caller=None, params=None):
         """
         Send arbitrary SQLite query to the database.
 
@@ -275,6 +543,8 @@ class SimpleSQLite(object):
         :param tuple caller:
             Caller information.
             Expects the return value of :py:meth:`logging.Logger.findCaller`.
+        :param params: Values bound to the placeholders of the ``query``.
+        :type params: |list|/|tuple|/|dict|
         :return: The result of the query execution.
         :rtype: sqlite3.Cursor
         :raises simplesqlite.NullDatabaseConnectionError:
@@ -286,10 +556,8 @@ class SimpleSQLite(object):
             i.e. No access permissions check by |attr_mode|.
         """
 
-        import time
-
         self.check_connection()
-        if typepy.is_null_string(query):
+        if is_null_string(query):
             return None
 
         if self.debug_query or self.global_debug_query:
@@ -298,28 +566,40 @@ class SimpleSQLite(object):
         if self.__is_profile:
             exec_start_time = time.time()
 
+        query = six.text_type(query)
+
         try:
-            result = self.connection.execute(six.text_type(query))
+            if params is None:
+                result = self.__call_with_retry(self.connection.execute, [query])
+            else:
+                result = self.__call_with_retry(self.connection.execute, [query, params])
         except (sqlite3.OperationalError, sqlite3.IntegrityError) as e:
+            from mbstrdecoder import MultiByteStrDecoder
+
             if caller is None:
                 caller = logging.getLogger().findCaller()
             file_path, line_no, func_name = caller[:3]
 
-            raise OperationalError(
-                message="\n".join(
-                    [
-                        "failed to execute query at {:s}({:d}) {:s}".format(
-                            file_path, line_no, func_name
-                        ),
-                        "  - query: {}".format(MultiByteStrDecoder(query).unicode_str),
-                        "  - msg:   {}".format(e),
-                        "  - db:    {}".format(self.database_path),
-                    ]
-                )
+            message_list = [
+                "failed to execute query at {:s}({:d}) {:s}".format(file_path, line_no, func_name),
+                "  - query: {}".format(MultiByteStrDecoder(query).unicode_str),
+            ]
+            if params is not None:
+                message_list.append("  - params: {}".format(params))
+            message_list.extend(
+                ["  - msg:   {}".format(e), "  - db:    {}".format(self.database_path)]
             )
 
+            raise OperationalError(message="\n".join(message_list))
+
+        if self.__result_cache is not None and not self.__RE_SELECT.search(query):
+            # schema changes are not reflected to total_changes
+            self.__result_cache.clear()
+
         if self.__is_profile:
             self.__dict_query_count[query] = self.__dict_query_count.get(query, 0) + 1
+            if self.__statement_cache_profiler is not None:
+                self.__statement_cache_profiler.record(query)
 
             elapse_time = time.time() - exec_start_time
             self.__dict_query_totalexectime[query] = (
@@ -337,7 +617,7 @@ class SimpleSQLite(object):
 
         self.__connection.row_factory = row_factory
 
-    def select(self, select, table_name, where=None, extra=None):
+    def select(self, select, table_name, where=None, extra=None, params=None):
         """
         Send a SELECT query to the database.
 
@@ -346,6 +626,8 @@ class SimpleSQLite(object):
         :param where: |arg_select_where|
         :type where: |arg_where_type|
         :param str extra: |arg_select_extra|
+        :param params: Values bound to the placeholders of the ``where``/``extra``.
+        :type params: |list|/|tuple|/|dict|
         :return: Result of the query execution.
         :rtype: sqlite3.Cursor
         :raises simplesqlite.NullDatabaseConnectionError:
@@ -360,8 +642,46 @@ class SimpleSQLite(object):
         return self.execute_query(
             six.text_type(Select(select, table_name, where, extra)),
             logging.getLogger().findCaller(),
+            params,
         )
 
+    def prepare_select(self, table_name, columns, where_template=None, extra=None):
+        """
+        Build a SELECT statement once to be executed repeatedly with different parameters.
+        Executing the returned statement skips query building, name validation and
+        table existence checks.
+
+        :param str table_name: |arg_select_table_name|
+        :param list columns: Columns to select.
+        :param str where_template:
+            WHERE clause with ``?``/``:name`` placeholders. e.g. ``"id = ?"``.
+        :param str extra: |arg_select_extra|
+        :return: Callable that accepts parameters and returns a |Cursor|.
+        :rtype: simplesqlite._statement.PreparedSelect
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                select_by_id = con.prepare_select("sample_table", ["name"], "id = ?")
+                for record_id in record_ids:
+                    print(select_by_id(record_id).fetchone())
+        """
+
+        self.verify_table_existence(table_name)
+
+        query = Select(
+            AttrList(self.__to_column_list(columns)), table_name, where_template, extra
+        ).to_query()
+
+        return PreparedSelect(query, lambda params: self.execute_query(query, params=params))
+
     def select_as_dataframe(self, table_name, columns=None, where=None, extra=None):
         """
         Get data in the database and return fetched data as a
@@ -424,6 +744,8 @@ class SimpleSQLite(object):
             ``pandas`` package required to execute this method.
         """
 
+        from tabledata import TableData
+
         if columns is None:
             columns = self.fetch_attr_names(table_name)
 
@@ -466,7 +788,13 @@ class SimpleSQLite(object):
             :ref:`example-select-as-dict`
         """
 
-        return self.select_as_tabledata(table_name, columns, where, extra).as_dict().get(table_name)
+        return self.__fetch_with_result_cache(
+            ("select_as_dict", table_name, columns, where, extra),
+            lambda: self.select_as_tabledata(table_name, columns, where, extra)
+            .as_dict()
+            .get(table_name),
+            lambda records: [OrderedDict(record) for record in records] if records else records,
+        )
 
     def select_as_memdb(self, table_name, columns=None, where=None, extra=None):
         """
@@ -500,192 +828,262 @@ class SimpleSQLite(object):
 
         return memdb
 
-    def insert(self, table_name, record, attr_names=None):
+    def fetch_page(
+        self, table_name, order_by, page_size=1000, columns=None, where=None, cursor=None
+    ):
         """
-        Send an INSERT query to the database.
+        Fetch a page of records with keyset pagination:
+        records are ordered by the ``order_by`` key and a page starts right after
+        the last key of the previous page, e.g. ``WHERE (k1, k2) > (?, ?)``.
+        Unlike ``LIMIT``/``OFFSET``, fetching a deep page costs the same as
+        fetching the first page if the key is indexed.
 
-        :param str table_name: Table name of executing the query.
-        :param record: Record to be inserted.
-        :type record: |dict|/|namedtuple|/|list|/|tuple|
-        :raises IOError: |raises_write_permission|
+        :param str table_name: |arg_select_table_name|
+        :param order_by:
+            Column name(s) of the pagination key.
+            The key should be unique and not null, e.g. the primary key.
+        :type order_by: |str|/|list|
+        :param int page_size: Maximum number of records in a page.
+        :param list columns: |arg_select_as_xx_columns|
+        :param where: |arg_select_where|
+        :type where: |arg_where_type|
+        :param str cursor:
+            Opaque token returned by a previous call to fetch the next page.
+            Fetch the first page if the value is |None|.
+        :return:
+            A page that consists of ``records`` (list of tuples) and ``cursor``
+            (token of the next page, |None| if the page is the last one).
+        :rtype: |namedtuple|
+        :raises ValueError: If the ``page_size`` or the ``cursor`` is invalid.
         :raises simplesqlite.NullDatabaseConnectionError:
             |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
         :raises simplesqlite.OperationalError: |raises_operational_error|
 
-        :Example:
-            :ref:`example-insert-records`
-        """
+        :Sample Code:
+            .. code:: python
 
-        self.insert_many(table_name, records=[record], attr_names=attr_names)
+                from simplesqlite import SimpleSQLite
 
-    def insert_many(self, table_name, records, attr_names=None):
-        """
-        Send an INSERT query with multiple records to the database.
+                con = SimpleSQLite("sample.sqlite", "r")
 
-        :param str table: Table name of executing the query.
-        :param records: Records to be inserted.
-        :type records: list of |dict|/|namedtuple|/|list|/|tuple|
-        :return: Number of inserted records.
-        :rtype: int
-        :raises IOError: |raises_write_permission|
-        :raises simplesqlite.NullDatabaseConnectionError:
-            |raises_check_connection|
-        :raises simplesqlite.TableNotFoundError:
-            |raises_verify_table_existence|
-        :raises simplesqlite.OperationalError: |raises_operational_error|
+                page = con.fetch_page("sample_table", order_by="id", page_size=100)
+                print(page.records)
 
-        :Example:
-            :ref:`example-insert-records`
+                # resume from the token, e.g. passed by a HTTP request
+                next_page = con.fetch_page(
+                    "sample_table", order_by="id", page_size=100, cursor=page.cursor)
         """
 
-        self.validate_access_permission(["w", "a"])
+        if page_size < 1:
+            raise ValueError("page_size must be greater than zero: actual={}".format(page_size))
+
         self.verify_table_existence(table_name)
 
-        if attr_names:
-            logger.debug(
-                "insert {number} records into {table}({attrs})".format(
-                    number=len(records) if records else 0, table=table_name, attrs=attr_names
-                )
-            )
-        else:
-            logger.debug(
-                "insert {number} records into {table}".format(
-                    number=len(records) if records else 0, table=table_name
-                )
-            )
+        key_columns = self.__to_column_list(order_by)
+        key_attrs = AttrList(key_columns)
 
-        if typepy.is_empty_sequence(records):
-            return 0
+        where_list = []
+        params = None
+        if where:
+            where_list.append("({})".format(where))
+        if cursor is not None:
+            params = decode_page_cursor(cursor, table_name, key_columns)
+            where_list.append("({}) > ({})".format(key_attrs, ",".join(["?"] * len(key_columns))))
+
+        query = Select(
+            select="{},{}".format(key_attrs, AttrList(columns) if columns else "*"),
+            table=table_name,
+            where=" AND ".join(where_list) if where_list else None,
+            extra="ORDER BY {} LIMIT {:d}".format(key_attrs, page_size + 1),
+        )
+        rows = [
+            tuple(row)
+            for row in self.execute_query(query, logging.getLogger().findCaller(), params)
+        ]
 
-        if attr_names is None:
-            attr_names = self.fetch_attr_names(table_name)
-        records = RecordConvertor.to_records(attr_names, records)
-        query = Insert(table_name, AttrList(attr_names)).to_query()
+        num_keys = len(key_columns)
+        records = [row[num_keys:] for row in rows[:page_size]]
+        if len(rows) <= page_size:
+            return Page(records=records, cursor=None)
 
-        if self.debug_query or self.global_debug_query:
-            logging_count = 8
-            num_records = len(records)
+        return Page(
+            records=records,
+            cursor=encode_page_cursor(table_name, key_columns, rows[page_size - 1][:num_keys]),
+        )
 
-            logs = [query] + [
-                "    record {:4d}: {}".format(i, record)
-                for i, record in enumerate(records[:logging_count])
-            ]
-            if num_records - logging_count > 0:
-                logs.append(
-                    "    and other {} records will be inserted".format(num_records - logging_count)
-                )
+    def iter_pages(
+        self, table_name, order_by, page_size=1000, columns=None, where=None, cursor=None
+    ):
+        """
+        Iterate over pages of records with keyset pagination.
 
-            logger.debug("\n".join(logs))
+        :return: Iterator of pages, each page is a result of :py:meth:`.fetch_page`.
 
-        try:
-            self.connection.executemany(query, records)
-        except (sqlite3.OperationalError, sqlite3.IntegrityError) as e:
-            caller = logging.getLogger().findCaller()
-            file_path, line_no, func_name = caller[:3]
-            raise OperationalError(
-                "{:s}({:d}) {:s}: failed to execute query:\n".format(file_path, line_no, func_name)
-                + "  query={}\n".format(query)
-                + "  msg='{}'\n".format(e)
-                + "  db={}\n".format(self.database_path)
-                + "  records={}\n".format(records[:2])
-            )
+        :Sample Code:
+            .. code:: python
 
-        return len(records)
+                from simplesqlite import SimpleSQLite
 
-    def update(self, table_name, set_query, where=None):
-        """Execute an UPDATE query.
+                con = SimpleSQLite("sample.sqlite", "r")
 
-        Args:
-            table_name (|str|):
-                Table name of executing the query.
-            set_query (|str|):
-                ``SET`` clause for the update query.
-            where (|arg_where_type| , optional):
-                ``WHERE`` clause for the update query.
-                Defaults to |None|.
+                for page in con.iter_pages("sample_table", order_by=["date", "id"]):
+                    for record in page.records:
+                        print(record)
 
-        Raises:
-            IOError:
-                |raises_write_permission|
-            simplesqlite.NullDatabaseConnectionError:
-                |raises_check_connection|
-            simplesqlite.TableNotFoundError:
-                |raises_verify_table_existence|
-            simplesqlite.OperationalError:
-                |raises_operational_error|
+        .. seealso:: :py:meth:`.fetch_page`
         """
 
-        self.validate_access_permission(["w", "a"])
-        self.verify_table_existence(table_name)
+        while True:
+            page = self.fetch_page(table_name, order_by, page_size, columns, where, cursor)
+            yield page
 
-        query = SqlQuery.make_update(table_name, set_query, where)
+            if page.cursor is None:
+                break
 
-        return self.execute_query(query, logging.getLogger().findCaller())
+            cursor = page.cursor
 
-    def delete(self, table_name, where=None):
+    @contextmanager
+    def where_in(self, key, value_list, negate=False, threshold=1000, method="temp_table"):
         """
-        Send a DELETE query to the database.
+        Make a WHERE IN query that is efficient for a large number of values.
+        If the number of the values is less than or equal to the ``threshold``,
+        the values are embedded to the query as literals
+        (same as :py:meth:`.SqlQuery.make_where_in`).
+        Otherwise, the values are filtered by a subquery to
+        a temporary table (``"temp_table"``) that indexed by the values,
+        or to a JSON array bound to the query as a parameter
+        (``"json"``, requires the JSON1 extension of SQLite).
+        The temporary table is dropped when exiting the context.
 
-        :param str table_name: Table name of executing the query.
-        :param where: |arg_select_where|
-        :type where: |arg_where_type|
-        """
+        :param str key: Attribute name of the key.
+        :param value_list: Values that the right hand side associated with the key.
+        :param bool negate: Make a WHERE NOT IN query if the value is |True|.
+        :param int threshold: Maximum number of values to embed to the query as literals.
+        :param str method: ``"temp_table"`` or ``"json"``.
+        :return:
+            Context manager that yields part of WHERE query of SQLite.
+            With the ``"json"`` method, the context manager yields a tuple of
+            part of WHERE query and the parameters bound to the query,
+            to be passed to :py:meth:`.select`.
+        :raises ValueError: If the ``method`` is invalid.
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
 
-        self.validate_access_permission(["w", "a"])
-        self.verify_table_existence(table_name)
+        :Sample Code:
+            .. code:: python
 
-        query = "DELETE FROM {:s}".format(table_name)
-        if where:
-            query += " WHERE {:s}".format(where)
+                from simplesqlite import SimpleSQLite
 
-        return self.execute_query(query, logging.getLogger().findCaller())
+                con = SimpleSQLite("sample.sqlite", "r")
 
-    def fetch_value(self, select, table_name, where=None, extra=None):
-        """
-        Fetch a value from the table. Return |None| if no value matches
-        the conditions, or the table not found in the database.
+                with con.where_in("id", range(100000)) as where:
+                    print(con.fetch_num_records("sample_table", where=where))
 
-        :param str select: Attribute for SELECT query
-        :param str table_name: Table name of executing the query.
-        :param where: |arg_select_where|
-        :type where: |arg_where_type|
-        :return: Result of execution of the query.
-        :raises simplesqlite.NullDatabaseConnectionError:
-            |raises_check_connection|
-        :raises simplesqlite.OperationalError: |raises_operational_error|
+                with con.where_in("id", range(100000), method="json") as (where, params):
+                    print(con.select("*", "sample_table", where=where, params=params).fetchall())
         """
 
-        try:
-            self.verify_table_existence(table_name)
-        except TableNotFoundError as e:
-            logger.debug(e)
-            return None
+        if method not in self.__WHERE_IN_METHODS:
+            raise ValueError(
+                "invalid method: expected={}, actual={}".format(self.__WHERE_IN_METHODS, method)
+            )
 
-        result = self.execute_query(
-            Select(select, table_name, where, extra), logging.getLogger().findCaller()
-        )
-        if result is None:
-            return None
+        self.check_connection()
 
-        fetch = result.fetchone()
-        if fetch is None:
-            return None
+        value_list = list(value_list)
+        operator = "NOT IN" if negate else "IN"
 
-        return fetch[0]
+        if len(value_list) <= threshold:
+            if negate:
+                where = SqlQuery.make_where_not_in(key, value_list)
+            else:
+                where = SqlQuery.make_where_in(key, value_list)
 
-    def fetch_values(self, select, table_name, where=None, extra=None):
-        result = self.select(select=select, table_name=table_name, where=where, extra=extra)
-        if result is None:
-            return None
+            yield (where, []) if method == "json" else where
+            return
 
-        return [record[0] for record in result.fetchall()]
+        if method == "json":
+            yield (
+                "{:s} {:s} (SELECT value FROM json_each(?))".format(Attr(key), operator),
+                [json.dumps(value_list)],
+            )
+            return
 
-    def fetch_table_names(self, include_system_table=False):
+        table_name = "simplesqlite_where_in_{:d}".format(next(self.__where_in_table_ids))
+        is_in_transaction = self.__is_connection_in_transaction(default=True)
+
+        self.execute_query(
+            "CREATE TEMP TABLE {:s} (value PRIMARY KEY) WITHOUT ROWID".format(table_name),
+            logging.getLogger().findCaller(),
+        )
+        try:
+            try:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO temp.{:s} VALUES (?)".format(table_name),
+                    [(value,) for value in value_list],
+                )
+            finally:
+                # end the transaction implicitly opened by the load:
+                # otherwise the connection keeps holding a lock of the database
+                if not is_in_transaction and self.__is_connection_in_transaction(default=False):
+                    self.connection.commit()
+
+            yield "{:s} {:s} (SELECT value FROM temp.{:s})".format(Attr(key), operator, table_name)
+        finally:
+            if self.is_connected():
+                self.execute_query("DROP TABLE IF EXISTS temp.{:s}".format(table_name))
+
+    def parallel_map(
+        self,
+        table_name,
+        func,
+        columns=None,
+        workers=None,
+        where=None,
+        reduce_func=None,
+        partition_key="rowid",
+        chunk_size=None,
+    ):
         """
-        :return: List of table names in the database.
-        :rtype: list
+        Apply a function to records of a table in parallel with worker processes.
+        The table is split into chunks of contiguous ``partition_key`` value ranges
+        that have the same number of records,
+        and each worker process reads chunks through its own read-only connection to
+        the database file.
+        Only committed records are visible from the worker processes.
+
+        :param str table_name: |arg_select_table_name|
+        :param func:
+            Function that accepts a list of records (tuples of the ``columns`` values)
+            of a chunk. The function and its return value must be picklable:
+            e.g. a module-level function.
+        :param list columns: Columns to read. Defaults to all of the columns of the table.
+        :param int workers: Number of worker processes. Defaults to the number of CPUs.
+        :param str where: |arg_select_where|
+        :param reduce_func:
+            Function that accepts two return values of the ``func``
+            to reduce the results of the chunks to a single value.
+        :param str partition_key:
+            Integer column to split the table, e.g. ``INTEGER PRIMARY KEY`` column.
+            Use a primary key column for ``WITHOUT ROWID`` tables.
+        :param int chunk_size:
+            Number of records of a chunk.
+            Chunks are split at ``partition_key`` values, so that records that have
+            the same ``partition_key`` value belong to the same chunk.
+            Defaults to split the table into four chunks per worker.
+        :return:
+            List of the return values of the ``func`` for each chunk in the order of
+            the ``partition_key``. Reduced value if the ``reduce_func`` is specified
+            (|None| if the table has no records).
+        :raises ValueError:
+            If the connection is not to a database file,
+            or the ``partition_key`` is not an integer column.
         :raises simplesqlite.NullDatabaseConnectionError:
             |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
         :raises simplesqlite.OperationalError: |raises_operational_error|
 
         :Sample Code:
@@ -693,7 +1091,836 @@ class SimpleSQLite(object):
 
                 from simplesqlite import SimpleSQLite
 
-                con = SimpleSQLite("sample.sqlite", "w")
+                def count_words(records):
+                    return sum(len(text.split()) for text, in records)
+
+                con = SimpleSQLite("sample.sqlite", "r")
+                num_words = con.parallel_map(
+                    "documents", count_words, ["text"], reduce_func=lambda x, y: x + y)
+        """
+
+        from ._parallel import fetch_key_ranges, get_default_workers, map_range, run_in_processes
+
+        database_path = self.__verify_parallel_source(table_name)
+
+        if workers is None:
+            workers = get_default_workers()
+        if columns is None:
+            columns = self.fetch_attr_names(table_name)
+
+        query = Select(
+            AttrList(self.__to_column_list(columns)),
+            table_name,
+            where=self.__make_range_condition(partition_key, where),
+            extra="ORDER BY {}".format(Attr(partition_key)),
+        ).to_query()
+        tasks = [
+            (database_path, query, key_range, func)
+            for key_range in fetch_key_ranges(
+                self, table_name, partition_key, where, workers, chunk_size
+            )
+        ]
+
+        results = run_in_processes(map_range, tasks, workers)
+        if reduce_func is None:
+            return list(results)
+
+        reduced_value = None
+        for i, result in enumerate(results):
+            reduced_value = result if i == 0 else reduce_func(reduced_value, result)
+
+        return reduced_value
+
+    def parallel_aggregate(
+        self,
+        table_name,
+        group_by,
+        aggregates,
+        workers=None,
+        where=None,
+        partition_key="rowid",
+        chunk_size=None,
+    ):
+        """
+        Compute aggregates grouped by columns in parallel with worker processes.
+        Each worker process computes partial aggregates for chunks of contiguous
+        ``partition_key`` value ranges through its own read-only connection,
+        and the partial aggregates are merged in the calling process:
+        ``avg`` values are computed from partial sums and counts.
+        Only committed records are visible from the worker processes.
+
+        :param str table_name: |arg_select_table_name|
+        :param group_by:
+            Columns to group records by.
+            Aggregate all of the records to a single group if the value is |None|.
+        :type group_by: |str|/|list|
+        :param dict aggregates:
+            Aggregate functions (``"sum"``/``"count"``/``"min"``/``"max"``/``"avg"``)
+            mapped to a column or a list of columns to be aggregated.
+            ``"*"`` is available as the column of ``"count"``.
+            e.g. ``{"sum": ["price", "qty"], "count": "*"}``
+        :param int workers: Number of worker processes. Defaults to the number of CPUs.
+        :param str where: |arg_select_where|
+        :param str partition_key:
+            Integer column to split the table, e.g. ``INTEGER PRIMARY KEY`` column.
+        :param int chunk_size:
+            Number of records of a chunk.
+            Chunks are split at ``partition_key`` values, so that records that have
+            the same ``partition_key`` value belong to the same chunk.
+            Defaults to split the table into four chunks per worker.
+        :return:
+            Aggregated values of each group, sorted by the groups.
+            Keys of the dictionaries are the ``group_by`` columns and
+            the aggregates in ``"<function>(<column>)"`` format, e.g. ``"sum(price)"``.
+        :rtype: list of |OrderedDict|
+        :raises ValueError:
+            If the ``aggregates`` is invalid, the connection is not to a database file,
+            or the ``partition_key`` is not an integer column.
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "r")
+                for row in con.parallel_aggregate(
+                        "sales", "region", {"sum": "price", "avg": "price", "count": "*"}):
+                    print(row)
+        """
+
+        from ._parallel import (
+            PartialAggregator,
+            fetch_key_ranges,
+            fetch_range,
+            get_default_workers,
+            run_in_processes,
+        )
+
+        database_path = self.__verify_parallel_source(table_name)
+        aggregator = PartialAggregator(aggregates)
+
+        if workers is None:
+            workers = get_default_workers()
+
+        group_columns = [] if group_by is None else self.__to_column_list(group_by)
+        query = Select(
+            ",".join(
+                [Attr(column).to_query() for column in group_columns]
+                + aggregator.partial_columns
+            ),
+            table_name,
+            where=self.__make_range_condition(partition_key, where),
+            extra="GROUP BY {}".format(AttrList(group_columns)) if group_columns else None,
+        ).to_query()
+        tasks = [
+            (database_path, query, key_range)
+            for key_range in fetch_key_ranges(
+                self, table_name, partition_key, where, workers, chunk_size
+            )
+        ]
+
+        for rows in run_in_processes(fetch_range, tasks, workers):
+            aggregator.merge(rows, len(group_columns))
+
+        return [
+            OrderedDict(zip(group_columns + aggregator.names, list(group) + values))
+            for group, values in aggregator.results()
+        ]
+
+    def parallel_load(
+        self,
+        table_name,
+        attr_names,
+        data_matrix,
+        primary_key=None,
+        add_primary_key_column=False,
+        index_attrs=None,
+        workers=None,
+        chunk_size=None,
+    ):
+        """
+        Create a table if not exists, and insert data into the table with worker processes.
+        The data is split into chunks, and each worker process sanitizes, converts, and
+        inserts a chunk into a temporary shard database file that has the same schema.
+        The shards are merged into the table by ``ATTACH`` and ``INSERT INTO ... SELECT``,
+        and then indices are created once for the merged table.
+
+        Attribute types of the table are the widest types of the shards
+        (``INTEGER`` < ``REAL`` < ``TEXT``).
+        Each shard is committed to the table when it is merged.
+
+        :param str table_name: Table name to create.
+        :param list attr_names: Attribute names of the table.
+        :param data_matrix: Data to be inserted into the table.
+        :type data_matrix: List of |dict|/|namedtuple|/|list|/|tuple|
+        :param str primary_key: |primary_key|
+        :param tuple index_attrs: |index_attrs|
+        :param int workers: Number of worker processes. Defaults to the number of CPUs.
+        :param int chunk_size:
+            Number of records of a shard. Defaults to split the data into a shard per worker.
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NameValidationError:
+            |raises_validate_table_name|
+        :raises simplesqlite.NameValidationError:
+            |raises_validate_attr_name|
+        :raises ValueError: If the ``data_matrix`` is empty.
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        .. seealso::
+            :py:meth:`.create_table_from_data_matrix`
+        """
+
+        import shutil
+        import tempfile
+
+        from ._parallel import get_default_workers, load_shard, merge_attr_types, run_in_processes
+
+        self.validate_access_permission(["w", "a"])
+
+        data_matrix = list(data_matrix)
+        if not data_matrix:
+            raise ValueError("input data_matrix is empty")
+
+        if workers is None:
+            workers = get_default_workers()
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(data_matrix) // workers))
+
+        if self.database_path in (None, MEMORY_DB_NAME) or self.__uri:
+            shard_dir = tempfile.mkdtemp(prefix="simplesqlite_")
+        else:
+            # create shards on the same file system as the database
+            shard_dir = tempfile.mkdtemp(
+                prefix="simplesqlite_", dir=os.path.dirname(os.path.abspath(self.database_path))
+            )
+
+        try:
+            tasks = [
+                (
+                    os.path.join(shard_dir, "shard_{:d}.sqlite".format(i)),
+                    table_name,
+                    attr_names,
+                    chunk,
+                    self.dup_col_handler,
+                )
+                for i, chunk in enumerate(self.__iter_chunks(data_matrix, chunk_size))
+            ]
+            shards = list(run_in_processes(load_shard, tasks, workers))
+
+            shard_table_name = shards[0][0]
+            attr_types = merge_attr_types([shard_attr_types for _name, shard_attr_types in shards])
+            self.create_table(
+                shard_table_name,
+                self.__make_attr_descs(attr_types, primary_key, add_primary_key_column),
+            )
+
+            attr_list = AttrList([attr_name for attr_name, _attr_type in attr_types])
+            merge_query = "INSERT INTO {table} ({attrs}) SELECT {attrs} FROM shard.{table}".format(
+                table=Table(shard_table_name), attrs=attr_list
+            )
+
+            # ATTACH/DETACH are not allowed within a transaction
+            self.commit()
+            for task in tasks:
+                self.execute_query("ATTACH DATABASE ? AS shard", params=[task[0]])
+                try:
+                    self.execute_query(merge_query)
+                    self.commit()
+                except Exception:
+                    self.rollback()
+                    raise
+                finally:
+                    self.execute_query("DETACH DATABASE shard")
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+
+        if is_not_empty_sequence(index_attrs):
+            self.create_index_list(shard_table_name, AttrList.sanitize(index_attrs))
+        self.commit()
+
+    def insert(self, table_name, record, attr_names=None):
+        """
+        Send an INSERT query to the database.
+
+        :param str table_name: Table name of executing the query.
+        :param record: Record to be inserted.
+        :type record: |dict|/|namedtuple|/|list|/|tuple|
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Example:
+            :ref:`example-insert-records`
+        """
+
+        self.insert_many(table_name, records=[record], attr_names=attr_names)
+
+    def insert_many(
+        self,
+        table_name,
+        records,
+        attr_names=None,
+        returning=None,
+        on_error="raise",
+        quarantine=None,
+    ):
+        """
+        Send an INSERT query with multiple records to the database.
+
+        :param str table: Table name of executing the query.
+        :param records: Records to be inserted.
+        :type records: list of |dict|/|namedtuple|/|list|/|tuple|
+        :param list returning:
+            Columns of the inserted records to be returned, e.g. ``["id"]``.
+            With SQLite 3.35.0 or later, the values are returned by a ``RETURNING`` clause.
+            With older SQLite, only the rowid (or the ``INTEGER PRIMARY KEY`` column) of
+            records inserted without explicit rowid values can be returned,
+            assuming the rowids are contiguous (no other writers to the table).
+        :param str on_error:
+            Behavior when some of the records failed to insert
+            (e.g. constraint violations):
+
+                - ``"raise"``: raise an error (no records inserted)
+                - ``"quarantine"``: insert the other records and pass
+                  the rejected records to the ``quarantine``.
+                  Failing records are located by bisecting the records with savepoints.
+                  Inserted records are committed
+                  unless the connection is already in a transaction.
+        :param quarantine:
+            Destination of rejected records when the ``on_error`` is ``"quarantine"``:
+            a callable that accepts a rejected record and its error message,
+            or a table name to store rejected records
+            (``table_name``, ``record`` as JSON, and ``error`` columns).
+        :type quarantine: callable/|str|
+        :return:
+            Number of inserted records.
+            List of tuples of the ``returning`` values of each inserted record
+            if the ``returning`` is specified.
+        :rtype: int/list
+        :raises ValueError:
+            If the ``returning`` is not supported by the SQLite version,
+            or the ``on_error``/``quarantine`` is invalid.
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Example:
+            :ref:`example-insert-records`
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                con.insert_many(
+                    "sample_table",
+                    records,
+                    on_error="quarantine",
+                    quarantine=lambda record, error: print(record, error))
+        """
+
+        if on_error not in self.__ON_ERROR_BEHAVIORS:
+            raise ValueError(
+                "invalid on_error: expected={}, actual={}".format(
+                    self.__ON_ERROR_BEHAVIORS, on_error
+                )
+            )
+        if on_error == "quarantine":
+            if quarantine is None:
+                raise ValueError("quarantine required for on_error='quarantine'")
+            if returning is not None:
+                raise ValueError("returning is not available for on_error='quarantine'")
+
+        self.validate_access_permission(["w", "a"])
+        self.verify_table_existence(table_name)
+
+        if attr_names:
+            logger.debug(
+                "insert {number} records into {table}({attrs})",
+                number=len(records) if records else 0,
+                table=table_name,
+                attrs=attr_names,
+            )
+        else:
+            logger.debug(
+                "insert {number} records into {table}",
+                number=len(records) if records else 0,
+                table=table_name,
+            )
+
+        if is_empty_sequence(records):
+            return 0 if returning is None else []
+
+        if attr_names is None:
+            attr_names = self.fetch_attr_names(table_name)
+        records = RecordConvertor.to_records(attr_names, records)
+        query = Insert(table_name, AttrList(attr_names)).to_query()
+
+        if self.debug_query or self.global_debug_query:
+            logging_count = 8
+            num_records = len(records)
+
+            logs = [query] + [
+                "    record {:4d}: {}".format(i, record)
+                for i, record in enumerate(records[:logging_count])
+            ]
+            if num_records - logging_count > 0:
+                logs.append(
+                    "    and other {} records will be inserted".format(num_records - logging_count)
+                )
+
+            logger.debug("{}", "\n".join(logs))
+
+        if on_error == "quarantine":
+            return self.__insert_with_quarantine(table_name, query, records, quarantine)
+
+        if returning is None:
+            self.__executemany(query, records, logging.getLogger().findCaller())
+            self.__autocommit(len(records))
+
+            return len(records)
+
+        returned_rows = self.__insert_returning(
+            table_name, attr_names, records, query, returning, logging.getLogger().findCaller()
+        )
+        self.__autocommit(len(records))
+
+        return returned_rows
+
+    def prepare_insert(self, table_name, columns=None, schema_name=None):
+        """
+        Build an INSERT statement once to be executed repeatedly with different records.
+        Executing the returned statement skips query building, name validation and
+        table existence checks.
+
+        :param str table_name: Table name of executing the query.
+        :param list columns:
+            Columns of the inserting records.
+            Defaults to all of the columns of the table.
+        :param str schema_name:
+            Schema name of the table: the name of an attached database.
+            Defaults to the main database.
+        :return: Callable that accepts records and returns the number of inserted records.
+        :rtype: simplesqlite._statement.PreparedInsert
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+
+        .. seealso:: :py:meth:`.insert_many`
+        """
+
+        self.validate_access_permission(["w", "a"])
+
+        if schema_name is None:
+            self.verify_table_existence(table_name)
+
+            if columns is None:
+                attr_names = self.fetch_attr_names(table_name)
+            else:
+                attr_names = self.__to_column_list(columns)
+            query = Insert(table_name, AttrList(attr_names)).to_query()
+        else:
+            qualified_name = "{}.{}".format(Table(schema_name), Table(table_name))
+            schema_attr_names = [
+                row[1]
+                for row in self.execute_query(
+                    "PRAGMA {}.table_info({})".format(Table(schema_name), Table(table_name))
+                ).fetchall()
+            ]
+            if not schema_attr_names:
+                raise TableNotFoundError(
+                    "'{}' table not found in '{}' schema of {}".format(
+                        table_name, schema_name, self.database_path
+                    )
+                )
+
+            if columns is None:
+                attr_names = schema_attr_names
+            else:
+                attr_names = self.__to_column_list(columns)
+            query = "INSERT INTO {:s}({:s}) VALUES ({:s})".format(
+                qualified_name,
+                ",".join([attr.to_query() for attr in AttrList(attr_names)]),
+                ",".join(["?"] * len(attr_names)),
+            )
+
+        return PreparedInsert(
+            query,
+            attr_names,
+            lambda records: self.__execute_prepared_insert(query, attr_names, records),
+        )
+
+    def upsert_many(
+        self,
+        table_name,
+        records,
+        conflict_target,
+        update_columns=None,
+        attr_names=None,
+        chunk_size=10000,
+    ):
+        """
+        Insert records into a table, or update the existing records
+        if the records conflict with a uniqueness constraint (UPSERT).
+        Records are converted and sent to the database by chunks,
+        so that the ``records`` can be an iterator of a large number of records.
+
+        With SQLite 3.24.0 or later, the query is
+        ``INSERT ... ON CONFLICT(...) DO UPDATE SET col=excluded.col``.
+        With older SQLite, the query falls back to ``UPDATE ... WHERE``
+        the ``conflict_target`` followed by ``INSERT`` of the records
+        that do not exist (``WHERE NOT EXISTS``).
+        Existing records are updated in place rather than replaced,
+        so that delete triggers (e.g. :py:meth:`.enable_row_counter`) are not bypassed,
+        and constraint violations (e.g. ``NOT NULL``) raise errors as the ``UPSERT`` does.
+
+        :param str table_name: Table name of executing the query.
+        :param records: Records to be inserted or updated.
+        :type records: iterable of |dict|/|namedtuple|/|list|/|tuple|
+        :param conflict_target:
+            Column name(s) of a uniqueness constraint (primary key or unique index).
+        :type conflict_target: |str|/|list|
+        :param list update_columns:
+            Columns to be updated when a conflict occurred.
+            Defaults to all of the columns except the ``conflict_target``.
+            Conflicting records are left unchanged if the value is an empty list.
+        :param list attr_names: Columns of the ``records``. Defaults to all of the columns.
+        :param int chunk_size: Number of records sent to the database at once.
+        :return:
+            Number of inserted or updated records.
+            Conflicting records left unchanged are not counted.
+        :rtype: int
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                con.upsert_many(
+                    "sample_table",
+                    [{"id": 1, "value": "a"}, {"id": 2, "value": "b"}],
+                    conflict_target="id")
+                con.commit()
+        """
+
+        self.validate_access_permission(["w", "a"])
+        self.verify_table_existence(table_name)
+
+        if attr_names is None:
+            attr_names = self.fetch_attr_names(table_name)
+        conflict_target = self.__to_column_list(conflict_target)
+        non_key_attr_names = [
+            attr_name for attr_name in attr_names if attr_name not in conflict_target
+        ]
+        if update_columns is None:
+            update_columns = non_key_attr_names
+
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            upsert_query = Upsert(
+                table_name,
+                AttrList(attr_names),
+                AttrList(conflict_target),
+                AttrList(update_columns),
+            ).to_query()
+            query_params = [(upsert_query, None)]
+        else:
+            # update existing records in place: INSERT OR REPLACE deletes conflicting records
+            # without firing delete triggers.
+            # records are inserted by a plain INSERT (not INSERT OR IGNORE)
+            # so that constraint violations are not silently ignored.
+            insert_query = (
+                "INSERT INTO {table:s}({attrs:s}) SELECT {values:s} "
+                "WHERE NOT EXISTS (SELECT 1 FROM {table:s} WHERE {key:s})"
+            ).format(
+                table=Table(table_name),
+                attrs=",".join([attr.to_query() for attr in AttrList(attr_names)]),
+                values=",".join(["?"] * len(attr_names)),
+                key=self.__make_key_condition(conflict_target),
+            )
+            query_params = [
+                (
+                    insert_query,
+                    list(range(len(attr_names)))
+                    + [list(attr_names).index(attr_name) for attr_name in conflict_target],
+                )
+            ]
+
+            if update_columns:
+                update_query = "UPDATE {:s} SET {:s} WHERE {:s}".format(
+                    Table(table_name),
+                    ",".join(["{}=?".format(attr) for attr in AttrList(update_columns)]),
+                    self.__make_key_condition(conflict_target),
+                )
+                param_indices = [
+                    list(attr_names).index(attr_name)
+                    for attr_name in list(update_columns) + conflict_target
+                ]
+                query_params.insert(0, (update_query, param_indices))
+
+        for query, _ in query_params:
+            logger.debug("upsert records into {}: {}", table_name, query)
+
+        caller = logging.getLogger().findCaller()
+        num_changes = 0
+        for chunk in self.__iter_chunks(records, chunk_size):
+            chunk = RecordConvertor.to_records(attr_names, chunk)
+            for query, param_indices in query_params:
+                if param_indices is not None:
+                    params = [[record[i] for i in param_indices] for record in chunk]
+                else:
+                    params = chunk
+                num_changes += self.__executemany(query, params, caller).rowcount
+            self.__autocommit(len(chunk))
+
+        return num_changes
+
+    def update(self, table_name, set_query, where=None, returning=None):
+        """Execute an UPDATE query.
+
+        Args:
+            table_name (|str|):
+                Table name of executing the query.
+            set_query (|str|):
+                ``SET`` clause for the update query.
+            where (|arg_where_type| , optional):
+                ``WHERE`` clause for the update query.
+                Defaults to |None|.
+            returning (|list|, optional):
+                Columns of the updated records to be returned by a ``RETURNING`` clause.
+                Requires SQLite 3.35.0 or later.
+                Defaults to |None|.
+
+        Returns:
+            The result of the query execution (|sqlite3.Cursor|).
+            List of tuples of the ``returning`` values of each updated record
+            if the ``returning`` is specified.
+
+        Raises:
+            ValueError:
+                If the ``returning`` is specified with SQLite older than 3.35.0.
+            IOError:
+                |raises_write_permission|
+            simplesqlite.NullDatabaseConnectionError:
+                |raises_check_connection|
+            simplesqlite.TableNotFoundError:
+                |raises_verify_table_existence|
+            simplesqlite.OperationalError:
+                |raises_operational_error|
+        """
+
+        self.validate_access_permission(["w", "a"])
+        self.verify_table_existence(table_name)
+
+        query = SqlQuery.make_update(table_name, set_query, where)
+
+        return self.__execute_returning(query, returning, logging.getLogger().findCaller())
+
+    def delete(self, table_name, where=None, returning=None):
+        """
+        Send a DELETE query to the database.
+
+        :param str table_name: Table name of executing the query.
+        :param where: |arg_select_where|
+        :type where: |arg_where_type|
+        :param list returning:
+            Columns of the deleted records to be returned by a ``RETURNING`` clause.
+            Requires SQLite 3.35.0 or later.
+        :return:
+            The result of the query execution.
+            List of tuples of the ``returning`` values of each deleted record
+            if the ``returning`` is specified.
+        :rtype: sqlite3.Cursor/list
+        :raises ValueError:
+            If the ``returning`` is specified with SQLite older than 3.35.0.
+        """
+
+        self.validate_access_permission(["w", "a"])
+        self.verify_table_existence(table_name)
+
+        query = "DELETE FROM {:s}".format(table_name)
+        if where:
+            query += " WHERE {:s}".format(where)
+
+        return self.__execute_returning(query, returning, logging.getLogger().findCaller())
+
+    def update_many(self, table_name, rows, key_columns, set_columns=None, chunk_size=10000):
+        """
+        Update records of a table with a parameterized ``UPDATE`` query:
+        each row consists of the key values that identify records and the new values.
+        Rows are sent to the database by chunks with ``executemany`` in a transaction.
+
+        :param str table_name: Table name of executing the query.
+        :param rows:
+            Rows of key values and new values.
+            A |list|/|tuple| row should be ordered as ``key_columns + set_columns``.
+        :type rows: iterable of |dict|/|namedtuple|/|list|/|tuple|
+        :param key_columns: Column name(s) to identify records to update.
+        :type key_columns: |str|/|list|
+        :param list set_columns:
+            Columns to be updated. Defaults to all of the columns except the ``key_columns``.
+        :param int chunk_size: Number of rows sent to the database at once.
+        :return: Number of updated records.
+        :rtype: int
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                con.update_many(
+                    "sample_table",
+                    [{"id": 1, "value": "a"}, {"id": 2, "value": "b"}],
+                    key_columns="id")
+        """
+
+        self.validate_access_permission(["w", "a"])
+        self.verify_table_existence(table_name)
+
+        key_columns = self.__to_column_list(key_columns)
+        if set_columns is None:
+            set_columns = [
+                attr_name
+                for attr_name in self.fetch_attr_names(table_name)
+                if attr_name not in key_columns
+            ]
+        if is_empty_sequence(set_columns):
+            raise ValueError("set_columns must not be empty")
+
+        query = "UPDATE {:s} SET {:s} WHERE {:s}".format(
+            Table(table_name),
+            ",".join(["{}=?".format(attr) for attr in AttrList(set_columns)]),
+            self.__make_key_condition(key_columns),
+        )
+        num_keys = len(key_columns)
+
+        return self.__executemany_in_transaction(
+            query,
+            rows,
+            lambda chunk: [
+                record[num_keys:] + record[:num_keys]
+                for record in RecordConvertor.to_records(key_columns + list(set_columns), chunk)
+            ],
+            chunk_size,
+            logging.getLogger().findCaller(),
+        )
+
+    def delete_many(self, table_name, keys, key_columns, chunk_size=10000):
+        """
+        Delete records of a table with a parameterized ``DELETE`` query.
+        Keys are sent to the database by chunks with ``executemany`` in a transaction.
+
+        :param str table_name: Table name of executing the query.
+        :param keys:
+            Key values of records to delete.
+            Each key is a scalar value if the ``key_columns`` is a |str|.
+        :type keys: iterable of scalar/|dict|/|namedtuple|/|list|/|tuple|
+        :param key_columns: Column name(s) to identify records to delete.
+        :type key_columns: |str|/|list|
+        :param int chunk_size: Number of keys sent to the database at once.
+        :return: Number of deleted records.
+        :rtype: int
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                con.delete_many("sample_table", [1, 2, 3], key_columns="id")
+        """
+
+        self.validate_access_permission(["w", "a"])
+        self.verify_table_existence(table_name)
+
+        is_scalar_key = not isinstance(key_columns, (list, tuple))
+        key_columns = self.__to_column_list(key_columns)
+        query = "DELETE FROM {:s} WHERE {:s}".format(
+            Table(table_name), self.__make_key_condition(key_columns)
+        )
+
+        def to_records(chunk):
+            if is_scalar_key:
+                return [[key] for key in chunk]
+
+            return RecordConvertor.to_records(key_columns, chunk)
+
+        return self.__executemany_in_transaction(
+            query, keys, to_records, chunk_size, logging.getLogger().findCaller()
+        )
+
+    def fetch_value(self, select, table_name, where=None, extra=None):
+        """
+        Fetch a value from the table. Return |None| if no value matches
+        the conditions, or the table not found in the database.
+
+        :param str select: Attribute for SELECT query
+        :param str table_name: Table name of executing the query.
+        :param where: |arg_select_where|
+        :type where: |arg_where_type|
+        :return: Result of execution of the query.
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+        """
+
+        return self.__fetch_with_result_cache(
+            ("fetch_value", select, table_name, where, extra),
+            lambda: self.__fetch_value(select, table_name, where, extra),
+        )
+
+    def fetch_values(self, select, table_name, where=None, extra=None):
+        return self.__fetch_with_result_cache(
+            ("fetch_values", select, table_name, where, extra),
+            lambda: self.__fetch_values(select, table_name, where, extra),
+            lambda values: list(values) if values is not None else values,
+        )
+
+    def fetch_table_names(self, include_system_table=False):
+        """
+        :return: List of table names in the database.
+        :rtype: list
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "w")
                 con.create_table_from_data_matrix(
                     "hoge",
                     ["attr_a", "attr_b"],
@@ -707,7 +1934,15 @@ class SimpleSQLite(object):
 
         self.check_connection()
 
-        return self.schema_extractor.fetch_table_names(include_system_table)
+        if self.__schema_cache is not None:
+            table_names = self.__schema_cache.fetch_table_names(self, include_system_table)
+        else:
+            table_names = self.schema_extractor.fetch_table_names(include_system_table)
+
+        if include_system_table:
+            return table_names
+
+        return [table_name for table_name in table_names if table_name != self.__ROW_COUNTER_TABLE]
 
     def fetch_table_name_list(self, include_system_table=False):
         warnings.warn(
@@ -753,6 +1988,9 @@ class SimpleSQLite(object):
 
         self.verify_table_existence(table_name)
 
+        if self.__schema_cache is not None:
+            return self.__schema_cache.fetch_attr_names(self, table_name)
+
         return self.schema_extractor.fetch_table_schema(table_name).get_attr_names()
 
     def fetch_attr_name_list(self, table_name):
@@ -792,13 +2030,21 @@ class SimpleSQLite(object):
 
         return dict([get_entry(item.split(" ")) for item in match.group().strip("()").split(", ")])
 
-    def fetch_num_records(self, table_name, where=None):
+    def fetch_num_records(self, table_name, where=None, estimate=False):
         """
         Fetch the number of records in a table.
+        If the ``where`` is |None|, the number of records is read from
+        the row counter of the table if the counter is enabled
+        by :py:meth:`.enable_row_counter`.
 
         :param str table_name: Table name to get number of records.
         :param where: |arg_select_where|
         :type where: |arg_where_type|
+        :param bool estimate:
+            If |True| and the ``where`` is |None|, return an approximate number of records
+            that collected by the latest ``ANALYZE`` (``sqlite_stat1`` table)
+            instead of counting the records.
+            Fall back to count the records if the statistics of the table not found.
         :return:
             Number of records in the table.
             |None| if no value matches the conditions,
@@ -806,9 +2052,14 @@ class SimpleSQLite(object):
         :rtype: int
         """
 
-        return self.fetch_value(select="COUNT(*)", table_name=table_name, where=where)
+        return self.__fetch_with_result_cache(
+            ("fetch_num_records", table_name, where, estimate),
+            lambda: self.__fetch_num_records(table_name, where, estimate),
+        )
 
     def fetch_data_types(self, table_name):
+        from ._common import extract_table_metadata
+
         _, _, type_hints = extract_table_metadata(self, table_name)
 
         return type_hints
@@ -865,6 +2116,46 @@ class SimpleSQLite(object):
 
         return [SqliteProfile(*profile) for profile in result.fetchall()]
 
+    def get_statement_cache_profile(self):
+        """
+        Get an estimation of the statement cache reuse of the connection.
+        Estimated from SQL texts executed via :py:meth:`.execute_query` and
+        the methods that use it, while the profiling is enabled.
+
+        :return:
+            Statistics of the statement cache:
+
+                - ``cached_statements``: size of the statement cache
+                - ``executions``: number of recorded executions
+                - ``hits``/``misses``/``hit_rate``: estimated statement cache hits/misses
+                - ``window_size``: number of executions in a window
+                - ``max_distinct_per_window``:
+                  maximum number of distinct SQL texts in a window.
+                  The statement cache is too small for the query mix if the value
+                  exceeds the ``cached_statements``.
+
+            |None| if the profiling is disabled.
+        :rtype: |namedtuple|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a", profile=True, cached_statements=512)
+                # execute queries
+                print(con.get_statement_cache_profile())
+
+        .. seealso:: :py:meth:`.get_profile`
+        """
+
+        self.check_connection()
+
+        if self.__statement_cache_profiler is None:
+            return None
+
+        return self.__statement_cache_profiler.stats
+
     def fetch_sqlite_master(self):
         """
         Get sqlite_master table information as a list of dictionaries.
@@ -945,6 +2236,8 @@ class SimpleSQLite(object):
                 False
         """
 
+        from .error import NameValidationError
+
         try:
             validate_table_name(table_name)
         except NameValidationError:
@@ -989,7 +2282,7 @@ class SimpleSQLite(object):
 
         self.verify_table_existence(table_name)
 
-        if typepy.is_null_string(attr_name):
+        if is_null_string(attr_name):
             return False
 
         return attr_name in self.fetch_attr_names(table_name)
@@ -1031,7 +2324,7 @@ class SimpleSQLite(object):
                 'not_existing' table not found in /tmp/sample.sqlite
         """
 
-        if typepy.is_empty_sequence(attr_names):
+        if is_empty_sequence(attr_names):
             return False
 
         not_exist_fields = [
@@ -1152,7 +2445,7 @@ class SimpleSQLite(object):
 
         self.check_connection()
 
-        if typepy.is_null_string(self.mode):
+        if is_null_string(self.mode):
             raise ValueError("mode is not set")
 
         if self.mode not in valid_permissions:
@@ -1170,6 +2463,8 @@ class SimpleSQLite(object):
         :raises IOError: |raises_write_permission|
         """
 
+        from sqliteschema import SQLITE_SYSTEM_TABLES
+
         self.validate_access_permission(["w", "a"])
 
         if table_name in SQLITE_SYSTEM_TABLES:
@@ -1243,7 +2538,7 @@ class SimpleSQLite(object):
 
         self.validate_access_permission(["w", "a"])
 
-        if typepy.is_empty_sequence(attr_names):
+        if is_empty_sequence(attr_names):
             return
 
         table_attr_set = set(self.fetch_attr_names(table_name))
@@ -1286,6 +2581,8 @@ class SimpleSQLite(object):
             :py:meth:`.create_index_list`
         """
 
+        from tabledata import TableData
+
         self.__create_table_from_tabledata(
             TableData(table_name, attr_names, data_matrix),
             primary_key,
@@ -1360,7 +2657,7 @@ class SimpleSQLite(object):
         import pytablereader as ptr
 
         loader = ptr.CsvTableFileLoader(csv_source)
-        if typepy.is_not_null_string(table_name):
+        if is_not_null_string(table_name):
             loader.table_name = table_name
         loader.headers = attr_names
         loader.delimiter = delimiter
@@ -1376,7 +2673,7 @@ class SimpleSQLite(object):
             pass
 
         loader = ptr.CsvTableTextLoader(csv_source)
-        if typepy.is_not_null_string(table_name):
+        if is_not_null_string(table_name):
             loader.table_name = table_name
         loader.headers = attr_names
         loader.delimiter = delimiter
@@ -1396,77 +2693,427 @@ class SimpleSQLite(object):
         index_attrs=None,
     ):
         """
-        Create a table from a JSON file/text.
+        Create a table from a JSON file/text.
+
+        :param str json_source: Path to the JSON file or JSON text.
+        :param str table_name: Table name to create.
+        :param str primary_key: |primary_key|
+        :param tuple index_attrs: |index_attrs|
+
+        :Dependency Packages:
+            - `pytablereader <https://github.com/thombashi/pytablereader>`__
+
+        :Examples:
+            :ref:`example-create-table-from-json`
+
+        .. seealso::
+            :py:meth:`.pytablereader.JsonTableFileLoader.load`
+            :py:meth:`.pytablereader.JsonTableTextLoader.load`
+        """
+
+        import pytablereader as ptr
+
+        loader = ptr.JsonTableFileLoader(json_source)
+        if is_not_null_string(table_name):
+            loader.table_name = table_name
+        try:
+            for table_data in loader.load():
+                self.__create_table_from_tabledata(
+                    table_data, primary_key, add_primary_key_column, index_attrs
+                )
+            return
+        except (ptr.InvalidFilePathError, IOError):
+            pass
+
+        loader = ptr.JsonTableTextLoader(json_source)
+        if is_not_null_string(table_name):
+            loader.table_name = table_name
+        for table_data in loader.load():
+            self.__create_table_from_tabledata(
+                table_data, primary_key, add_primary_key_column, index_attrs
+            )
+
+    def create_table_from_dataframe(
+        self,
+        dataframe,
+        table_name="",
+        primary_key=None,
+        add_primary_key_column=False,
+        index_attrs=None,
+    ):
+        """
+        Create a table from a pandas.DataFrame instance.
+
+        :param pandas.DataFrame dataframe: DataFrame instance to convert.
+        :param str table_name: Table name to create.
+        :param str primary_key: |primary_key|
+        :param tuple index_attrs: |index_attrs|
+
+        :Examples:
+            :ref:`example-create-table-from-df`
+        """
+
+        from tabledata import TableData
+
+        self.__create_table_from_tabledata(
+            TableData.from_dataframe(dataframe=dataframe, table_name=table_name),
+            primary_key,
+            add_primary_key_column,
+            index_attrs,
+        )
+
+    def dump(self, db_path, mode="a"):
+        with SimpleSQLite(db_path, mode=mode) as dst_con:
+            for table_name in self.fetch_table_names():
+                copy_table(self, dst_con, src_table_name=table_name, dst_table_name=table_name)
+
+    def enable_result_cache(self, maxsize=128, ttl=None, detect_external_changes=True):
+        """
+        Enable an LRU cache of the results of
+        :py:meth:`.select_as_dict`/:py:meth:`.fetch_value`/:py:meth:`.fetch_values`/
+        :py:meth:`.fetch_num_records`.
+        Results are cached by the method and its arguments.
+
+        The cache is invalidated when
+        :py:attr:`.total_changes` of the connection changed,
+        the connection executed a query other than ``SELECT`` (e.g. schema changes),
+        or a transaction was rolled back.
+
+        :param int maxsize: Maximum number of cached results.
+        :param float ttl:
+            Time-to-live of each cached result in seconds.
+            Cached results never expire if the value is |None|.
+        :param bool detect_external_changes:
+            If |True|, the cache is also invalidated when other connections changed
+            the database, by checking ``PRAGMA data_version`` for each cache lookup.
+            If |False|, cache lookups never access the database.
+        :raises ValueError: If the ``maxsize`` is invalid.
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "r")
+                con.enable_result_cache(maxsize=256, ttl=60)
+
+                for _ in range(100):
+                    con.fetch_num_records("sample_table")
+
+                print(con.result_cache_info)
+        :Output:
+            .. code-block:: none
+
+                CacheInfo(hits=99, misses=1, maxsize=256, currsize=1)
+        """
+
+        self.__result_cache = ResultCache(maxsize=maxsize, ttl=ttl)
+        self.__is_detect_external_changes = detect_external_changes
+
+    def disable_result_cache(self):
+        """
+        Disable the result cache.
+
+        .. seealso:: :py:meth:`.enable_result_cache`
+        """
+
+        self.__result_cache = None
+
+    def enable_row_counter(self, table_name):
+        """
+        Enable a row counter of a table.
+        The number of records of the table is stored in a side table,
+        and kept up to date by ``INSERT``/``DELETE`` triggers.
+        :py:meth:`.fetch_num_records` without ``where`` reads the counter
+        instead of counting the records.
+
+        .. note::
+            Rows replaced by ``INSERT OR REPLACE`` are counted correctly only when
+            ``PRAGMA recursive_triggers`` is enabled on the writing connection,
+            because SQLite does not fire delete triggers for replaced rows otherwise.
+
+        :param str table_name: Table name to count records.
+        :raises IOError: |raises_write_permission|
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.TableNotFoundError:
+            |raises_verify_table_existence|
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                con.enable_row_counter("sample_table")
+
+                # no table scan
+                print(con.fetch_num_records("sample_table"))
+        """
+
+        self.verify_table_existence(table_name)
+        self.validate_access_permission(["w", "a"])
+
+        counter_table = Table(self.__ROW_COUNTER_TABLE)
+        key = Value(table_name)
+
+        with self.transaction("immediate"):
+            self.execute_query(
+                "CREATE TABLE IF NOT EXISTS {:s} "
+                "(table_name TEXT PRIMARY KEY, num_records INTEGER NOT NULL)".format(counter_table)
+            )
+            self.execute_query(
+                "INSERT OR REPLACE INTO {:s} VALUES ({:s}, (SELECT COUNT(*) FROM {:s}))".format(
+                    counter_table, key, Table(table_name)
+                )
+            )
+
+            for event, operator in (("INSERT", "+"), ("DELETE", "-")):
+                query = (
+                    "CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table} BEGIN "
+                    "UPDATE {counter} SET num_records = num_records {operator} 1 "
+                    "WHERE table_name = {key}; END"
+                ).format(
+                    trigger=Table(self.__make_row_counter_trigger_name(table_name, event)),
+                    event=event,
+                    table=Table(table_name),
+                    counter=counter_table,
+                    operator=operator,
+                    key=key,
+                )
+                logger.debug(query)
+                self.execute_query(query, logging.getLogger().findCaller())
+
+    def disable_row_counter(self, table_name):
+        """
+        Disable the row counter of a table.
+
+        :param str table_name: Table name to stop counting records.
+        :raises IOError: |raises_write_permission|
+
+        .. seealso:: :py:meth:`.enable_row_counter`
+        """
+
+        self.validate_access_permission(["w", "a"])
+
+        if not self.__has_row_counter_table():
+            return
+
+        with self.transaction("immediate"):
+            for event in ("INSERT", "DELETE"):
+                self.execute_query(
+                    "DROP TRIGGER IF EXISTS {:s}".format(
+                        Table(self.__make_row_counter_trigger_name(table_name, event))
+                    )
+                )
+            self.execute_query(
+                "DELETE FROM {:s} WHERE table_name = {:s}".format(
+                    Table(self.__ROW_COUNTER_TABLE), Value(table_name)
+                )
+            )
+
+    def set_autocommit_policy(self, max_rows=None, max_interval=None):
+        """
+        Set a policy to commit records inserted by :py:meth:`.insert`/:py:meth:`.insert_many`
+        in batches, instead of committing per method call or leaving them uncommitted
+        until :py:meth:`.commit`/:py:meth:`.close`.
+        The policy is not applied to insertions within :py:meth:`.transaction`.
+
+        :param int max_rows:
+            Commit when the number of uncommitted inserted records reaches the value.
+        :param float max_interval:
+            Commit when the value seconds have elapsed since the first uncommitted insertion.
+            The elapsed time is checked when inserting records.
+
+        Disable the policy if both of the arguments are |None|.
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a")
+                con.set_autocommit_policy(max_rows=10000, max_interval=1.0)
+
+                for record in records:
+                    con.insert("sample_table", record)
+        """
+
+        self.__autocommit_max_rows = max_rows
+        self.__autocommit_max_interval = max_interval
+
+    def set_retry_policy(
+        self,
+        max_attempts=None,
+        initial_backoff=0.01,
+        max_backoff=1.0,
+        backoff_multiplier=2.0,
+        jitter=True,
+    ):
+        """
+        Set a policy to retry statements and commits that failed because
+        the database was locked/busy by other connections
+        (e.g. other processes writing to the same database file).
+        Other errors are not retried.
+        Statements executed within an open transaction
+        (e.g. within :py:meth:`.transaction`, or after uncommitted insertions)
+        are not retried either, because the transaction must be retried as a whole.
+
+        Each attempt waits up to the ``timeout`` (busy timeout) of the connection for
+        the lock to be released, then the attempt is retried after a backoff time that grows
+        exponentially: ``initial_backoff * backoff_multiplier ** (attempt - 1)``,
+        up to ``max_backoff``.
+
+        :param int max_attempts:
+            Maximum number of attempts, including the first one.
+            Disable the policy if the value is |None|.
+        :param float initial_backoff: Seconds to wait before the first retry.
+        :param float max_backoff: Upper limit of the seconds to wait before a retry.
+        :param float backoff_multiplier: Growth rate of the backoff time per attempt.
+        :param bool jitter:
+            Randomize the backoff time between zero and the computed value,
+            to avoid contending connections retrying in lockstep.
+        :raises ValueError: If the arguments are invalid.
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "a", timeout=1.0)
+                con.set_retry_policy(max_attempts=10, initial_backoff=0.05, max_backoff=2.0)
+
+                con.insert_many("sample_table", records)
+                con.commit()
+                print(con.retry_stats)
+
+        .. seealso:: :py:attr:`.retry_stats`
+        """
+
+        if max_attempts is None:
+            self.__retry_policy = None
+            return
+
+        self.__retry_policy = RetryPolicy(
+            max_attempts=max_attempts,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+            backoff_multiplier=backoff_multiplier,
+            jitter=jitter,
+        )
+
+    def is_in_transaction(self):
+        """
+        :return: |True| if the connection is within :py:meth:`.transaction`.
+        :rtype: bool
+        """
+
+        return self.__transaction_depth > 0
+
+    @contextmanager
+    def transaction(self, mode="deferred"):
+        """
+        Context manager that executes operations within a transaction.
+        The transaction is committed when exiting the context without an exception,
+        otherwise rolled back.
 
-        :param str json_source: Path to the JSON file or JSON text.
-        :param str table_name: Table name to create.
-        :param str primary_key: |primary_key|
-        :param tuple index_attrs: |index_attrs|
+        Nested calls create savepoints within the outermost transaction:
+        an exception in a nested context rolls back only the operations of the nested context.
+        :py:meth:`.commit` calls (including the implicit commits of
+        ``create_table_from_*``/:py:meth:`.drop_table`) within the context are deferred to
+        the end of the outermost transaction, so that multiple operations are committed at once.
 
-        :Dependency Packages:
-            - `pytablereader <https://github.com/thombashi/pytablereader>`__
+        If the connection is already in a transaction that implicitly started by
+        uncommitted operations (e.g. :py:meth:`.insert` without :py:meth:`.commit`),
+        the outermost context creates a savepoint within the transaction instead:
+        the transaction is neither committed when entering nor exiting the context,
+        and left to :py:meth:`.commit`/:py:meth:`.rollback` of the caller.
+        The ``mode`` is not applied in that case.
 
-        :Examples:
-            :ref:`example-create-table-from-json`
+        Note that the :py:mod:`sqlite3` module of Python 3.5 or older implicitly commits
+        the current transaction before executing statements other than
+        ``INSERT``/``UPDATE``/``DELETE``/``REPLACE``/``SELECT``
+        (e.g. ``CREATE TABLE``, ``DROP TABLE``, ``SAVEPOINT``)
+        unless the ``isolation_level`` is |None|.
+        Operations within the context are not atomic with such Python versions
+        if the context includes those statements.
 
-        .. seealso::
-            :py:meth:`.pytablereader.JsonTableFileLoader.load`
-            :py:meth:`.pytablereader.JsonTableTextLoader.load`
-        """
+        :param str mode:
+            Transaction mode of the outermost transaction:
+            ``"deferred"``/``"immediate"``/``"exclusive"``.
+        :raises ValueError: If the ``mode`` is invalid.
+        :raises simplesqlite.NullDatabaseConnectionError:
+            |raises_check_connection|
+        :raises simplesqlite.OperationalError: |raises_operational_error|
 
-        import pytablereader as ptr
+        :Sample Code:
+            .. code:: python
 
-        loader = ptr.JsonTableFileLoader(json_source)
-        if typepy.is_not_null_string(table_name):
-            loader.table_name = table_name
-        try:
-            for table_data in loader.load():
-                self.__create_table_from_tabledata(
-                    table_data, primary_key, add_primary_key_column, index_attrs
-                )
-            return
-        except (ptr.InvalidFilePathError, IOError):
-            pass
+                from simplesqlite import SimpleSQLite
 
-        loader = ptr.JsonTableTextLoader(json_source)
-        if typepy.is_not_null_string(table_name):
-            loader.table_name = table_name
-        for table_data in loader.load():
-            self.__create_table_from_tabledata(
-                table_data, primary_key, add_primary_key_column, index_attrs
-            )
+                con = SimpleSQLite("sample.sqlite", "a")
 
-    def create_table_from_dataframe(
-        self,
-        dataframe,
-        table_name="",
-        primary_key=None,
-        add_primary_key_column=False,
-        index_attrs=None,
-    ):
+                with con.transaction(mode="immediate"):
+                    con.create_table_from_data_matrix("sample_table", ["a", "b"], [[1, 2]])
+                    try:
+                        with con.transaction():
+                            con.insert("sample_table", [3, 4])
+                            raise ValueError()
+                    except ValueError:
+                        pass  # only [3, 4] is rolled back
         """
-        Create a table from a pandas.DataFrame instance.
 
-        :param pandas.DataFrame dataframe: DataFrame instance to convert.
-        :param str table_name: Table name to create.
-        :param str primary_key: |primary_key|
-        :param tuple index_attrs: |index_attrs|
+        mode = mode.upper()
+        if mode not in self.__TRANSACTION_MODES:
+            raise ValueError("invalid transaction mode: {}".format(mode))
 
-        :Examples:
-            :ref:`example-create-table-from-df`
-        """
+        self.check_connection()
 
-        self.__create_table_from_tabledata(
-            TableData.from_dataframe(dataframe=dataframe, table_name=table_name),
-            primary_key,
-            add_primary_key_column,
-            index_attrs,
-        )
+        depth = self.__transaction_depth
+        savepoint = "simplesqlite_savepoint_{:d}".format(depth)
 
-    def dump(self, db_path, mode="a"):
-        with SimpleSQLite(db_path, mode=mode) as dst_con:
-            for table_name in self.fetch_table_names():
-                copy_table(self, dst_con, src_table_name=table_name, dst_table_name=table_name)
+        # Connection.in_transaction is not available with Python 2
+        in_transaction = self.__is_connection_in_transaction(default=None)
+        is_outermost = depth == 0 and not in_transaction
+
+        if is_outermost:
+            if in_transaction is None:
+                # transaction state is unknown: commit a transaction that may be started
+                self.connection.commit()
+            self.execute_query("BEGIN {:s}".format(mode))
+        else:
+            # nested context, or the outermost context within an implicitly started transaction
+            self.execute_query("SAVEPOINT {:s}".format(savepoint))
+
+        self.__transaction_depth += 1
+
+        try:
+            yield self
+        except BaseException:
+            self.__transaction_depth -= 1
+
+            if self.__is_connection_in_transaction(default=True):
+                if is_outermost:
+                    self.rollback()
+                else:
+                    self.execute_query("ROLLBACK TO {:s}".format(savepoint))
+                    self.execute_query("RELEASE {:s}".format(savepoint))
+            raise
+
+        self.__transaction_depth -= 1
+
+        if not self.__is_connection_in_transaction(default=True):
+            return
+
+        if not is_outermost:
+            self.execute_query("RELEASE {:s}".format(savepoint))
+            return
+
+        try:
+            self.commit()
+        except sqlite3.Error as e:
+            self.rollback()
+            raise OperationalError(e)
 
     def rollback(self):
         """
@@ -1478,12 +3125,19 @@ class SimpleSQLite(object):
         except NullDatabaseConnectionError:
             return
 
-        logger.debug("rollback: path='{}'".format(self.database_path))
+        logger.debug("rollback: path='{}'", self.database_path)
 
         self.connection.rollback()
+        self.__num_uncommitted_rows = 0
+        if self.__result_cache is not None:
+            self.__result_cache.clear()
 
     def commit(self):
         """
+        Commit the current transaction.
+        Do nothing within :py:meth:`.transaction`:
+        changes are committed at the end of the outermost transaction.
+
         .. seealso:: :py:meth:`sqlite3.Connection.commit`
         """
 
@@ -1492,13 +3146,19 @@ class SimpleSQLite(object):
         except NullDatabaseConnectionError:
             return
 
-        logger.debug("commit: path='{}'".format(self.database_path))
+        if self.__transaction_depth > 0:
+            return
+
+        logger.debug("commit: path='{}'", self.database_path)
 
         try:
-            self.connection.commit()
+            # a commit that failed with SQLITE_BUSY can be retried in the same transaction
+            self.__call_with_retry(self.connection.commit, retry_in_transaction=True)
         except sqlite3.ProgrammingError:
             pass
 
+        self.__num_uncommitted_rows = 0
+
     def close(self):
         """
         Commit and close the connection.
@@ -1515,24 +3175,102 @@ class SimpleSQLite(object):
         except (SystemError, NullDatabaseConnectionError):
             return
 
-        logger.debug("close connection to a SQLite database: path='{}'".format(self.database_path))
+        logger.debug("close connection to a SQLite database: path='{}'", self.database_path)
 
+        self.stop_checkpoint_manager()
         self.commit()
         self.connection.close()
         self.__initialize_connection()
 
+    def start_checkpoint_manager(self, **kwargs):
+        """
+        Start a background checkpoint manager for the connected database.
+        Automatic checkpoints of the connection are disabled while the manager running,
+        to move checkpoint work off from the writing thread.
+
+        :param kwargs:
+            Keyword arguments for :py:class:`~simplesqlite.checkpoint.CheckpointManager`.
+        :return: Started checkpoint manager.
+        :rtype: simplesqlite.checkpoint.CheckpointManager
+        :raises IOError: |raises_write_permission|
+        :raises ValueError:
+            If the database is an in-memory database or not in WAL mode.
+
+        :Sample Code:
+            .. code:: python
+
+                from simplesqlite import SimpleSQLite
+
+                con = SimpleSQLite("sample.sqlite", "w", journal_mode="wal")
+                manager = con.start_checkpoint_manager(wal_size_threshold=16 * 1024 ** 2)
+
+                ...
+
+                print(manager.metrics)
+                con.close()
+        """
+
+        from .checkpoint import CheckpointManager
+
+        self.validate_access_permission(["w", "a"])
+
+        if self.__checkpoint_manager is not None:
+            return self.__checkpoint_manager
+
+        if self.database_path == MEMORY_DB_NAME:
+            raise ValueError("checkpoint manager is not available for an in-memory database")
+        if self.journal_mode != "wal":
+            raise ValueError("checkpoint manager requires 'wal' journal mode")
+
+        self.__wal_autocheckpoint = self.connection.execute(
+            "PRAGMA wal_autocheckpoint"
+        ).fetchone()[0]
+        self.connection.execute("PRAGMA wal_autocheckpoint=0")
+
+        self.__checkpoint_manager = CheckpointManager(self.database_path, **kwargs)
+        self.__checkpoint_manager.start()
+
+        return self.__checkpoint_manager
+
+    def stop_checkpoint_manager(self):
+        """
+        Stop the background checkpoint manager if running, and restore
+        automatic checkpoints of the connection.
+
+        .. seealso:: :py:meth:`.start_checkpoint_manager`
+        """
+
+        if self.__checkpoint_manager is None:
+            return
+
+        self.__checkpoint_manager.stop()
+        self.__checkpoint_manager = None
+
+        self.connection.execute("PRAGMA wal_autocheckpoint={:d}".format(self.__wal_autocheckpoint))
+
     def __initialize_connection(self):
         self.__database_path = None
         self.__connection = None
         self.__mode = None
         self.__delayed_connection_path = None
+        self.__checkpoint_manager = None
+        self.__wal_autocheckpoint = None
+        self.__transaction_depth = 0
+        self.__num_uncommitted_rows = 0
+        self.__uncommitted_since = None
 
         self.__dict_query_count = {}
         self.__dict_query_totalexectime = {}
+        self.__statement_cache_profiler = None
+
+    def __is_connection_in_transaction(self, default):
+        # Connection.in_transaction is not available with Python 2:
+        # the default value is used instead
+        return getattr(self.connection, "in_transaction", default)
 
     @staticmethod
     def __validate_db_path(database_path):
-        if typepy.is_null_string(database_path):
+        if is_null_string(database_path):
             raise ValueError("null path")
 
         if database_path == MEMORY_DB_NAME:
@@ -1545,19 +3283,385 @@ class SimpleSQLite(object):
 
     def __verify_db_file_existence(self, database_path):
         """
-        :raises SimpleSQLite.OperationalError: If unable to open database file.
+        :raises IOError: If the database file not found.
         """
 
         self.__validate_db_path(database_path)
         if not os.path.isfile(os.path.realpath(database_path)):
             raise IOError("file not found: " + database_path)
 
+    def __executemany(self, query, records, caller):
+        if self.__statement_cache_profiler is not None:
+            self.__statement_cache_profiler.record(query)
+
+        try:
+            return self.__call_with_retry(self.connection.executemany, [query, records])
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as e:
+            raise self.__make_executemany_error(query, records, e, caller)
+
+    def __call_with_retry(self, func, args=(), retry_in_transaction=False):
+        attempt = 1
+
+        # a statement within an open transaction is not retried:
+        # the transaction may hold a stale snapshot (SQLITE_BUSY_SNAPSHOT) or
+        # a lock that the other connection is waiting for, and must be restarted as a whole
+        is_retryable = retry_in_transaction or not self.__is_connection_in_transaction(default=True)
+
+        while True:
+            start_time = time.time()
+
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                if not RetryPolicy.is_lock_error(e):
+                    raise
+
+                self.__num_lock_errors += 1
+                self.__lock_wait_time += time.time() - start_time
+
+                retry_policy = self.__retry_policy
+                if retry_policy is None or not is_retryable or attempt >= retry_policy.max_attempts:
+                    self.__num_lock_failures += 1
+                    raise
+
+                if not retry_in_transaction and self.__is_connection_in_transaction(default=False):
+                    # discard the transaction implicitly started by the failed statement
+                    self.connection.rollback()
+
+                backoff = retry_policy.get_backoff(attempt)
+                logger.debug(
+                    "retry after {:f} seconds: path='{}', attempt={}, msg='{}'",
+                    backoff,
+                    self.database_path,
+                    attempt,
+                    e,
+                )
+
+                time.sleep(backoff)
+                self.__backoff_time += backoff
+                self.__num_retries += 1
+                attempt += 1
+
+    def __verify_parallel_source(self, table_name):
+        self.verify_table_existence(table_name)
+
+        if self.database_path in (None, MEMORY_DB_NAME) or self.__uri:
+            raise ValueError("parallel processing requires a connection to a database file")
+
+        return self.database_path
+
+    @staticmethod
+    def __make_range_condition(key, where):
+        condition = "{} BETWEEN ? AND ?".format(Attr(key))
+
+        if where:
+            return "({}) AND {}".format(where, condition)
+
+        return condition
+
+    def __execute_prepared_insert(self, query, attr_names, records):
+        if is_empty_sequence(records):
+            return 0
+
+        records = RecordConvertor.to_records(attr_names, records)
+        self.__executemany(query, records, caller=None)
+        self.__autocommit(len(records))
+
+        return len(records)
+
+    def __make_executemany_error(self, query, records, error, caller):
+        if caller is None:
+            caller = logging.getLogger().findCaller()
+        file_path, line_no, func_name = caller[:3]
+
+        return OperationalError(
+            "{:s}({:d}) {:s}: failed to execute query:\n".format(file_path, line_no, func_name)
+            + "  query={}\n".format(query)
+            + "  msg='{}'\n".format(error)
+            + "  db={}\n".format(self.database_path)
+            + "  records={}\n".format(records[:2])
+        )
+
+    def __execute_returning(self, query, returning, caller):
+        if returning is None:
+            return self.execute_query(query, caller)
+
+        self.__validate_returning_support()
+
+        return self.execute_query(
+            "{:s} RETURNING {}".format(query, AttrList(self.__to_column_list(returning))), caller
+        ).fetchall()
+
+    def __insert_returning(self, table_name, attr_names, records, query, returning, caller):
+        returning = self.__to_column_list(returning)
+
+        if sqlite3.sqlite_version_info >= self.__RETURNING_VERSION:
+            query = "{:s} RETURNING {}".format(query, AttrList(returning))
+            returned_rows = []
+
+            for record in records:
+                try:
+                    returned_rows.append(
+                        tuple(self.connection.execute(query, record).fetchall()[0])
+                    )
+                except (sqlite3.OperationalError, sqlite3.IntegrityError) as e:
+                    raise self.__make_executemany_error(query, [record], e, caller)
+
+            return returned_rows
+
+        # contiguous rowids fallback: rowids of records inserted by a single writer
+        rowid_alias = self.__fetch_rowid_alias(table_name)
+        if len(returning) != 1 or returning[0] not in ("rowid", rowid_alias):
+            self.__validate_returning_support()
+
+        if rowid_alias in attr_names:
+            rowid_index = attr_names.index(rowid_alias)
+            if any(record[rowid_index] is not None for record in records):
+                raise ValueError("cannot return rowids of records that have explicit rowid values")
+
+        self.__executemany(query, records, caller)
+        last_rowid = self.connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        return [(rowid,) for rowid in range(last_rowid - len(records) + 1, last_rowid + 1)]
+
+    def __insert_with_quarantine(self, table_name, query, records, quarantine):
+        rejected_list = []
+        num_inserted = 0
+
+        with self.transaction():
+            for chunk in self.__iter_chunks(records, self.__QUARANTINE_CHUNK_SIZE):
+                num_inserted += self.__insert_bisect(query, chunk, rejected_list)
+
+            if rejected_list and not callable(quarantine):
+                self.execute_query(
+                    "CREATE TABLE IF NOT EXISTS {:s} "
+                    "(table_name TEXT, record TEXT, error TEXT)".format(Table(quarantine))
+                )
+                self.connection.executemany(
+                    "INSERT INTO {:s} VALUES (?,?,?)".format(Table(quarantine)),
+                    [
+                        (table_name, json.dumps(record, default=six.text_type), message)
+                        for record, message in rejected_list
+                    ],
+                )
+
+        if rejected_list:
+            logger.debug("quarantine {} records rejected from {}", len(rejected_list), table_name)
+
+        if callable(quarantine):
+            for record, message in rejected_list:
+                quarantine(record, message)
+
+        return num_inserted
+
+    def __insert_bisect(self, query, records, rejected_list):
+        try:
+            with self.transaction():
+                self.connection.executemany(query, records)
+
+            return len(records)
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError) as e:
+            if len(records) == 1:
+                rejected_list.append((records[0], six.text_type(e)))
+                return 0
+
+        pivot = len(records) // 2
+
+        return self.__insert_bisect(query, records[:pivot], rejected_list) + self.__insert_bisect(
+            query, records[pivot:], rejected_list
+        )
+
+    def __fetch_rowid_alias(self, table_name):
+        primary_keys = [
+            (name, data_type)
+            for _cid, name, data_type, _notnull, _default, pk in self.connection.execute(
+                "PRAGMA table_info({})".format(Table(table_name))
+            )
+            if pk
+        ]
+        if len(primary_keys) == 1 and primary_keys[0][1].upper() == "INTEGER":
+            return primary_keys[0][0]
+
+        return None
+
+    def __validate_returning_support(self):
+        if sqlite3.sqlite_version_info < self.__RETURNING_VERSION:
+            raise ValueError(
+                "RETURNING clause requires SQLite {} or later: actual={}".format(
+                    ".".join([six.text_type(v) for v in self.__RETURNING_VERSION]),
+                    sqlite3.sqlite_version,
+                )
+            )
+
+    def __executemany_in_transaction(self, query, rows, to_records, chunk_size, caller):
+        logger.debug(query)
+
+        num_changes = 0
+        with self.transaction():
+            for chunk in self.__iter_chunks(rows, chunk_size):
+                num_changes += self.__executemany(query, to_records(chunk), caller).rowcount
+
+        return num_changes
+
+    @staticmethod
+    def __to_column_list(columns):
+        if isinstance(columns, (list, tuple)):
+            return list(columns)
+
+        return [columns]
+
+    @staticmethod
+    def __make_key_condition(key_columns):
+        return " AND ".join(["{}=?".format(attr) for attr in AttrList(key_columns)])
+
+    @staticmethod
+    def __iter_chunks(records, chunk_size):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be greater than zero: actual={}".format(chunk_size))
+
+        iterator = iter(records)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                break
+
+            yield chunk
+
+    def __fetch_value(self, select, table_name, where, extra):
+        try:
+            self.verify_table_existence(table_name)
+        except TableNotFoundError as e:
+            logger.debug(e)
+            return None
+
+        result = self.execute_query(
+            Select(select, table_name, where, extra), logging.getLogger().findCaller()
+        )
+        if result is None:
+            return None
+
+        fetch = result.fetchone()
+        if fetch is None:
+            return None
+
+        return fetch[0]
+
+    def __fetch_values(self, select, table_name, where, extra):
+        result = self.select(select=select, table_name=table_name, where=where, extra=extra)
+        if result is None:
+            return None
+
+        return [record[0] for record in result.fetchall()]
+
+    def __has_row_counter_table(self):
+        return self.__ROW_COUNTER_TABLE in self.fetch_table_names(include_system_table=True)
+
+    def __fetch_num_records(self, table_name, where, estimate):
+        self.check_connection()
+
+        if where is None:
+            query_list = [
+                (
+                    "SELECT num_records FROM {:s} WHERE table_name = ? AND EXISTS "
+                    "(SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?)"
+                ).format(self.__ROW_COUNTER_TABLE),
+            ]
+            param_list = [
+                (table_name, self.__make_row_counter_trigger_name(table_name, "DELETE")),
+            ]
+            if estimate:
+                # the first number of the stat column is the number of records
+                query_list.append("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1")
+                param_list.append((table_name,))
+
+            for query, params in zip(query_list, param_list):
+                try:
+                    fetch = self.connection.execute(query, params).fetchone()
+                except sqlite3.OperationalError:
+                    # the row counter table or the statistics table not exists
+                    continue
+
+                if fetch is not None:
+                    return int(six.text_type(fetch[0]).split()[0])
+
+        return self.__fetch_value("COUNT(*)", table_name, where, None)
+
+    def __fetch_with_result_cache(self, key, fetch_func, copy_func=None):
+        result_cache = self.__result_cache
+        if result_cache is None:
+            return fetch_func()
+
+        self.check_connection()
+
+        if self.__is_detect_external_changes:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        else:
+            data_version = None
+        result_cache.validate((self.connection.total_changes, data_version))
+
+        key = tuple(
+            tuple(six.text_type(item) for item in arg)
+            if isinstance(arg, (list, tuple))
+            else (arg if arg is None else six.text_type(arg))
+            for arg in key
+        )
+        is_hit, value = result_cache.get(key)
+        if not is_hit:
+            value = fetch_func()
+            result_cache.set(key, value)
+
+        if copy_func is None:
+            return value
+
+        return copy_func(value)
+
+    def __make_row_counter_trigger_name(self, table_name, event):
+        return "{:s}_{:s}_{:s}".format(self.__ROW_COUNTER_TABLE, event.lower(), table_name)
+
+    def __autocommit(self, num_rows):
+        if self.__transaction_depth > 0:
+            return
+        if self.__autocommit_max_rows is None and self.__autocommit_max_interval is None:
+            return
+
+        now = time.time()
+        if self.__num_uncommitted_rows == 0:
+            self.__uncommitted_since = now
+        self.__num_uncommitted_rows += num_rows
+
+        if (
+            self.__autocommit_max_rows is not None
+            and self.__num_uncommitted_rows >= self.__autocommit_max_rows
+        ) or (
+            self.__autocommit_max_interval is not None
+            and now - self.__uncommitted_since >= self.__autocommit_max_interval
+        ):
+            self.commit()
+
+    def __set_journal_mode(self, journal_mode):
         try:
-            connection = sqlite3.connect(database_path)
+            result = self.connection.execute(
+                "PRAGMA journal_mode={:s}".format(journal_mode)
+            ).fetchone()[0]
         except sqlite3.OperationalError as e:
             raise OperationalError(e)
 
-        connection.close()
+        if result != journal_mode.lower():
+            raise OperationalError(
+                "failed to change journal mode: expected={}, actual={}, db={}".format(
+                    journal_mode, result, self.database_path
+                )
+            )
+
+    @staticmethod
+    def __make_readonly_uri(database_path, immutable):
+        from six.moves.urllib.request import pathname2url
+
+        uri = "file:{:s}?mode=ro".format(pathname2url(database_path))
+        if immutable:
+            uri += "&immutable=1"
+
+        return uri
 
     def __delayed_connect(self):
         if self.__delayed_connection_path is None:
@@ -1568,7 +3672,18 @@ class SimpleSQLite(object):
         connection_path = self.__delayed_connection_path
         self.__delayed_connection_path = None
 
-        self.connect(connection_path, self.__mode)
+        self.connect(
+            connection_path,
+            self.__mode,
+            immutable=self.__immutable,
+            journal_mode=self.__journal_mode,
+            check_same_thread=self.__check_same_thread,
+            timeout=self.__timeout,
+            detect_types=self.__detect_types,
+            isolation_level=self.__isolation_level,
+            cached_statements=self.__cached_statements,
+            uri=self.__uri,
+        )
 
         return True
 
@@ -1582,7 +3697,22 @@ class SimpleSQLite(object):
         return [record[0] for record in result]
 
     def __extract_attr_descs_from_tabledata(self, table_data, primary_key, add_primary_key_column):
-        if primary_key and not add_primary_key_column and primary_key not in table_data.headers:
+        return self.__make_attr_descs(
+            [
+                (table_data.headers[col], value_type)
+                for col, value_type in sorted(
+                    six.iteritems(self.__extract_col_type_from_tabledata(table_data))
+                )
+            ],
+            primary_key,
+            add_primary_key_column,
+        )
+
+    @staticmethod
+    def __make_attr_descs(attr_types, primary_key, add_primary_key_column):
+        attr_names = [attr_name for attr_name, _value_type in attr_types]
+
+        if primary_key and not add_primary_key_column and primary_key not in attr_names:
             raise ValueError("primary key must be one of the values of attributes")
 
         attr_description_list = []
@@ -1591,7 +3721,7 @@ class SimpleSQLite(object):
             if not primary_key:
                 primary_key = "id"
 
-            if primary_key in table_data.headers:
+            if primary_key in attr_names:
                 raise ValueError(
                     "a primary key field that will be added should not conflict "
                     "with existing fields."
@@ -1599,10 +3729,7 @@ class SimpleSQLite(object):
 
             attr_description_list.append("{} INTEGER PRIMARY KEY AUTOINCREMENT".format(primary_key))
 
-        for col, value_type in sorted(
-            six.iteritems(self.__extract_col_type_from_tabledata(table_data))
-        ):
-            attr_name = table_data.headers[col]
+        for attr_name, value_type in attr_types:
             attr_description = "{} {:s}".format(Attr(attr_name), value_type)
             if attr_name == primary_key:
                 attr_description += " PRIMARY KEY"
@@ -1621,6 +3748,8 @@ class SimpleSQLite(object):
         :rtype: dictionary
         """
 
+        import typepy
+
         typename_table = {
             typepy.Typecode.INTEGER: "INTEGER",
             typepy.Typecode.REAL_NUMBER: "REAL",
@@ -1639,18 +3768,27 @@ class SimpleSQLite(object):
     ):
         self.validate_access_permission(["w", "a"])
 
-        debug_msg_list = ["__create_table_from_tabledata:", "    tbldata={}".format(table_data)]
+        # the representation of the table data is rendered only if the logger is enabled
+        debug_msg_list = ["__create_table_from_tabledata:", "    tbldata={table_data}"]
         if primary_key:
-            debug_msg_list.append("    primary_key={}".format(primary_key))
+            debug_msg_list.append("    primary_key={primary_key}")
         if add_primary_key_column:
-            debug_msg_list.append("    add_primary_key_column={}".format(add_primary_key_column))
+            debug_msg_list.append("    add_primary_key_column={add_primary_key_column}")
         if index_attrs:
-            debug_msg_list.append("    index_attrs={}".format(index_attrs))
-        logger.debug("\n".join(debug_msg_list))
+            debug_msg_list.append("    index_attrs={index_attrs}")
+        logger.debug(
+            "\n".join(debug_msg_list),
+            table_data=table_data,
+            primary_key=primary_key,
+            add_primary_key_column=add_primary_key_column,
+            index_attrs=index_attrs,
+        )
 
         if table_data.is_empty():
             raise ValueError("input table_data is empty: {}".format(table_data))
 
+        from ._sanitizer import SQLiteTableDataSanitizer
+
         table_data = SQLiteTableDataSanitizer(
             table_data, dup_col_handler=self.dup_col_handler
         ).normalize()
@@ -1669,7 +3807,7 @@ class SimpleSQLite(object):
         else:
             self.insert_many(table_data.table_name, table_data.value_matrix)
 
-        if typepy.is_not_empty_sequence(index_attrs):
+        if is_not_empty_sequence(index_attrs):
             self.create_index_list(table_data.table_name, AttrList.sanitize(index_attrs))
         self.commit()
 
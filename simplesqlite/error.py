@@ -5,8 +5,25 @@
 """
 
 import sqlite3
+import sys
 
-from tabledata import NameValidationError  # noqa: W0611
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        # defer importing tabledata (and its dependencies) until the exception is used
+        if name == "NameValidationError":
+            from tabledata import NameValidationError
+
+            globals()[name] = NameValidationError
+
+            return NameValidationError
+
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+else:
+    from tabledata import NameValidationError  # noqa: W0611
 
 
 class DatabaseError(sqlite3.DatabaseError):
@@ -38,6 +55,13 @@ class AttributeNotFoundError(DatabaseError):
     """
 
 
+class PoolTimeoutError(DatabaseError):
+    """
+    Exception raised when failed to acquire a connection from
+    :py:class:`~simplesqlite.SimpleSQLitePool` within the timeout.
+    """
+
+
 class SqlSyntaxError(Exception):
     """
     Exception raised when a SQLite query syntax is invalid.
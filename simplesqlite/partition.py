@@ -0,0 +1,626 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import datetime
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+
+import six
+
+from ._logger import logger
+from .converter import RecordConvertor
+from .core import connect_memdb
+from .error import AttributeNotFoundError, TableNotFoundError
+from .query import Attr, Table, make_index_name
+
+
+class PartitionedTable(object):
+    """
+    Table that partitioned by time into per-day or per-month child tables.
+    Records are routed to the child tables by the value of the ``time_attr`` attribute,
+    and expired records are removed by dropping whole child tables:
+    no rows are deleted one by one.
+
+    Child tables are named ``<table_name>_p<YYYYMMDD>`` (``<YYYYMM>`` for monthly partitions)
+    in the database of the ``con``.
+    If the ``attach_dir`` is specified, each child table is created in a separate
+    database file ``<attach_dir>/<table_name>_p<YYYYMMDD>.sqlite``, and the file is attached
+    to the ``con`` with the same schema name as the file name.
+    Records are written through the ``con`` to the attached databases.
+    The number of attached databases is limited by SQLite
+    (``SQLITE_MAX_ATTACHED``: ten by default), so that the files are attached on demand:
+    partitions of a :py:meth:`.select` time range or an :py:meth:`.insert_many`,
+    and the latest ``view_window`` partitions of the view.
+    The least recently used partitions are detached to attach others.
+    The ``con`` is committed before attaching/detaching databases,
+    because SQLite does not allow them within a transaction.
+
+    Records are readable through a ``UNION ALL`` view named ``table_name``
+    (a temporary view of the latest ``view_window`` partitions
+    if the partitions are attached files),
+    or through :py:meth:`.select` that reads only the partitions in a time range.
+    Methods of |SimpleSQLite| that verify the existence of a table
+    (e.g. :py:meth:`simplesqlite.SimpleSQLite.select`) do not accept the view:
+    read the view by :py:meth:`simplesqlite.SimpleSQLite.execute_query`,
+    or :py:meth:`.select` instead.
+
+    Values of the ``time_attr`` are either of
+    :py:class:`datetime.datetime`/:py:class:`datetime.date` instances,
+    ISO 8601 strings (``"YYYY-MM-DD..."``), or UNIX timestamps (UTC).
+
+    :param SimpleSQLite con: Connection to the database.
+    :param str table_name: Name of the partitioned table.
+    :param list attr_descriptions: Attribute descriptions of the child tables.
+    :param str time_attr: Attribute name to partition records by.
+    :param str interval: Time range of a partition: ``"day"`` or ``"month"``.
+    :param str attach_dir: Directory to create database files of the partitions.
+    :param tuple index_attrs: |index_attrs|
+    :param int view_window:
+        Number of the latest partitions included in the view of attached partitions.
+        Must be less than the number of databases that can be attached.
+        Defaults to half of the number of databases that can be attached.
+    :raises ValueError: If the ``interval`` or the ``view_window`` is invalid.
+
+    :Sample Code:
+        .. code:: python
+
+            from simplesqlite import PartitionedTable, SimpleSQLite
+
+            con = SimpleSQLite("sample.sqlite", "w")
+            events = PartitionedTable(
+                con, "events", ["ts TEXT", "name TEXT"], time_attr="ts", interval="day")
+            events.insert_many(
+                [["2020-01-01 10:00:00", "login"], ["2020-01-02 09:00:00", "logout"]])
+            events.commit()
+
+            print(con.select("*", "events").fetchall())
+            print(events.select("name", start="2020-01-02").fetchall())
+
+            # remove the records of 2020-01-01
+            events.drop_partitions_before("2020-01-02")
+    """
+
+    __INTERVALS = ("day", "month")
+    __RE_ISO_DATE = re.compile(r"^\s*(\d{4})-(\d{2})(?:-(\d{2}))?")
+    __ATTACHED_EXT = ".sqlite"
+
+    # default value of SQLITE_MAX_ATTACHED:
+    # used if the limit of the connection cannot be fetched (Python 3.10 or older)
+    __DEFAULT_MAX_ATTACHED = 10
+
+    @property
+    def table_name(self):
+        return self.__table_name
+
+    @property
+    def time_attr(self):
+        return self.__time_attr
+
+    @property
+    def interval(self):
+        return self.__interval
+
+    @property
+    def partitions(self):
+        """
+        :return: Names of the child tables (schema names if attached) in the order of time.
+        :rtype: list
+        """
+
+        return [self.__make_partition_name(key) for key in sorted(self.__partition_keys)]
+
+    def __init__(
+        self,
+        con,
+        table_name,
+        attr_descriptions,
+        time_attr,
+        interval="day",
+        attach_dir=None,
+        index_attrs=None,
+        view_window=None,
+    ):
+        if interval not in self.__INTERVALS:
+            raise ValueError(
+                "invalid interval: expected={}, actual={}".format(self.__INTERVALS, interval)
+            )
+
+        con.validate_access_permission(["w", "a"])
+
+        self.__con = con
+        self.__table_name = table_name
+        self.__attr_descriptions = attr_descriptions
+        self.__time_attr = time_attr
+        self.__interval = interval
+        self.__attach_dir = attach_dir
+        self.__index_attrs = index_attrs
+        self.__attr_names = self.__fetch_attr_names(attr_descriptions)
+
+        if time_attr not in self.__attr_names:
+            raise AttributeNotFoundError(
+                "'{}' attribute not found in the attribute descriptions: {}".format(
+                    time_attr, attr_descriptions
+                )
+            )
+
+        self.__partition_keys = set()
+
+        # keys of the attached partitions in the order of recent use
+        self.__attached_keys = OrderedDict()
+        self.__max_attached = None
+        self.__view_window = None
+        self.__view_keys = []  # keys of the partitions that the current view refers to
+
+        if attach_dir is not None:
+            self.__max_attached = self.__fetch_max_attached()
+            if view_window is None:
+                view_window = self.__max_attached // 2
+            if not 0 <= view_window < self.__max_attached:
+                raise ValueError(
+                    "view_window must be in the range of [0, {}): actual={}".format(
+                        self.__max_attached, view_window
+                    )
+                )
+            self.__view_window = view_window
+
+        self.__load_partitions()
+        self.__create_view()
+
+    def get_partition_key(self, value):
+        """
+        :param value: Value of the ``time_attr``.
+        :return: Key of the partition that the ``value`` belongs to: ``YYYYMMDD``/``YYYYMM``.
+        :rtype: str
+        :raises ValueError: If the ``value`` cannot be converted to a date.
+        """
+
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            year, month, day = value.year, value.month, value.day
+        elif isinstance(value, (six.integer_types, float)) and not isinstance(value, bool):
+            date = datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=value)
+            year, month, day = date.year, date.month, date.day
+        else:
+            match = None
+            if isinstance(value, six.string_types):
+                match = self.__RE_ISO_DATE.search(value)
+
+            if match is None or (self.__interval == "day" and match.group(3) is None):
+                raise ValueError(
+                    "failed to get a date from the value of '{}': {!r}".format(
+                        self.__time_attr, value
+                    )
+                )
+
+            year, month, day = int(match.group(1)), int(match.group(2)), match.group(3)
+
+        if self.__interval == "month":
+            return "{:04d}{:02d}".format(year, month)
+
+        return "{:04d}{:02d}{:02d}".format(year, month, int(day))
+
+    def insert_many(self, records, attr_names=None):
+        """
+        Insert records into the partitions of the records.
+        Partitions are created if not exist.
+
+        :param records: Records to be inserted.
+        :type records: list of |dict|/|namedtuple|/|list|/|tuple|
+        :param list attr_names:
+            Attribute names of the records.
+            Defaults to all of the attributes of the table.
+        :return: Number of inserted records.
+        :rtype: int
+        :raises ValueError:
+            If a value of the ``time_attr`` cannot be converted to a date.
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.insert_many`
+        """
+
+        if attr_names is None:
+            attr_names = self.__attr_names
+
+        if self.__time_attr not in attr_names:
+            raise AttributeNotFoundError(
+                "'{}' attribute not found in the attributes: {}".format(
+                    self.__time_attr, attr_names
+                )
+            )
+
+        time_idx = list(attr_names).index(self.__time_attr)
+        partition_records = OrderedDict()
+        for record in RecordConvertor.to_records(attr_names, records):
+            partition_records.setdefault(self.get_partition_key(record[time_idx]), []).append(
+                record
+            )
+
+        num_records = 0
+        is_new_partition = False
+        for key, records in six.iteritems(partition_records):
+            if key not in self.__partition_keys:
+                self.__create_partition(key)
+                is_new_partition = True
+
+            if self.__attach_dir is None:
+                num_records += self.__con.insert_many(
+                    self.__make_partition_name(key), records, attr_names=attr_names
+                )
+                continue
+
+            self.__attach_partitions([key])
+            num_records += self.__con.prepare_insert(
+                self.__table_name, attr_names, schema_name=self.__make_partition_name(key)
+            )(records)
+
+        if is_new_partition:
+            self.__create_view()
+
+        return num_records
+
+    def select(self, select, where=None, extra=None, start=None, end=None):
+        """
+        Send a SELECT query to the partitions that overlap a time range.
+        Partitions out of the range are not read.
+
+        :param str select: Attribute for the SELECT query.
+        :param str where: |arg_select_where|
+        :param str extra: |arg_select_extra|
+        :param start:
+            Lower bound (inclusive) of the values of the ``time_attr``.
+            Must be comparable with the stored values by SQLite.
+            No lower bound if the value is |None|.
+        :param end:
+            Upper bound (exclusive) of the values of the ``time_attr``.
+            No upper bound if the value is |None|.
+        :return: Result of the query execution.
+        :rtype: sqlite3.Cursor
+        :raises simplesqlite.TableNotFoundError: If no partitions exist.
+        :raises ValueError:
+            If the partitions in the time range are more than
+            the databases that can be attached at once.
+        """
+
+        if not self.__partition_keys:
+            raise TableNotFoundError("no partitions of '{}' found".format(self.__table_name))
+
+        start_key = None if start is None else self.get_partition_key(start)
+        end_key = None if end is None else self.get_partition_key(end)
+        keys = [
+            key
+            for key in sorted(self.__partition_keys)
+            if (start_key is None or start_key <= key) and (end_key is None or key <= end_key)
+        ]
+
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("{} >= ?".format(Attr(self.__time_attr)))
+        if end is not None:
+            conditions.append("{} < ?".format(Attr(self.__time_attr)))
+
+        if keys:
+            child_condition = " WHERE {}".format(" AND ".join(conditions)) if conditions else ""
+            bound_params = [value for value in (start, end) if value is not None]
+        else:
+            # none of the partitions overlap: query a partition that matches no records
+            keys = [next(iter(self.__attached_keys or sorted(self.__partition_keys)))]
+            child_condition = " WHERE 0"
+            bound_params = []
+
+        if self.__attach_dir is not None:
+            self.__attach_partitions(keys)
+
+        child_queries = []
+        for key in keys:
+            child_queries.append(
+                "SELECT * FROM {}{}".format(self.__get_qualified_name(key), child_condition)
+            )
+            params.extend(bound_params)
+
+        logger.debug(
+            "select from partitions: table={}, partitions={}", self.__table_name, len(keys)
+        )
+
+        query_list = ["SELECT {} FROM ({})".format(select, " UNION ALL ".join(child_queries))]
+        if where:
+            query_list.append("WHERE {}".format(where))
+        if extra:
+            query_list.append(extra)
+        query = " ".join(query_list)
+
+        return self.__con.execute_query(query, params=params)
+
+    def drop_partitions_before(self, value):
+        """
+        Drop the partitions that entirely older than a value of the ``time_attr``:
+        ``DROP TABLE`` for the child tables in the database of the ``con``,
+        detach and delete files for the attached partitions.
+
+        :param value: Value of the ``time_attr``.
+        :return: Names of the dropped partitions.
+        :rtype: list
+        """
+
+        threshold_key = self.get_partition_key(value)
+        expired_keys = [key for key in sorted(self.__partition_keys) if key < threshold_key]
+        if not expired_keys:
+            return []
+
+        # the view should not refer the dropped partitions
+        self.__drop_view()
+        self.__con.commit()
+
+        for key in expired_keys:
+            logger.debug("drop partition: {}", self.__make_partition_name(key))
+
+            if self.__attach_dir is None:
+                self.__con.drop_table(self.__make_partition_name(key))
+                self.__con.commit()
+            else:
+                if key in self.__attached_keys:
+                    self.__detach_partition(key)
+
+                file_path = self.__make_attached_path(key)
+                for path in [file_path] + [
+                    file_path + suffix for suffix in ("-journal", "-wal", "-shm")
+                ]:
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            self.__partition_keys.remove(key)
+
+        self.__create_view()
+
+        return [self.__make_partition_name(key) for key in expired_keys]
+
+    def commit(self):
+        """
+        Commit the database of the ``con`` (including the attached partitions).
+        """
+
+        self.__con.commit()
+
+    def close(self):
+        """
+        Commit the ``con``, and detach the attached partitions.
+        The view of the attached partitions is dropped as well.
+        The ``con`` is not closed.
+        """
+
+        self.__con.commit()
+
+        if self.__attach_dir is None:
+            return
+
+        self.__drop_view()
+        self.__con.commit()
+        for key in list(self.__attached_keys):
+            self.__detach_partition(key)
+
+    def __make_partition_name(self, key):
+        return "{:s}_p{:s}".format(self.__table_name, key)
+
+    def __make_attached_path(self, key):
+        return os.path.join(
+            self.__attach_dir, self.__make_partition_name(key) + self.__ATTACHED_EXT
+        )
+
+    def __get_qualified_name(self, key):
+        if self.__attach_dir is None:
+            return Table(self.__make_partition_name(key)).to_query()
+
+        return "{}.{}".format(Table(self.__make_partition_name(key)), Table(self.__table_name))
+
+    @staticmethod
+    def __fetch_attr_names(attr_descriptions):
+        con = connect_memdb()
+        con.create_table("attr_names", attr_descriptions)
+        attr_names = con.fetch_attr_names("attr_names")
+        con.close()
+
+        return attr_names
+
+    def __get_key_pattern(self):
+        return r"(\d{8})" if self.__interval == "day" else r"(\d{6})"
+
+    def __load_partitions(self):
+        if self.__attach_dir is None:
+            regexp = re.compile(
+                r"^{}_p{}$".format(re.escape(self.__table_name), self.__get_key_pattern())
+            )
+            for table_name in self.__con.fetch_table_names():
+                match = regexp.search(table_name)
+                if match:
+                    self.__partition_keys.add(match.group(1))
+
+            return
+
+        # partitions attached by another instance for the same table
+        regexp = re.compile(
+            r"^{}_p{}$".format(re.escape(self.__table_name), self.__get_key_pattern())
+        )
+        for schema_name in self.__fetch_attached_schema_names():
+            match = regexp.search(schema_name)
+            if match:
+                self.__attached_keys[match.group(1)] = None
+
+        if not os.path.isdir(self.__attach_dir):
+            return
+
+        regexp = re.compile(
+            r"^{}_p{}{}$".format(
+                re.escape(self.__table_name),
+                self.__get_key_pattern(),
+                re.escape(self.__ATTACHED_EXT),
+            )
+        )
+        for file_name in os.listdir(self.__attach_dir):
+            match = regexp.search(file_name)
+            if match:
+                self.__partition_keys.add(match.group(1))
+
+    def __create_partition(self, key):
+        logger.debug("create partition: {}", self.__make_partition_name(key))
+
+        if self.__attach_dir is None:
+            self.__con.create_table(self.__make_partition_name(key), self.__attr_descriptions)
+            if self.__index_attrs:
+                self.__con.create_index_list(self.__make_partition_name(key), self.__index_attrs)
+            self.__partition_keys.add(key)
+            return
+
+        if not os.path.isdir(self.__attach_dir):
+            os.makedirs(self.__attach_dir)
+
+        # release the partitions of the view to be detachable:
+        # the view is created again after the insertion
+        self.__drop_view()
+        self.__attach_partitions([key])
+        self.__con.execute_query(
+            "CREATE TABLE IF NOT EXISTS {:s} ({:s})".format(
+                self.__get_qualified_name(key), ", ".join(self.__attr_descriptions)
+            )
+        )
+        for attr_name in self.__index_attrs or []:
+            if attr_name not in self.__attr_names:
+                continue
+
+            self.__con.execute_query(
+                "CREATE INDEX IF NOT EXISTS {schema}.{index:s} ON {table}({attr})".format(
+                    schema=Table(self.__make_partition_name(key)),
+                    index=make_index_name(self.__table_name, attr_name),
+                    table=Table(self.__table_name),
+                    attr=Attr(attr_name),
+                )
+            )
+        self.__partition_keys.add(key)
+
+    def __fetch_max_attached(self):
+        """
+        :return: Number of partitions that can be attached to the ``con`` at once.
+        :rtype: int
+        """
+
+        try:
+            max_attached = self.__con.connection.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        except AttributeError:
+            max_attached = self.__DEFAULT_MAX_ATTACHED
+
+        # databases attached by others than the partitions of the table
+        regexp = re.compile(
+            r"^{}_p{}$".format(re.escape(self.__table_name), self.__get_key_pattern())
+        )
+        num_others = len(
+            [name for name in self.__fetch_attached_schema_names() if not regexp.search(name)]
+        )
+
+        if max_attached - num_others < 1:
+            raise ValueError(
+                "no more databases can be attached: limit={}, attached={}".format(
+                    max_attached, num_others
+                )
+            )
+
+        return max_attached - num_others
+
+    def __fetch_attached_schema_names(self):
+        return [
+            row[1]
+            for row in self.__con.execute_query("PRAGMA database_list").fetchall()
+            if row[1] not in ("main", "temp")
+        ]
+
+    def __get_view_keys(self):
+        keys = sorted(self.__partition_keys)
+        if self.__attach_dir is None:
+            return keys
+
+        return keys[len(keys) - self.__view_window :]
+
+    def __attach_partitions(self, keys):
+        """
+        Attach partitions that not attached yet.
+        The least recently used partitions out of the view are detached
+        if the number of attached databases exceeds the limit.
+
+        :raises ValueError: If the partitions cannot be attached at once.
+        """
+
+        for key in keys:
+            if key in self.__attached_keys:
+                # mark as recently used
+                del self.__attached_keys[key]
+                self.__attached_keys[key] = None
+
+        missing_keys = [key for key in keys if key not in self.__attached_keys]
+        if not missing_keys:
+            return
+
+        pinned_keys = set(keys) | set(self.__view_keys)
+        evictable_keys = [key for key in self.__attached_keys if key not in pinned_keys]
+        num_evicts = len(self.__attached_keys) + len(missing_keys) - self.__max_attached
+
+        if num_evicts > len(evictable_keys):
+            raise ValueError(
+                "too many partitions to attach at once: "
+                "required={}, attachable={}, view_window={}".format(
+                    len(set(keys)), self.__max_attached, self.__view_window
+                )
+            )
+
+        # ATTACH/DETACH are not allowed within a transaction
+        self.__con.commit()
+
+        for key in evictable_keys[: max(num_evicts, 0)]:
+            self.__detach_partition(key)
+
+        for key in missing_keys:
+            logger.debug("attach partition: {}", self.__make_partition_name(key))
+
+            self.__con.execute_query(
+                "ATTACH DATABASE ? AS {}".format(Table(self.__make_partition_name(key))),
+                params=[self.__make_attached_path(key)],
+            )
+            self.__attached_keys[key] = None
+
+    def __detach_partition(self, key):
+        logger.debug("detach partition: {}", self.__make_partition_name(key))
+
+        self.__con.execute_query(
+            "DETACH DATABASE {}".format(Table(self.__make_partition_name(key)))
+        )
+        del self.__attached_keys[key]
+
+    def __drop_view(self):
+        view_schema = "main" if self.__attach_dir is None else "temp"
+        self.__con.execute_query(
+            "DROP VIEW IF EXISTS {}.{}".format(view_schema, Table(self.__table_name))
+        )
+        self.__view_keys = []
+
+    def __create_view(self):
+        self.__drop_view()
+
+        view_keys = self.__get_view_keys()
+        if not view_keys:
+            return
+
+        if self.__attach_dir is not None:
+            self.__attach_partitions(view_keys)
+
+        self.__con.execute_query(
+            "CREATE {}VIEW {} AS {}".format(
+                "" if self.__attach_dir is None else "TEMP ",
+                Table(self.__table_name),
+                " UNION ALL ".join(
+                    ["SELECT * FROM {}".format(self.__get_qualified_name(key)) for key in view_keys]
+                ),
+            )
+        )
+        self.__view_keys = view_keys
@@ -0,0 +1,287 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from ._cache import SchemaCache
+from ._logger import logger
+from .core import MEMORY_DB_NAME, SimpleSQLite
+from .error import DatabaseError, PoolTimeoutError
+
+
+class SimpleSQLitePool(object):
+    """
+    Thread-safe pool of |SimpleSQLite| instances connected to the same database file.
+    Pooled instances share one schema cache,
+    so that table/attribute lookups are not repeated for each connection.
+
+    :param str database_path: Path to the SQLite database file.
+    :param int size: Maximum number of connections checked out at the same time.
+    :param str mode: Open mode of connections: ``"r"`` or ``"a"``.
+    :param float max_idle_time:
+        Seconds to keep an idle connection in the pool.
+        Idle connections are kept unlimitedly if the value is |None|.
+    :param float timeout:
+        Default seconds to wait for a connection when the pool is exhausted.
+        Wait unlimitedly if the value is |None|.
+    :param bool pre_ping:
+        Check the health of a connection before handing it out, if the value is |True|.
+    :param kwargs: Keyword arguments passed to |SimpleSQLite| constructor.
+
+    :Sample Code:
+        .. code:: python
+
+            from simplesqlite import SimpleSQLitePool
+
+            pool = SimpleSQLitePool("sample.sqlite", size=8, mode="r")
+
+            # in request handler threads
+            with pool.connection() as con:
+                print(con.fetch_num_records("sample_table"))
+    """
+
+    @property
+    def database_path(self):
+        return self.__database_path
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def mode(self):
+        return self.__mode
+
+    @property
+    def schema_cache(self):
+        return self.__schema_cache
+
+    @property
+    def num_checked_out(self):
+        """
+        :return: Number of connections currently checked out from the pool.
+        :rtype: int
+        """
+
+        with self.__cond:
+            return self.__num_checked_out
+
+    @property
+    def num_idle(self):
+        """
+        :return: Number of idle connections in the pool.
+        :rtype: int
+        """
+
+        with self.__cond:
+            return len(self.__idle_cons)
+
+    def __init__(
+        self,
+        database_path,
+        size=5,
+        mode="r",
+        max_idle_time=None,
+        timeout=None,
+        pre_ping=True,
+        **kwargs
+    ):
+        if mode not in ("r", "a"):
+            raise ValueError("pool mode must be 'r' or 'a': actual={}".format(mode))
+        if database_path == MEMORY_DB_NAME:
+            raise ValueError("connection pool is not available for an in-memory database")
+        if size < 1:
+            raise ValueError("pool size must be greater than zero: actual={}".format(size))
+
+        self.__database_path = database_path
+        self.__size = size
+        self.__mode = mode
+        self.__max_idle_time = max_idle_time
+        self.__timeout = timeout
+        self.__pre_ping = pre_ping
+        self.__con_kwargs = kwargs
+
+        self.__schema_cache = SchemaCache()
+        self.__cond = threading.Condition()
+        self.__local = threading.local()
+        self.__idle_cons = []  # list of (SimpleSQLite, released time)
+        self.__num_checked_out = 0
+        self.__is_closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def acquire(self, timeout=None):
+        """
+        Check out a connection from the pool.
+        The connection must be returned by :py:meth:`.release`.
+
+        :param float timeout:
+            Seconds to wait for a connection. Defaults to the ``timeout`` of the pool.
+        :return: Connection checked out from the pool.
+        :rtype: SimpleSQLite
+        :raises simplesqlite.PoolTimeoutError:
+            If no connection is available within the ``timeout``.
+        :raises simplesqlite.DatabaseError: If the pool is closed.
+        """
+
+        if timeout is None:
+            timeout = self.__timeout
+
+        con = None
+        with self.__cond:
+            end_time = None if timeout is None else time.time() + timeout
+
+            while True:
+                if self.__is_closed:
+                    raise DatabaseError("connection pool is closed")
+                if self.__num_checked_out < self.__size:
+                    break
+
+                if end_time is None:
+                    self.__cond.wait()
+                    continue
+
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        "failed to acquire a connection within {} seconds: size={}".format(
+                            timeout, self.__size
+                        )
+                    )
+                self.__cond.wait(remaining)
+
+            self.__num_checked_out += 1
+            expired_cons = self.__pop_expired_cons()
+            if self.__idle_cons:
+                con, _ = self.__idle_cons.pop()
+
+        for expired_con in expired_cons:
+            expired_con.close()
+
+        try:
+            if con is not None and not self.__is_healthy(con):
+                con.close()
+                con = None
+
+            if con is None:
+                con = self.__create_con()
+        except Exception:
+            with self.__cond:
+                self.__num_checked_out -= 1
+                self.__cond.notify()
+            raise
+
+        return con
+
+    def release(self, con):
+        """
+        Return a connection to the pool.
+        An uncommitted transaction of the connection is rolled back.
+
+        :param SimpleSQLite con: Connection acquired from the pool.
+        """
+
+        is_reusable = con.is_connected()
+        # Connection.in_transaction is not available with Python 2: always rollback
+        if is_reusable and getattr(con.connection, "in_transaction", True):
+            con.rollback()
+
+        with self.__cond:
+            self.__num_checked_out -= 1
+            if is_reusable and not self.__is_closed:
+                self.__idle_cons.append((con, time.time()))
+                con = None
+            self.__cond.notify()
+
+        if con is not None:
+            con.close()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Context manager that checks out a connection and returns it when exits.
+        Nested calls from the same thread share the same connection.
+
+        :param float timeout: Seconds to wait for a connection.
+        :rtype: SimpleSQLite
+        """
+
+        local = self.__local
+        if getattr(local, "con", None) is not None:
+            local.depth += 1
+            try:
+                yield local.con
+            finally:
+                local.depth -= 1
+            return
+
+        con = self.acquire(timeout)
+        local.con = con
+        local.depth = 1
+        try:
+            yield con
+        finally:
+            local.con = None
+            self.release(con)
+
+    def close(self):
+        """
+        Close idle connections and the pool.
+        Connections checked out are closed when they are released.
+        """
+
+        with self.__cond:
+            self.__is_closed = True
+            idle_cons = self.__idle_cons
+            self.__idle_cons = []
+            self.__cond.notify_all()
+
+        logger.debug("close connection pool: path='{}', idle={}", self.database_path, len(idle_cons))
+
+        for con, _ in idle_cons:
+            con.close()
+
+    def __create_con(self):
+        return SimpleSQLite(
+            self.__database_path,
+            self.__mode,
+            delayed_connection=False,
+            check_same_thread=False,
+            schema_cache=self.__schema_cache,
+            **self.__con_kwargs
+        )
+
+    def __pop_expired_cons(self):
+        if self.__max_idle_time is None:
+            return []
+
+        threshold_time = time.time() - self.__max_idle_time
+        expired_cons = [con for con, released in self.__idle_cons if released <= threshold_time]
+        self.__idle_cons = [
+            (con, released) for con, released in self.__idle_cons if released > threshold_time
+        ]
+
+        return expired_cons
+
+    def __is_healthy(self, con):
+        if not self.__pre_ping:
+            return con.is_connected()
+
+        try:
+            con.connection.execute("SELECT 1").fetchone()
+        except (sqlite3.Error, DatabaseError):
+            return False
+
+        return True
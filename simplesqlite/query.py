@@ -10,7 +10,6 @@ import abc
 import re
 
 import six
-import typepy
 from pathvalidate import (
     InvalidCharError,
     InvalidReservedNameError,
@@ -20,7 +19,8 @@ from pathvalidate import (
     unprintable_ascii_chars,
 )
 
-from ._func import validate_table_name
+from ._cache import IdentifierCache
+from ._func import is_empty_sequence, is_not_null_string, is_number, validate_table_name
 from ._validator import validate_sqlite_attr_name
 from .error import SqlSyntaxError
 
@@ -64,13 +64,25 @@ class Table(QueryItem):
     __RE_NEED_BRACKET = re.compile("[{:s}]".format(re.escape("%()-+/.,")))
     __RE_NEED_QUOTE = re.compile(r"[\s]+")
 
+    # table name -> rendered table name
+    __query_cache = IdentifierCache()
+
     def to_query(self):
         name = self._value
+        sql_name = self.__query_cache.get(name)
+
+        if sql_name is None:
+            sql_name = self.__to_query(name)
+            self.__query_cache.set(name, sql_name)
 
-        if self.__RE_NEED_BRACKET.search(name):
+        return sql_name
+
+    @classmethod
+    def __to_query(cls, name):
+        if cls.__RE_NEED_BRACKET.search(name):
             return "[{:s}]".format(name)
 
-        if self.__RE_NEED_QUOTE.search(name):
+        if cls.__RE_NEED_QUOTE.search(name):
             return "'{:s}'".format(name)
 
         return name
@@ -100,6 +112,9 @@ class Attr(QueryItem):
     )
     __RE_SANITIZE = re.compile("[{:s}\n\r]".format(re.escape("'\",")))
 
+    # (attribute name, operation) -> rendered attribute name
+    __query_cache = IdentifierCache()
+
     @classmethod
     def sanitize(cls, name):
         try:
@@ -113,8 +128,19 @@ class Attr(QueryItem):
         self.__operation = operation
 
     def to_query(self):
-        name = self.sanitize(self._value)
-        need_quote = self.__RE_NEED_QUOTE.search(name) is not None
+        key = (self._value, self.__operation)
+        sql_name = self.__query_cache.get(key)
+
+        if sql_name is None:
+            sql_name = self.__to_query(self._value, self.__operation)
+            self.__query_cache.set(key, sql_name)
+
+        return sql_name
+
+    @classmethod
+    def __to_query(cls, value, operation):
+        name = cls.sanitize(value)
+        need_quote = cls.__RE_NEED_QUOTE.search(name) is not None
 
         try:
             validate_sqlite_attr_name(name)
@@ -125,15 +151,15 @@ class Attr(QueryItem):
 
         if need_quote:
             sql_name = '"{:s}"'.format(name)
-        elif self.__RE_NEED_BRACKET.search(name):
+        elif cls.__RE_NEED_BRACKET.search(name):
             sql_name = "[{:s}]".format(name)
         elif name == "join":
             sql_name = "[{:s}]".format(name)
         else:
             sql_name = name
 
-        if typepy.is_not_null_string(self.__operation):
-            sql_name = "{:s}({:s})".format(self.__operation, sql_name)
+        if is_not_null_string(operation):
+            sql_name = "{:s}({:s})".format(operation, sql_name)
 
         return sql_name
 
@@ -232,7 +258,7 @@ class Value(QueryItem):
         if value is None:
             return "NULL"
 
-        if typepy.Integer(value).is_type() or typepy.RealNumber(value).is_type():
+        if is_number(value):
             return six.text_type(value)
 
         try:
@@ -433,30 +459,108 @@ class Insert(QueryItem):
 
     :param str table: Table name of executing the query.
     :param AttrList attrs: Attributes that inserting to..
+    :param str conflict_resolution:
+        Conflict resolution algorithm of the query:
+        ``"REPLACE"``, ``"IGNORE"``, ``"ABORT"``, ``"FAIL"`` or ``"ROLLBACK"``.
     :raises simplesqlite.NameValidationError:
         |raises_validate_table_name|
+
+    :Examples:
+        >>> from simplesqlite.query import AttrList, Insert
+        >>> Insert("A", AttrList(["B", "C"]))
+        'INSERT INTO A(B,C) VALUES (?,?)'
+        >>> Insert("A", AttrList(["B", "C"]), conflict_resolution="IGNORE")
+        'INSERT OR IGNORE INTO A(B,C) VALUES (?,?)'
     """
 
-    def __init__(self, table, attrs):
+    __CONFLICT_RESOLUTIONS = ("ROLLBACK", "ABORT", "FAIL", "IGNORE", "REPLACE")
+
+    def __init__(self, table, attrs, conflict_resolution=None):
         validate_table_name(table)
 
         if not isinstance(attrs, AttrList):
             raise TypeError("attr must be a AttrList class instance: actual={}".format(type(attrs)))
 
-        if typepy.is_empty_sequence(attrs):
+        if is_empty_sequence(attrs):
             raise ValueError("empty attributes")
 
+        if conflict_resolution is not None:
+            conflict_resolution = conflict_resolution.upper()
+            if conflict_resolution not in self.__CONFLICT_RESOLUTIONS:
+                raise SqlSyntaxError(
+                    "invalid conflict resolution: expected={}, actual={}".format(
+                        self.__CONFLICT_RESOLUTIONS, conflict_resolution
+                    )
+                )
+
         self.__table = table
         self.__attrs = attrs
+        self.__conflict_resolution = conflict_resolution
 
     def to_query(self):
-        return "INSERT INTO {:s}({:s}) VALUES ({:s})".format(
+        if self.__conflict_resolution:
+            insert = "INSERT OR {:s}".format(self.__conflict_resolution)
+        else:
+            insert = "INSERT"
+
+        return "{:s} INTO {:s}({:s}) VALUES ({:s})".format(
+            insert,
             Table(self.__table),
             ",".join([attr.to_query() for attr in self.__attrs]),
             ",".join(["?" for _ in self.__attrs]),
         )
 
 
+class Upsert(QueryItem):
+    """
+    INSERT query that updates the existing record instead of inserting
+    when the inserting record conflicts with a uniqueness constraint (UPSERT).
+    Requires SQLite 3.24.0 or later.
+
+    :param str table: Table name of executing the query.
+    :param AttrList attrs: Attributes that inserting to.
+    :param AttrList conflict_target: Attributes of the uniqueness constraint.
+    :param AttrList update_attrs:
+        Attributes to be updated with the inserting values when a conflict occurred.
+        Conflicting records are left unchanged if the value is empty.
+    :raises simplesqlite.NameValidationError:
+        |raises_validate_table_name|
+
+    :Examples:
+        >>> from simplesqlite.query import AttrList, Upsert
+        >>> Upsert("A", AttrList(["B", "C"]), AttrList(["B"]), AttrList(["C"]))
+        'INSERT INTO A(B,C) VALUES (?,?) ON CONFLICT(B) DO UPDATE SET C=excluded.C'
+        >>> Upsert("A", AttrList(["B", "C"]), AttrList(["B"]), AttrList([]))
+        'INSERT INTO A(B,C) VALUES (?,?) ON CONFLICT(B) DO NOTHING'
+    """
+
+    def __init__(self, table, attrs, conflict_target, update_attrs):
+        for items in (conflict_target, update_attrs):
+            if not isinstance(items, AttrList):
+                raise TypeError(
+                    "attr must be a AttrList class instance: actual={}".format(type(items))
+                )
+
+        if is_empty_sequence(conflict_target):
+            raise ValueError("empty conflict target")
+
+        self.__insert = Insert(table, attrs)
+        self.__conflict_target = conflict_target
+        self.__update_attrs = update_attrs
+
+    def to_query(self):
+        if is_empty_sequence(self.__update_attrs):
+            action = "DO NOTHING"
+        else:
+            action = "DO UPDATE SET {:s}".format(
+                ",".join(["{0:s}=excluded.{0:s}".format(attr) for attr in self.__update_attrs])
+            )
+
+        return "{:s} ON CONFLICT({:s}) {:s}".format(
+            self.__insert.to_query(), self.__conflict_target.to_query(), action
+        )
+
+
 def make_index_name(table_name, attr_name):
     import hashlib
 
@@ -0,0 +1,484 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import itertools
+import sqlite3
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import six
+
+from ._logger import logger
+from .converter import RecordConvertor
+from .core import SimpleSQLite, connect_memdb
+from .error import AttributeNotFoundError
+from .query import And, Table, Where
+
+
+def default_hash(value):
+    """
+    Hash function that returns the same value across processes
+    (unlike the built-in :py:func:`hash` of strings).
+
+    :param value: Value of a shard key.
+    :return: Non-negative integer.
+    :rtype: int
+    """
+
+    if isinstance(value, float) and value.is_integer():
+        # route 1.0 to the same shard as 1, as well as comparisons by SQLite
+        value = int(value)
+
+    if isinstance(value, six.integer_types):
+        return abs(value)
+
+    if isinstance(value, six.text_type):
+        value = value.encode("utf-8")
+    elif not isinstance(value, six.binary_type):
+        value = six.text_type(value).encode("utf-8")
+
+    return zlib.crc32(value) & 0xFFFFFFFF
+
+
+class ShardedSimpleSQLite(object):
+    """
+    Facade of tables that horizontally partitioned across multiple database files (shards).
+    Records are routed to a shard by the value of the ``shard_key`` attribute:
+    the index of the shard is ``hash_fn(value) % len(paths)``.
+    Values are converted by the type affinity of the ``shard_key`` column
+    before hashing as well as SQLite stores them:
+    e.g. ``"1"`` for an ``INTEGER`` column is routed as ``1``.
+
+    - writes (:py:meth:`.insert_many`) are sent to the owning shards of each record
+    - point reads (:py:meth:`.select`/:py:meth:`.fetch_value`) are sent to
+      the owning shard of a key
+    - scans (:py:meth:`.select_all`/:py:meth:`.fetch_num_records`) are sent to
+      all of the shards in parallel, and the results are merged
+    - schemas (``create_table*``/``create_index*``) are created on all of the shards.
+      ``create_table_from_*`` methods load the whole data into an in-memory database
+      at first, so that the data must fit in memory
+
+    Operations of the shards are executed in parallel with threads.
+    Transactions are per shard: :py:meth:`.commit` is not atomic across the shards.
+    Instances are not thread-safe as well as |SimpleSQLite|.
+
+    :param list paths: Paths to the database files of the shards.
+    :param str shard_key: Attribute name to route records to shards.
+    :param hash_fn:
+        Function that maps a value of the ``shard_key`` to a non-negative integer.
+        The function must return the same value for the same key across processes.
+        Defaults to :py:func:`.default_hash`.
+    :param str mode: Open mode of the shards.
+    :param kwargs: Keyword arguments passed to |SimpleSQLite| constructor.
+
+    :Sample Code:
+        .. code:: python
+
+            from simplesqlite import ShardedSimpleSQLite
+
+            con = ShardedSimpleSQLite(["shard0.sqlite", "shard1.sqlite"], shard_key="user_id")
+            con.create_table("events", ["user_id INTEGER", "event TEXT"])
+            con.insert_many("events", [[1, "login"], [2, "login"], [1, "logout"]])
+            con.commit()
+
+            print(con.select("event", "events", key=1).fetchall())
+            print(con.fetch_num_records("events"))
+    """
+
+    __STAGE_CHUNK_SIZE = 10000
+
+    @property
+    def database_paths(self):
+        return [shard.database_path for shard in self.__shards]
+
+    @property
+    def shards(self):
+        return self.__shards
+
+    @property
+    def shard_key(self):
+        return self.__shard_key
+
+    def __init__(self, paths, shard_key, hash_fn=default_hash, mode="a", **kwargs):
+        if not paths:
+            raise ValueError("paths must not be empty")
+        if len(set(paths)) != len(paths):
+            raise ValueError("paths must be unique: {}".format(paths))
+        if not shard_key:
+            raise ValueError("shard_key must not be empty")
+
+        self.__shard_key = shard_key
+        self.__hash_fn = hash_fn
+        self.__executor = None
+        # memory database that has a table for each table of the shards:
+        # the table has a column of the same declared type as the shard key column
+        self.__affinity_con = None
+        self.__affinity_tables = {}  # table name -> table name in the memory database
+        self.__affinity_table_ids = itertools.count()
+
+        # shards are accessed from the threads of the executor
+        kwargs["check_same_thread"] = False
+        self.__shards = [SimpleSQLite(path, mode, **kwargs) for path in paths]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_shard_index(self, key, table_name=None):
+        """
+        :param key: Value of the ``shard_key``.
+        :param str table_name:
+            Table name to convert the ``key`` by the type affinity of
+            the ``shard_key`` column of the table.
+            The ``key`` is used as it is if the value is |None|.
+        :return: Index of the shard that owns the ``key``.
+        :rtype: int
+        """
+
+        if table_name is not None:
+            key = self.__apply_key_affinity(table_name, [key])[0]
+
+        return self.__hash_fn(key) % len(self.__shards)
+
+    def get_shard(self, key, table_name=None):
+        """
+        :param key: Value of the ``shard_key``.
+        :param str table_name:
+            Table name to convert the ``key`` by the type affinity of
+            the ``shard_key`` column of the table.
+        :return: Shard that owns the ``key``.
+        :rtype: SimpleSQLite
+        """
+
+        return self.__shards[self.get_shard_index(key, table_name)]
+
+    def create_table(self, table_name, attr_descriptions):
+        """
+        Create a table on all of the shards.
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_table`
+        """
+
+        self.__affinity_tables.pop(table_name, None)
+        self.__map_shards(lambda shard: shard.create_table(table_name, attr_descriptions))
+
+    def create_index_list(self, table_name, attr_names):
+        """
+        Create indices on all of the shards.
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_index_list`
+        """
+
+        self.__map_shards(lambda shard: shard.create_index_list(table_name, attr_names))
+
+    def create_table_from_data_matrix(self, table_name, attr_names, data_matrix, **kwargs):
+        """
+        Create a table on all of the shards, and insert data into the owning shards.
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_table_from_data_matrix`
+        """
+
+        self.__create_tables_from(
+            lambda con: con.create_table_from_data_matrix(
+                table_name, attr_names, data_matrix, **kwargs
+            )
+        )
+
+    def create_table_from_tabledata(self, table_data, **kwargs):
+        """
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_table_from_tabledata`
+        """
+
+        self.__create_tables_from(lambda con: con.create_table_from_tabledata(table_data, **kwargs))
+
+    def create_table_from_csv(self, csv_source, **kwargs):
+        """
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_table_from_csv`
+        """
+
+        self.__create_tables_from(lambda con: con.create_table_from_csv(csv_source, **kwargs))
+
+    def create_table_from_json(self, json_source, **kwargs):
+        """
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_table_from_json`
+        """
+
+        self.__create_tables_from(lambda con: con.create_table_from_json(json_source, **kwargs))
+
+    def create_table_from_dataframe(self, dataframe, **kwargs):
+        """
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.create_table_from_dataframe`
+        """
+
+        self.__create_tables_from(lambda con: con.create_table_from_dataframe(dataframe, **kwargs))
+
+    def insert_many(self, table_name, records, attr_names=None):
+        """
+        Insert records into the owning shards of the records.
+
+        :param str table_name: Table name of executing the query.
+        :param records: Records to be inserted.
+        :type records: list of |dict|/|namedtuple|/|list|/|tuple|
+        :param list attr_names:
+            Attribute names of the records.
+            Defaults to all of the attributes of the table.
+        :return: Number of inserted records.
+        :rtype: int
+        :raises simplesqlite.AttributeNotFoundError:
+            If the ``shard_key`` is not included in the attributes.
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.insert_many`
+        """
+
+        if attr_names is None:
+            attr_names = self.__shards[0].fetch_attr_names(table_name)
+
+        if self.__shard_key not in attr_names:
+            raise AttributeNotFoundError(
+                "shard key not found in the attributes: key={}, attributes={}".format(
+                    self.__shard_key, attr_names
+                )
+            )
+
+        key_idx = list(attr_names).index(self.__shard_key)
+        records = RecordConvertor.to_records(attr_names, records)
+        keys = self.__apply_key_affinity(table_name, [record[key_idx] for record in records])
+        shard_records = [[] for _ in self.__shards]
+        for record, key in zip(records, keys):
+            shard_records[self.__hash_fn(key) % len(self.__shards)].append(record)
+
+        logger.debug(
+            "insert_many to shards: table={}, records={}",
+            table_name,
+            [len(records) for records in shard_records],
+        )
+
+        def insert_records(shard, records):
+            if not records:
+                return 0
+
+            return shard.insert_many(table_name, records, attr_names=attr_names)
+
+        return sum(self.__map_shards(insert_records, shard_records))
+
+    def select(self, select, table_name, key, where=None, extra=None):
+        """
+        Send a SELECT query for the records of a ``key`` to the owning shard.
+
+        :param key: Value of the ``shard_key`` to select.
+        :return: Result of the query execution.
+        :rtype: sqlite3.Cursor
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.select`
+        """
+
+        key = self.__apply_key_affinity(table_name, [key])[0]
+
+        return self.get_shard(key).select(
+            select, table_name, where=self.__make_key_where(key, where), extra=extra
+        )
+
+    def fetch_value(self, select, table_name, key, where=None, extra=None):
+        """
+        Fetch a value of the records of a ``key`` from the owning shard.
+
+        :param key: Value of the ``shard_key`` to select.
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.fetch_value`
+        """
+
+        key = self.__apply_key_affinity(table_name, [key])[0]
+
+        return self.get_shard(key).fetch_value(
+            select, table_name, where=self.__make_key_where(key, where), extra=extra
+        )
+
+    def select_all(self, select, table_name, where=None, extra=None):
+        """
+        Send a SELECT query to all of the shards.
+        The ``extra`` clause (e.g. ``ORDER BY``/``LIMIT``) is applied to each shard.
+
+        :return: Records of the shards, concatenated in the order of the shards.
+        :rtype: list
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.select`
+        """
+
+        results = self.__map_shards(
+            lambda shard: shard.select(select, table_name, where=where, extra=extra).fetchall()
+        )
+
+        return [record for records in results for record in records]
+
+    def fetch_num_records(self, table_name, where=None):
+        """
+        :return: Total number of records of the table in all of the shards.
+        :rtype: int
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.fetch_num_records`
+        """
+
+        return sum(
+            self.__map_shards(lambda shard: shard.fetch_num_records(table_name, where=where))
+        )
+
+    def has_table(self, table_name):
+        return self.__shards[0].has_table(table_name)
+
+    def fetch_table_names(self, include_system_table=False):
+        return self.__shards[0].fetch_table_names(include_system_table)
+
+    def fetch_attr_names(self, table_name):
+        return self.__shards[0].fetch_attr_names(table_name)
+
+    def commit(self):
+        """
+        Commit each shard.
+        """
+
+        self.__map_shards(lambda shard: shard.commit())
+
+    def close(self):
+        """
+        Commit and close the connections to the shards.
+        """
+
+        try:
+            self.__map_shards(lambda shard: shard.close())
+        finally:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
+            if self.__affinity_con is not None:
+                self.__affinity_con.close()
+                self.__affinity_con = None
+
+    def __map_shards(self, func, *iterables):
+        """
+        :return: Return values of the ``func`` for each shard in the order of the shards.
+        :rtype: list
+        """
+
+        if len(self.__shards) == 1:
+            return [func(*args) for args in zip(self.__shards, *iterables)]
+
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=len(self.__shards))
+
+        return list(self.__executor.map(func, self.__shards, *iterables))
+
+    def __apply_key_affinity(self, table_name, keys):
+        """
+        Convert keys as well as SQLite stores them to the ``shard_key`` column of a table,
+        by inserting the keys to a table that has the same declared type in a memory database.
+
+        :return: Converted keys in the order of the ``keys``.
+        :rtype: list
+        """
+
+        if self.__affinity_con is None:
+            self.__affinity_con = sqlite3.connect(":memory:", check_same_thread=False)
+
+        con = self.__affinity_con
+        affinity_table = self.__affinity_tables.get(table_name)
+        if affinity_table is None:
+            key_type = self.__fetch_key_type(table_name)
+            if key_type is None:
+                return keys
+
+            affinity_table = "affinity_{:d}".format(next(self.__affinity_table_ids))
+            con.execute("CREATE TABLE {:s} (key {:s})".format(affinity_table, key_type))
+            self.__affinity_tables[table_name] = affinity_table
+
+        con.execute("DELETE FROM {:s}".format(affinity_table))
+        con.executemany(
+            "INSERT INTO {:s} VALUES (?)".format(affinity_table), [(key,) for key in keys]
+        )
+
+        return [
+            row[0]
+            for row in con.execute("SELECT key FROM {:s} ORDER BY rowid".format(affinity_table))
+        ]
+
+    def __fetch_key_type(self, table_name):
+        shard = self.__shards[0]
+        if not shard.has_table(table_name):
+            return None
+
+        for row in shard.execute_query(
+            "PRAGMA table_info({:s})".format(Table(table_name))
+        ).fetchall():
+            if row[1] == self.__shard_key:
+                return row[2]
+
+        return None
+
+    def __make_key_where(self, key, where):
+        key_where = Where(self.__shard_key, key)
+
+        if where:
+            return And([key_where, where])
+
+        return key_where
+
+    def __create_tables_from(self, create_table):
+        # tables are created in a staging database at first,
+        # so that the data is sanitized and the schema is inferred once for all of the shards
+        stage = connect_memdb()
+        create_table(stage)
+
+        for table_name in stage.fetch_table_names():
+            attr_names = stage.fetch_attr_names(table_name)
+            if self.__shard_key not in attr_names:
+                raise AttributeNotFoundError(
+                    "shard key not found in the attributes: key={}, table={}".format(
+                        self.__shard_key, table_name
+                    )
+                )
+
+            table_sql = stage.execute_query(
+                "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", params=[table_name]
+            ).fetchone()[0]
+            index_sqls = stage.execute_query(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                params=[table_name],
+            ).fetchall()
+
+            def create_schema(shard):
+                if not shard.has_table(table_name):
+                    shard.execute_query(table_sql)
+
+            def create_indices(shard):
+                index_names = set(
+                    row[0]
+                    for row in shard.execute_query(
+                        "SELECT name FROM sqlite_master WHERE type='index'"
+                    ).fetchall()
+                )
+
+                for index_name, index_sql in index_sqls:
+                    if index_name not in index_names:
+                        shard.execute_query(index_sql)
+
+            self.__affinity_tables.pop(table_name, None)
+            self.__map_shards(create_schema)
+
+            cursor = stage.select("*", table_name)
+            while True:
+                records = cursor.fetchmany(self.__STAGE_CHUNK_SIZE)
+                if not records:
+                    break
+                self.insert_many(table_name, records, attr_names=attr_names)
+
+            self.__map_shards(create_indices)
+
+        stage.close()
+        self.commit()
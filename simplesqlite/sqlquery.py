@@ -7,9 +7,8 @@
 from __future__ import absolute_import, unicode_literals
 
 import six
-import typepy
 
-from ._func import validate_table_name
+from ._func import is_empty_sequence, is_null_string, validate_table_name
 from .query import And, Attr, Or, Table, Value, Where
 
 
@@ -36,7 +35,7 @@ class SqlQuery(object):
 
         table = Table(table)
 
-        if typepy.is_empty_sequence(insert_tuple):
+        if is_empty_sequence(insert_tuple):
             raise ValueError("empty insert list/tuple")
 
         return "INSERT INTO {:s} VALUES ({:s})".format(
@@ -61,7 +60,7 @@ class SqlQuery(object):
         """
 
         validate_table_name(table)
-        if typepy.is_null_string(set_query):
+        if is_null_string(set_query):
             raise ValueError("SET query is null")
 
         query_list = ["UPDATE {:s}".format(Table(table)), "SET {:s}".format(set_query)]
@@ -85,6 +84,9 @@ class SqlQuery(object):
             >>> from simplesqlite.sqlquery import SqlQuery
             >>> SqlQuery.make_where_in("key", ["hoge", "foo", "bar"])
             "key IN ('hoge', 'foo', 'bar')"
+
+        .. seealso::
+            :py:meth:`simplesqlite.SimpleSQLite.where_in` for a large number of values.
         """
 
         return "{:s} IN ({:s})".format(
@@ -106,6 +108,9 @@ class SqlQuery(object):
             >>> from simplesqlite.sqlquery import SqlQuery
             >>> SqlQuery.make_where_not_in("key", ["hoge", "foo", "bar"])
             "key NOT IN ('hoge', 'foo', 'bar')"
+
+        .. seealso::
+            :py:meth:`simplesqlite.SimpleSQLite.where_in` for a large number of values.
         """
 
         return "{:s} NOT IN ({:s})".format(
@@ -0,0 +1,353 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from six.moves import queue
+
+from ._logger import logger
+from .core import MEMORY_DB_NAME, SimpleSQLite
+from .error import DatabaseError
+
+
+WriterStats = namedtuple(
+    "WriterStats", "num_batches num_operations num_failed_operations max_batch_size"
+)
+
+
+class _Operation(object):
+    __slots__ = ("func", "future", "submitted_time")
+
+    def __init__(self, func):
+        self.func = func
+        self.future = Future()
+        self.submitted_time = time.time()
+
+
+_STOP = object()
+
+
+class WriterService(object):
+    """
+    Single writer for a SQLite database that applies write operations
+    submitted from many producer threads.
+    Operations are queued and applied by a dedicated thread
+    in batched transactions (group commit):
+    a batch is committed when it reaches ``max_batch`` operations,
+    or when ``max_latency`` seconds have elapsed since the first operation of the batch
+    was submitted.
+
+    Each operation runs within a savepoint, so that a failing operation does not
+    affect the other operations of the same batch.
+
+    :param SimpleSQLite con:
+        Connection to the database to write.
+        The writer thread opens a dedicated connection to the same database file.
+    :param int max_batch: Maximum number of operations in a transaction.
+    :param float max_latency:
+        Maximum seconds to wait for more operations before committing a batch.
+    :param int max_queue_size:
+        Maximum number of pending operations. Submitting operations blocks
+        while the queue is full. Unlimited if the value is zero.
+    :param kwargs:
+        Keyword arguments passed to |SimpleSQLite| constructor for the writer connection.
+    :raises ValueError: If the ``con`` is connected to an in-memory database.
+    :raises IOError: |raises_write_permission|
+
+    :Sample Code:
+        .. code:: python
+
+            from simplesqlite import SimpleSQLite, WriterService
+
+            con = SimpleSQLite("sample.sqlite", "a", journal_mode="wal")
+
+            with WriterService(con, max_batch=500, max_latency=0.01) as writer:
+                # from producer threads
+                future = writer.submit_insert("sample_table", [[1, "a"], [2, "b"]])
+                print(future.result())
+    """
+
+    @property
+    def database_path(self):
+        return self.__database_path
+
+    @property
+    def stats(self):
+        """
+        :return: Statistics of applied batches/operations.
+        :rtype: WriterStats
+        """
+
+        with self.__lock:
+            return WriterStats(
+                num_batches=self.__num_batches,
+                num_operations=self.__num_operations,
+                num_failed_operations=self.__num_failed_operations,
+                max_batch_size=self.__max_batch_size,
+            )
+
+    def __init__(self, con, max_batch=1000, max_latency=0.05, max_queue_size=0, **kwargs):
+        con.validate_access_permission(["w", "a"])
+        if con.database_path == MEMORY_DB_NAME:
+            raise ValueError("writer service is not available for an in-memory database")
+        if max_batch < 1:
+            raise ValueError("max_batch must be greater than zero: actual={}".format(max_batch))
+
+        self.__database_path = con.database_path
+        self.__max_batch = max_batch
+        self.__max_latency = max_latency
+        self.__con_kwargs = kwargs
+
+        self.__queue = queue.Queue(max_queue_size)
+        self.__lock = threading.Lock()
+        self.__submit_lock = threading.Lock()  # guard the stop check and the put to the queue
+        self.__thread = None
+        self.__is_stopping = False
+
+        self.__num_batches = 0
+        self.__num_operations = 0
+        self.__num_failed_operations = 0
+        self.__max_batch_size = 0
+
+        self.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def is_running(self):
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+
+        connected = threading.Event()
+        errors = []
+
+        self.__is_stopping = False
+        self.__thread = threading.Thread(
+            target=self.__run, args=(connected, errors), name="simplesqlite-writer"
+        )
+        self.__thread.daemon = True
+        self.__thread.start()
+
+        connected.wait()
+        if errors:
+            self.__thread.join()
+            self.__thread = None
+            raise errors[0]
+
+    def stop(self, timeout=None):
+        """
+        Apply all of the pending operations, then stop the writer thread.
+        Futures of operations that could not be applied are set
+        :py:class:`~simplesqlite.DatabaseError`.
+        """
+
+        with self.__submit_lock:
+            if self.__thread is None:
+                return
+
+            self.__is_stopping = True
+            self.__queue.put(_STOP)
+
+        self.__thread.join(timeout)
+        if not self.__thread.is_alive():
+            self.__fail_pending([])
+        self.__thread = None
+
+    def submit(self, func):
+        """
+        Submit an arbitrary write operation.
+
+        :param func:
+            Callable that accepts the writer |SimpleSQLite| instance.
+            The return value of the callable is set to the result of the future.
+        :return: Future of the operation, resolved after the batch committed.
+        :rtype: concurrent.futures.Future
+        :raises simplesqlite.DatabaseError: If the writer is not running.
+        """
+
+        operation = _Operation(func)
+
+        with self.__submit_lock:
+            if self.__is_stopping or not self.is_running():
+                raise DatabaseError("writer service is not running")
+
+            self.__queue.put(operation)
+
+        return operation.future
+
+    def submit_insert(self, table_name, records, attr_names=None):
+        """
+        Submit an insert operation.
+
+        :return: Future of the number of inserted records.
+        :rtype: concurrent.futures.Future
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.insert_many`
+        """
+
+        return self.submit(lambda con: con.insert_many(table_name, records, attr_names))
+
+    def submit_update(self, table_name, set_query, where=None):
+        """
+        Submit an update operation.
+
+        :return: Future of the number of updated records.
+        :rtype: concurrent.futures.Future
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.update`
+        """
+
+        return self.submit(lambda con: con.update(table_name, set_query, where).rowcount)
+
+    def submit_delete(self, table_name, where=None):
+        """
+        Submit a delete operation.
+
+        :return: Future of the number of deleted records.
+        :rtype: concurrent.futures.Future
+
+        .. seealso:: :py:meth:`simplesqlite.SimpleSQLite.delete`
+        """
+
+        return self.submit(lambda con: con.delete(table_name, where).rowcount)
+
+    def __run(self, connected, errors):
+        try:
+            con = SimpleSQLite(
+                self.__database_path, "a", delayed_connection=False, **self.__con_kwargs
+            )
+        except Exception as e:
+            errors.append(e)
+            connected.set()
+            return
+
+        connected.set()
+
+        batch = []
+        try:
+            is_stop = False
+            while not is_stop:
+                batch, is_stop = self.__collect_batch()
+                if batch:
+                    self.__apply_batch(con, batch)
+                batch = []
+        finally:
+            con.close()
+
+            # the thread may exit by an unexpected exception:
+            # reject further operations and fail the pending operations
+            with self.__submit_lock:
+                self.__is_stopping = True
+            self.__fail_pending(batch)
+
+    def __collect_batch(self):
+        operation = self.__queue.get()
+        if operation is _STOP:
+            return ([], True)
+
+        batch = [operation]
+        deadline = operation.submitted_time + self.__max_latency
+
+        while len(batch) < self.__max_batch:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0:
+                    operation = self.__queue.get(timeout=remaining)
+                else:
+                    operation = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if operation is _STOP:
+                return (batch, True)
+
+            batch.append(operation)
+
+        return (batch, False)
+
+    def __apply_batch(self, con, batch):
+        batch = [
+            operation for operation in batch if operation.future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        succeeded = []
+        num_failed = 0
+        try:
+            with con.transaction("immediate"):
+                for operation in batch:
+                    try:
+                        with con.transaction():
+                            result = operation.func(con)
+                    except Exception as e:
+                        operation.future.set_exception(e)
+                        num_failed += 1
+                        continue
+
+                    succeeded.append((operation, result))
+        except Exception as e:
+            self.__fail([operation for operation in batch if not operation.future.done()], e)
+            return
+
+        logger.debug(
+            "commit a batch: path='{}', operations={}, failed={}",
+            self.database_path,
+            len(batch),
+            num_failed,
+        )
+
+        with self.__lock:
+            self.__num_batches += 1
+            self.__num_operations += len(batch)
+            self.__num_failed_operations += num_failed
+            self.__max_batch_size = max(self.__max_batch_size, len(batch))
+
+        for operation, result in succeeded:
+            operation.future.set_result(result)
+
+    def __fail_pending(self, operations):
+        operations = list(operations)
+        while True:
+            try:
+                operation = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if operation is not _STOP:
+                operations.append(operation)
+
+        # operations of an interrupted batch are already running
+        operations = [
+            operation
+            for operation in operations
+            if operation.future.running()
+            or (not operation.future.done() and operation.future.set_running_or_notify_cancel())
+        ]
+        if not operations:
+            return
+
+        self.__fail(
+            operations, DatabaseError("writer service stopped before applying the operation")
+        )
+
+    def __fail(self, operations, error):
+        with self.__lock:
+            self.__num_failed_operations += len(operations)
+
+        for operation in operations:
+            operation.future.set_exception(error)
@@ -0,0 +1,132 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import asyncio
+import time
+
+import pytest
+from simplesqlite import OperationalError, SimpleSQLite, TableNotFoundError
+from simplesqlite.aio import AsyncSimpleSQLite
+
+from .fixture import TEST_TABLE_NAME
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def db_path(tmpdir):
+    p = tmpdir.join("tmp_aio.db")
+
+    with SimpleSQLite(str(p), "w", journal_mode="wal") as con:
+        con.create_table_from_data_matrix(
+            TEST_TABLE_NAME, ["attr_a", "attr_b"], [[i, i * 10] for i in range(1000)]
+        )
+
+    return str(p)
+
+
+class Test_AsyncSimpleSQLite(object):
+    @pytest.mark.parametrize(["num_readers"], [[0], [2]])
+    def test_normal(self, db_path, num_readers):
+        async def main():
+            async with AsyncSimpleSQLite(db_path, "a", num_readers=num_readers) as con:
+                assert await con.insert_many(TEST_TABLE_NAME, [[1000, 0], [1001, 0]]) == 2
+                await con.commit()
+
+                assert await con.fetch_num_records(TEST_TABLE_NAME) == 1002
+                assert await con.fetch_value("attr_b", TEST_TABLE_NAME, where="attr_a = 2") == 20
+                assert await con.update(TEST_TABLE_NAME, "attr_b = -1", where="attr_a >= 1000") == 2
+                assert await con.delete(TEST_TABLE_NAME, where="attr_b = -1") == 2
+                assert await con.select("attr_a", TEST_TABLE_NAME, extra="LIMIT 2") == [(0,), (1,)]
+                assert await con.execute_query("SELECT 1") == [(1,)]
+
+                with pytest.raises(TableNotFoundError):
+                    await con.select_as_dict("not_existing")
+
+        run(main())
+
+    def test_normal_aselect(self, db_path):
+        async def main():
+            rows = []
+            async with AsyncSimpleSQLite(db_path, "r", chunk_size=64) as con:
+                async for row in con.aselect("attr_a", TEST_TABLE_NAME):
+                    rows.append(row)
+
+            return rows
+
+        assert run(main()) == [(i,) for i in range(1000)]
+
+    def test_normal_aselect_break(self, db_path):
+        async def main():
+            async with AsyncSimpleSQLite(db_path, "r", chunk_size=10) as con:
+                rows = con.aselect("attr_a", TEST_TABLE_NAME)
+                async for row in rows:
+                    if row[0] == 5:
+                        break
+                await rows.aclose()
+
+                return await con.fetch_num_records(TEST_TABLE_NAME)
+
+        assert run(main()) == 1000
+
+    def test_normal_readers_wal(self, tmpdir):
+        p = tmpdir.join("tmp_aio_wal.db")
+
+        async def main():
+            async with AsyncSimpleSQLite(str(p), "w", num_readers=2, journal_mode="wal") as con:
+                await con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1], [2]])
+                await con.commit()
+
+                assert await con.execute_query("PRAGMA journal_mode") == [("wal",)]
+                assert await con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+                rows = []
+                async for row in con.aselect("attr_a", TEST_TABLE_NAME):
+                    rows.append(row)
+
+                return rows
+
+        assert run(main()) == [(1,), (2,)]
+
+    def test_normal_cancel(self, db_path):
+        slow_query = (
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+            "SELECT COUNT(*) FROM c"
+        )
+
+        async def main():
+            async with AsyncSimpleSQLite(db_path, "a") as con:
+                task = asyncio.ensure_future(con.execute_query(slow_query))
+                await asyncio.sleep(0.1)
+                task.cancel()
+
+                start_time = time.time()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+                # interrupted query should not keep the connection busy
+                assert await con.fetch_num_records(TEST_TABLE_NAME) == 1000
+                assert time.time() - start_time < 5
+
+        run(main())
+
+    def test_exception(self, db_path):
+        async def main():
+            async with AsyncSimpleSQLite(db_path, "a") as con:
+                await con.execute_query("INVALID QUERY")
+
+        with pytest.raises(OperationalError):
+            run(main())
+
+    def test_exception_memdb_readers(self):
+        with pytest.raises(ValueError):
+            AsyncSimpleSQLite(":memory:", "w", num_readers=1)
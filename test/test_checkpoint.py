@@ -0,0 +1,160 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import sqlite3
+import time
+
+import pytest
+from simplesqlite import SimpleSQLite, connect_memdb
+from simplesqlite.checkpoint import CheckpointManager
+
+from .fixture import TEST_TABLE_NAME
+
+
+def wait_until(predicate, timeout=5):
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        if predicate():
+            return True
+        time.sleep(0.01)
+
+    return False
+
+
+class LockedConnection(object):
+    """
+    Connection that fails to read the data version for the first few times.
+    """
+
+    def __init__(self, connection, num_failures):
+        self.__connection = connection
+        self.__num_failures = num_failures
+
+    def execute(self, query):
+        if query == "PRAGMA data_version" and self.__num_failures > 0:
+            self.__num_failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+
+        return self.__connection.execute(query)
+
+    def close(self):
+        self.__connection.close()
+
+
+@pytest.fixture
+def con_wal(tmpdir):
+    p = tmpdir.join("tmp_wal.db")
+    con = SimpleSQLite(str(p), "w", journal_mode="wal")
+
+    con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a", "attr_b"], [[1, 2], [3, 4]])
+
+    return con
+
+
+class Test_SimpleSQLite_journal_mode(object):
+    def test_normal(self, con_wal):
+        assert con_wal.journal_mode == "wal"
+
+    @pytest.mark.parametrize(
+        ["mode", "journal_mode", "expected"],
+        [["w", "invalid", ValueError], ["r", "wal", ValueError]],
+    )
+    def test_exception(self, tmpdir, mode, journal_mode, expected):
+        p = tmpdir.join("tmp.db")
+        SimpleSQLite(str(p), "w", delayed_connection=False).close()
+
+        with pytest.raises(expected):
+            SimpleSQLite(str(p), mode, journal_mode=journal_mode).connection
+
+
+class Test_SimpleSQLite_start_checkpoint_manager(object):
+    def test_normal(self, con_wal):
+        manager = con_wal.start_checkpoint_manager(
+            wal_size_threshold=1, idle_interval=0.1, poll_interval=0.01
+        )
+        assert manager.is_running()
+        assert con_wal.checkpoint_manager is manager
+        assert con_wal.execute_query("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+
+        con_wal.insert_many(TEST_TABLE_NAME, [[i, i] for i in range(100)])
+        con_wal.commit()
+
+        assert wait_until(lambda: manager.metrics.last_checkpoint_mode == "TRUNCATE")
+        assert manager.metrics.num_checkpoints >= 1
+        assert manager.metrics.total_checkpoint_duration >= 0
+        assert manager.wal_size == 0
+
+        con_wal.stop_checkpoint_manager()
+        assert not manager.is_running()
+        assert con_wal.checkpoint_manager is None
+        assert con_wal.execute_query("PRAGMA wal_autocheckpoint").fetchone()[0] == 1000
+
+    def test_normal_steady_writes(self, con_wal):
+        manager = con_wal.start_checkpoint_manager(
+            wal_size_threshold=64 * 1024, idle_interval=60, poll_interval=0.01
+        )
+
+        con_wal.insert_many(TEST_TABLE_NAME, [[i, "a" * 100] for i in range(2000)])
+        con_wal.commit()
+        assert wait_until(lambda: manager.metrics.num_checkpoints == 1)
+
+        for i in range(20):
+            con_wal.insert(TEST_TABLE_NAME, [i, i])
+            con_wal.commit()
+            time.sleep(0.02)
+
+        # small writes after a checkpoint do not trigger checkpoints at every poll
+        assert manager.metrics.num_checkpoints == 1
+
+        con_wal.stop_checkpoint_manager()
+
+    def test_normal_locked(self, con_wal, monkeypatch):
+        connect = CheckpointManager._CheckpointManager__connect
+        monkeypatch.setattr(
+            CheckpointManager,
+            "_CheckpointManager__connect",
+            lambda manager: LockedConnection(connect(manager), num_failures=3),
+        )
+        con_wal.insert_many(TEST_TABLE_NAME, [[i, i] for i in range(100)])
+        con_wal.commit()
+
+        manager = con_wal.start_checkpoint_manager(idle_interval=0.1, poll_interval=0.01)
+
+        # the manager keeps polling after failures of the first data version fetches
+        assert wait_until(lambda: manager.metrics.last_checkpoint_mode == "TRUNCATE")
+        assert manager.is_running()
+
+        con_wal.stop_checkpoint_manager()
+
+    def test_exception_memdb(self):
+        with pytest.raises(ValueError):
+            connect_memdb().start_checkpoint_manager()
+
+    def test_exception_not_wal(self, tmpdir):
+        p = tmpdir.join("tmp.db")
+
+        with pytest.raises(ValueError):
+            SimpleSQLite(str(p), "w").start_checkpoint_manager()
+
+
+class Test_CheckpointManager_checkpoint(object):
+    def test_normal(self, con_wal):
+        con_wal.insert_many(TEST_TABLE_NAME, [[i, i] for i in range(100)])
+        con_wal.commit()
+
+        manager = CheckpointManager(con_wal.database_path)
+        assert manager.wal_size > 0
+
+        assert manager.checkpoint("truncate")
+        assert manager.wal_size == 0
+        assert manager.metrics.num_checkpoints == 1
+        assert manager.metrics.last_checkpoint_mode == "TRUNCATE"
+
+    def test_exception(self, con_wal):
+        with pytest.raises(ValueError):
+            CheckpointManager(con_wal.database_path).checkpoint("invalid")
@@ -6,7 +6,10 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+from decimal import Decimal
+
 import pytest
+import typepy
 from simplesqlite import (
     NameValidationError,
     NullDatabaseConnectionError,
@@ -14,7 +17,15 @@ from simplesqlite import (
     connect_memdb,
     copy_table,
 )
-from simplesqlite._func import validate_attr_name, validate_table_name
+from simplesqlite._func import (
+    is_empty_sequence,
+    is_not_empty_sequence,
+    is_not_null_string,
+    is_null_string,
+    is_number,
+    validate_attr_name,
+    validate_table_name,
+)
 
 from .fixture import (  # noqa: W0611
     TEST_TABLE_NAME,
@@ -66,6 +77,45 @@ class Test_validate_attr_name(object):
             validate_attr_name(value)
 
 
+TYPECHECK_VALUES = [
+    None,
+    True,
+    0,
+    1,
+    2 ** 70,
+    1.5,
+    float("inf"),
+    float("nan"),
+    Decimal("1.5"),
+    Decimal("nan"),
+    "",
+    " ",
+    "a",
+    "1",
+    " 1.5 ",
+    "1e3",
+    "1e",
+    "0x10",
+    "inf",
+    b"",
+    b"1",
+    [],
+    [1],
+]
+
+
+class Test_typecheck(object):
+    @pytest.mark.parametrize(["value"], [[value] for value in TYPECHECK_VALUES])
+    def test_normal(self, value):
+        assert is_null_string(value) == typepy.is_null_string(value)
+        assert is_not_null_string(value) == typepy.is_not_null_string(value)
+        assert is_empty_sequence(value) == typepy.is_empty_sequence(value)
+        assert is_not_empty_sequence(value) == typepy.is_not_empty_sequence(value)
+        assert is_number(value) == (
+            typepy.Integer(value).is_type() or typepy.RealNumber(value).is_type()
+        )
+
+
 class Test_append_table(object):
     def test_normal(self, con_mix, con_empty):
         assert append_table(src_con=con_mix, dst_con=con_empty, table_name=TEST_TABLE_NAME)
@@ -0,0 +1,70 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import print_function, unicode_literals
+
+import os
+import subprocess
+import sys
+
+import pytest
+import simplesqlite
+
+
+HEAVY_MODULES = ("typepy", "dataproperty", "tabledata", "sqliteschema", "mbstrdecoder")
+
+
+def load_modules(statement):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(simplesqlite.__file__)))
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "{}; import sys; print(' '.join(sorted(sys.modules)))".format(statement),
+        ],
+        env=env,
+    )
+
+    return set(output.decode("utf-8").split())
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="requires module __getattr__ (PEP 562)")
+class Test_lazy_import(object):
+    @pytest.mark.parametrize(
+        ["statement", "expected"],
+        [
+            ["import simplesqlite", HEAVY_MODULES],
+            ["import simplesqlite.query", HEAVY_MODULES],
+            ["from simplesqlite import SimpleSQLite", HEAVY_MODULES],
+            ["from simplesqlite import connect_memdb; connect_memdb()", HEAVY_MODULES],
+            [
+                "from simplesqlite.query import AttrList, Insert, Upsert, Value, Where; "
+                "Insert('A', AttrList(['B'])).to_query(); Value('1').to_query(); "
+                "Upsert('A', AttrList(['B']), AttrList(['B']), AttrList([])).to_query(); "
+                "Where('B', 1).to_query()",
+                HEAVY_MODULES,
+            ],
+        ],
+    )
+    def test_normal_deferred(self, statement, expected):
+        loaded_modules = load_modules(statement)
+
+        for module_name in expected:
+            assert module_name not in loaded_modules
+
+    def test_normal_attr(self):
+        from simplesqlite.error import NameValidationError
+        from tabledata import NameValidationError as TableDataNameValidationError
+
+        assert simplesqlite.NameValidationError is TableDataNameValidationError
+        assert NameValidationError is TableDataNameValidationError
+        assert simplesqlite.query.Attr("a").to_query() == "a"
+        assert "SimpleSQLite" in dir(simplesqlite)
+
+    def test_exception_attr(self):
+        with pytest.raises(AttributeError):
+            simplesqlite.not_existing_attr
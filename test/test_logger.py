@@ -7,7 +7,8 @@
 from __future__ import print_function, unicode_literals
 
 import pytest
-from simplesqlite import set_log_level, set_logger
+from simplesqlite import connect_memdb, set_log_level, set_logger
+from tabledata import TableData
 
 
 logbook = pytest.importorskip("logbook", minversion="0.12.3")
@@ -44,3 +45,19 @@ class Test_set_log_level(object):
     def test_exception(self, value, expected):
         with pytest.raises(expected):
             set_log_level(value)
+
+
+class Test_lazy_logging(object):
+    def test_normal(self):
+        class NoReprTableData(TableData):
+            def __repr__(self):
+                raise AssertionError("should not be rendered while the logger is disabled")
+
+        set_logger(False)
+
+        con = connect_memdb()
+        con.create_table_from_tabledata(
+            NoReprTableData("tablename", ["attr_a", "attr_b"], [[1, 2], [3, 4]])
+        )
+
+        assert con.fetch_num_records("tablename") == 2
@@ -0,0 +1,312 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import print_function, unicode_literals
+
+from collections import OrderedDict
+
+import pytest
+from simplesqlite import SimpleSQLite, TableNotFoundError, connect_memdb
+from simplesqlite.query import make_index_name
+
+from .fixture import TEST_TABLE_NAME
+
+
+def sum_records(records):
+    return sum(a * b for a, b in records)
+
+
+def count_records(records):
+    return len(records)
+
+
+def add(x, y):
+    return x + y
+
+
+@pytest.fixture
+def con_large(tmpdir):
+    p = tmpdir.join("tmp_large.db")
+    con = SimpleSQLite(str(p), "w")
+
+    con.create_table_from_data_matrix(
+        TEST_TABLE_NAME, ["attr_a", "attr_b"], [[i, i % 7] for i in range(1000)]
+    )
+    con.commit()
+
+    return con
+
+
+class Test_SimpleSQLite_parallel_map(object):
+    @pytest.mark.parametrize(["workers", "chunk_size"], [[1, None], [2, None], [3, 7]])
+    def test_normal(self, con_large, workers, chunk_size):
+        expected = sum(i * (i % 7) for i in range(1000))
+
+        assert (
+            con_large.parallel_map(
+                TEST_TABLE_NAME,
+                sum_records,
+                workers=workers,
+                reduce_func=add,
+                chunk_size=chunk_size,
+            )
+            == expected
+        )
+
+    def test_normal_chunks(self, con_large):
+        results = con_large.parallel_map(
+            TEST_TABLE_NAME, count_records, ["attr_a"], workers=2, chunk_size=300
+        )
+
+        assert results == [300, 300, 300, 100]
+
+    def test_normal_chunks_sparse(self, tmpdir):
+        con = SimpleSQLite(str(tmpdir.join("tmp_sparse.db")), "w")
+        con.create_table(TEST_TABLE_NAME, ["id INTEGER PRIMARY KEY", "value INTEGER"])
+        con.insert_many(TEST_TABLE_NAME, [[i, 0] for i in range(100)])
+        con.insert_many(TEST_TABLE_NAME, [[10 ** 9 + i, 0] for i in range(900)])
+        con.commit()
+
+        results = con.parallel_map(TEST_TABLE_NAME, count_records, partition_key="id", workers=1)
+        assert results == [250, 250, 250, 250]
+
+        results = con.parallel_map(
+            TEST_TABLE_NAME, count_records, partition_key="id", workers=2, chunk_size=300
+        )
+        assert results == [300, 300, 300, 100]
+
+    def test_normal_chunks_duplicate_keys(self, con_large):
+        results = con_large.parallel_map(
+            TEST_TABLE_NAME, count_records, ["attr_a"], partition_key="attr_b", chunk_size=200
+        )
+
+        # records of the same key are not split into different chunks
+        assert results == [286, 286, 286, 142]
+
+    def test_normal_where(self, con_large):
+        assert (
+            con_large.parallel_map(
+                TEST_TABLE_NAME,
+                count_records,
+                ["attr_a"],
+                workers=2,
+                where="attr_b = 0",
+                reduce_func=add,
+                partition_key="attr_a",
+            )
+            == 143
+        )
+
+    def test_normal_empty(self, con_large):
+        assert con_large.parallel_map(TEST_TABLE_NAME, count_records, where="attr_a < 0") == []
+        assert (
+            con_large.parallel_map(
+                TEST_TABLE_NAME, count_records, where="attr_a < 0", reduce_func=add
+            )
+            is None
+        )
+
+    def test_exception(self, con_large):
+        with pytest.raises(TableNotFoundError):
+            con_large.parallel_map("not_exist_table", count_records)
+
+        con_large.execute_query("CREATE TABLE text_key (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        con_large.insert("text_key", ["a"])
+        con_large.commit()
+        with pytest.raises(ValueError):
+            con_large.parallel_map("text_key", count_records, partition_key="key")
+
+    def test_exception_memdb(self):
+        con = connect_memdb()
+        con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1]])
+
+        with pytest.raises(ValueError):
+            con.parallel_map(TEST_TABLE_NAME, count_records)
+
+
+class Test_SimpleSQLite_parallel_aggregate(object):
+    def test_normal(self, con_large):
+        expected = [
+            OrderedDict(
+                [
+                    ("attr_b", b),
+                    ("sum(attr_a)", row[0]),
+                    ("count(*)", row[1]),
+                    ("min(attr_a)", row[2]),
+                    ("max(attr_a)", row[3]),
+                    ("avg(attr_a)", row[4]),
+                ]
+            )
+            for b, row in [
+                (
+                    b,
+                    con_large.execute_query(
+                        "SELECT SUM(attr_a),COUNT(*),MIN(attr_a),MAX(attr_a),AVG(attr_a) "
+                        "FROM test_table WHERE attr_b = {}".format(b)
+                    ).fetchone(),
+                )
+                for b in range(7)
+            ]
+        ]
+
+        result = con_large.parallel_aggregate(
+            TEST_TABLE_NAME,
+            "attr_b",
+            OrderedDict(
+                [
+                    ("sum", "attr_a"),
+                    ("count", "*"),
+                    ("min", "attr_a"),
+                    ("max", "attr_a"),
+                    ("avg", "attr_a"),
+                ]
+            ),
+            workers=2,
+        )
+
+        assert result == expected
+
+    def test_normal_no_group(self, con_large):
+        result = con_large.parallel_aggregate(
+            TEST_TABLE_NAME,
+            None,
+            {"sum": ["attr_a", "attr_b"]},
+            workers=3,
+            where="attr_a < 100",
+            chunk_size=30,
+        )
+
+        assert result == [
+            OrderedDict(
+                [("sum(attr_a)", sum(range(100))), ("sum(attr_b)", sum(i % 7 for i in range(100)))]
+            )
+        ]
+
+    def test_normal_null(self, tmpdir):
+        p = tmpdir.join("tmp_null.db")
+        con = SimpleSQLite(str(p), "w")
+        con.create_table_from_data_matrix(
+            TEST_TABLE_NAME, ["attr_a", "attr_b"], [[1, None], [2, None], [None, 3], [4, 5]]
+        )
+        con.commit()
+
+        result = con.parallel_aggregate(
+            TEST_TABLE_NAME,
+            "attr_a",
+            OrderedDict([("sum", "attr_b"), ("count", "attr_b"), ("avg", "attr_b")]),
+            workers=2,
+            chunk_size=1,
+        )
+
+        assert result == [
+            OrderedDict(zip(["attr_a", "sum(attr_b)", "count(attr_b)", "avg(attr_b)"], values))
+            for values in [(None, 3, 1, 3.0), (1, None, 0, None), (2, None, 0, None), (4, 5, 1, 5.0)]
+        ]
+
+    def test_normal_mixed_types(self, tmpdir):
+        p = tmpdir.join("tmp_mixed.db")
+        con = SimpleSQLite(str(p), "w")
+        con.create_table(TEST_TABLE_NAME, ["attr_a INTEGER", "attr_b BLOB"])
+        con.insert_many(TEST_TABLE_NAME, [[1, 5], [2, "a"], [3, 2], [4, "b"], [5, 1.5]])
+        con.commit()
+
+        result = con.parallel_aggregate(
+            TEST_TABLE_NAME,
+            None,
+            OrderedDict([("min", "attr_b"), ("max", "attr_b")]),
+            workers=2,
+            chunk_size=1,
+        )
+
+        assert result == [OrderedDict([("min(attr_b)", 1.5), ("max(attr_b)", "b")])]
+        assert con.execute_query(
+            "SELECT MIN(attr_b),MAX(attr_b) FROM {}".format(TEST_TABLE_NAME)
+        ).fetchone() == (1.5, "b")
+
+    @pytest.mark.parametrize(
+        ["aggregates", "expected"], [[{}, ValueError], [{"median": "attr_a"}, ValueError]]
+    )
+    def test_exception(self, con_large, aggregates, expected):
+        with pytest.raises(expected):
+            con_large.parallel_aggregate(TEST_TABLE_NAME, "attr_b", aggregates)
+
+
+class Test_SimpleSQLite_parallel_load(object):
+    @pytest.mark.parametrize(["workers", "chunk_size"], [[1, None], [2, None], [3, 70]])
+    def test_normal(self, tmpdir, workers, chunk_size):
+        p = tmpdir.join("tmp_load.db")
+        con = SimpleSQLite(str(p), "w")
+        data_matrix = [[i, i / 2.0, "text{:d}".format(i)] for i in range(500)]
+
+        con.parallel_load(
+            TEST_TABLE_NAME,
+            ["attr_a", "attr_b", "attr_c"],
+            data_matrix,
+            primary_key="attr_a",
+            index_attrs=["attr_c"],
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+
+        con.create_table_from_data_matrix(
+            "expected", ["attr_a", "attr_b", "attr_c"], data_matrix, primary_key="attr_a"
+        )
+        assert con.fetch_attr_type(TEST_TABLE_NAME) == con.fetch_attr_type("expected")
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 500
+        assert (
+            con.select("*", TEST_TABLE_NAME, extra="ORDER BY attr_a").fetchall()
+            == [tuple(row) for row in data_matrix]
+        )
+        assert make_index_name(TEST_TABLE_NAME, "attr_c") in [
+            record["name"] for record in con.fetch_sqlite_master() if record["type"] == "index"
+        ]
+        assert not [path for path in tmpdir.listdir() if path.basename.startswith("simplesqlite_")]
+
+    def test_normal_widen_types(self, tmpdir):
+        p = tmpdir.join("tmp_load.db")
+        con = SimpleSQLite(str(p), "w")
+        data_matrix = [[1, 1, None], [2, 2, None], [3, 3.5, 1], [4, "a", 2]]
+
+        con.parallel_load(
+            TEST_TABLE_NAME,
+            ["attr_a", "attr_b", "attr_c"],
+            data_matrix,
+            add_primary_key_column=True,
+            workers=2,
+            chunk_size=1,
+        )
+
+        con.create_table_from_data_matrix(
+            "expected", ["attr_a", "attr_b", "attr_c"], data_matrix, add_primary_key_column=True
+        )
+        assert con.fetch_attr_names(TEST_TABLE_NAME) == ["id", "attr_a", "attr_b", "attr_c"]
+        assert con.fetch_attr_type(TEST_TABLE_NAME) == con.fetch_attr_type("expected")
+        assert con.select("id, attr_a, attr_c", TEST_TABLE_NAME).fetchall() == [
+            (1, 1, None),
+            (2, 2, None),
+            (3, 3, 1),
+            (4, 4, 2),
+        ]
+
+    def test_normal_memdb(self):
+        con = connect_memdb()
+
+        con.parallel_load(TEST_TABLE_NAME, ["attr_a"], [[i] for i in range(10)], workers=2)
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 10
+
+    def test_exception(self, tmpdir):
+        p = tmpdir.join("tmp_load.db")
+        con = SimpleSQLite(str(p), "w")
+
+        with pytest.raises(ValueError):
+            con.parallel_load(TEST_TABLE_NAME, ["attr_a"], [])
+
+        with pytest.raises(ValueError):
+            con.parallel_load(TEST_TABLE_NAME, ["attr_a"], [[1]], primary_key="not_exist")
+
+        with pytest.raises(IOError):
+            SimpleSQLite(str(p), "r").parallel_load(TEST_TABLE_NAME, ["attr_a"], [[1]])
@@ -0,0 +1,307 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import datetime
+
+import pytest
+from simplesqlite import (
+    AttributeNotFoundError,
+    OperationalError,
+    PartitionedTable,
+    SimpleSQLite,
+    TableNotFoundError,
+)
+
+from .fixture import TEST_TABLE_NAME
+
+
+ATTR_DESCRIPTIONS = ["ts TEXT", "value INTEGER"]
+RECORDS = [
+    ["2020-01-01 10:00:00", 1],
+    ["2020-01-02 10:00:00", 2],
+    ["2020-01-02 11:00:00", 3],
+    ["2020-02-01 00:00:00", 4],
+]
+
+
+def fetch_view_values(con):
+    return [
+        value
+        for value, in con.execute_query("SELECT value FROM test_table ORDER BY value").fetchall()
+    ]
+
+
+@pytest.fixture
+def con(tmpdir):
+    p = tmpdir.join("tmp_partition.db")
+    con = SimpleSQLite(str(p), "w")
+
+    yield con
+
+    con.close()
+
+
+class Test_PartitionedTable_init(object):
+    @pytest.mark.parametrize(
+        ["time_attr", "interval", "expected"],
+        [["ts", "week", ValueError], ["not_exist", "day", AttributeNotFoundError]],
+    )
+    def test_exception(self, con, time_attr, interval, expected):
+        with pytest.raises(expected):
+            PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, time_attr, interval)
+
+
+class Test_PartitionedTable_get_partition_key(object):
+    @pytest.mark.parametrize(
+        ["value", "interval", "expected"],
+        [
+            ["2020-01-02 10:00:00", "day", "20200102"],
+            ["2020-01-02T10:00:00", "month", "202001"],
+            ["2020-01", "month", "202001"],
+            [datetime.datetime(2020, 3, 4, 5), "day", "20200304"],
+            [datetime.date(2020, 3, 4), "month", "202003"],
+            [86400 * 2 + 1, "day", "19700103"],
+            [86400.5, "day", "19700102"],
+        ],
+    )
+    def test_normal(self, con, value, interval, expected):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", interval)
+
+        assert table.get_partition_key(value) == expected
+
+    @pytest.mark.parametrize(["value"], [["2020-01"], ["abc"], [None], [True]])
+    def test_exception(self, con, value):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+
+        with pytest.raises(ValueError):
+            table.get_partition_key(value)
+
+
+class Test_PartitionedTable_insert_many(object):
+    @pytest.mark.parametrize(
+        ["interval", "expected"],
+        [
+            [
+                "day",
+                [
+                    "test_table_p20200101",
+                    "test_table_p20200102",
+                    "test_table_p20200201",
+                ],
+            ],
+            ["month", ["test_table_p202001", "test_table_p202002"]],
+        ],
+    )
+    def test_normal(self, con, interval, expected):
+        table = PartitionedTable(
+            con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", interval, index_attrs=["value"]
+        )
+
+        assert table.insert_many(RECORDS) == 4
+        table.commit()
+
+        assert table.partitions == expected
+        assert con.execute_query("SELECT * FROM test_table ORDER BY value").fetchall() == [
+            tuple(record) for record in RECORDS
+        ]
+
+        # existing partitions are loaded
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", interval)
+        assert table.partitions == expected
+
+    def test_normal_dict(self, con):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+
+        table.insert_many([{"ts": "2020-01-01", "value": 1}, {"value": 2, "ts": "2020-01-01"}])
+
+        assert con.fetch_num_records("test_table_p20200101") == 2
+
+    def test_exception(self, con):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+
+        with pytest.raises(AttributeNotFoundError):
+            table.insert_many([[1]], attr_names=["value"])
+        with pytest.raises(ValueError):
+            table.insert_many([["invalid", 1]])
+
+
+class Test_PartitionedTable_select(object):
+    @pytest.mark.parametrize(
+        ["start", "end", "expected"],
+        [
+            [None, None, [1, 2, 3, 4]],
+            ["2020-01-02", None, [2, 3, 4]],
+            ["2020-01-02 10:30:00", "2020-02-01", [3]],
+            [None, "2020-01-02 10:00:00", [1]],
+            ["2021-01-01", None, []],
+        ],
+    )
+    def test_normal(self, con, start, end, expected):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+        table.insert_many(RECORDS)
+
+        result = table.select("value", start=start, end=end, extra="ORDER BY value").fetchall()
+
+        assert [value for value, in result] == expected
+
+    def test_normal_where(self, con):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+        table.insert_many(RECORDS)
+
+        assert table.select("SUM(value)", where="value > 1", start="2020-01-02").fetchone() == (9,)
+
+    def test_exception(self, con):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+
+        with pytest.raises(TableNotFoundError):
+            table.select("*")
+
+
+class Test_PartitionedTable_drop_partitions_before(object):
+    def test_normal(self, con):
+        table = PartitionedTable(con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts")
+        table.insert_many(RECORDS)
+        table.commit()
+
+        assert table.drop_partitions_before("2020-01-02 12:00:00") == ["test_table_p20200101"]
+        assert table.drop_partitions_before("2020-01-02") == []
+
+        assert not con.has_table("test_table_p20200101")
+        assert fetch_view_values(con) == [2, 3, 4]
+
+        table.drop_partitions_before("2021-01-01")
+        assert table.partitions == []
+        assert (
+            con.execute_query("SELECT name FROM sqlite_master WHERE type='view'").fetchall() == []
+        )
+
+    def test_normal_attach(self, con, tmpdir):
+        attach_dir = tmpdir.join("partitions")
+        table = PartitionedTable(
+            con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", "month", attach_dir=str(attach_dir)
+        )
+        table.insert_many(RECORDS)
+        table.commit()
+
+        assert sorted(path.basename for path in attach_dir.listdir()) == [
+            "test_table_p202001.sqlite",
+            "test_table_p202002.sqlite",
+        ]
+        assert fetch_view_values(con) == [1, 2, 3, 4]
+        assert [value for value, in table.select("value", start="2020-02-01").fetchall()] == [4]
+
+        assert table.drop_partitions_before("2020-02-01") == ["test_table_p202001"]
+        assert [path.basename for path in attach_dir.listdir()] == ["test_table_p202002.sqlite"]
+        assert fetch_view_values(con) == [4]
+
+        table.close()
+        table = PartitionedTable(
+            con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", "month", attach_dir=str(attach_dir)
+        )
+        assert table.partitions == ["test_table_p202002"]
+        assert fetch_view_values(con) == [4]
+        table.close()
+
+
+class Test_PartitionedTable_attach(object):
+    RECORDS = [["2020-01-{:02d} 10:00:00".format(day), day] for day in range(1, 16)]
+
+    def test_normal_many_partitions(self, con, tmpdir):
+        attach_dir = str(tmpdir.join("partitions"))
+        table = PartitionedTable(
+            con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", "day", attach_dir=attach_dir
+        )
+        assert table.insert_many(self.RECORDS) == 15
+        table.commit()
+
+        assert len(table.partitions) == 15
+        assert len(con.execute_query("PRAGMA database_list").fetchall()) <= 2 + 10
+        assert fetch_view_values(con) == [11, 12, 13, 14, 15]
+        assert [
+            value
+            for value, in table.select(
+                "value", start="2020-01-03", end="2020-01-06", extra="ORDER BY value"
+            ).fetchall()
+        ] == [3, 4, 5]
+        assert [value for value, in table.select("value", start="2020-01-15").fetchall()] == [15]
+
+        table.close()
+        table = PartitionedTable(
+            con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", "day", attach_dir=attach_dir
+        )
+        assert len(table.partitions) == 15
+        assert fetch_view_values(con) == [11, 12, 13, 14, 15]
+        assert table.insert_many([["2020-01-01 11:00:00", 16]]) == 1
+        assert [
+            value
+            for value, in table.select(
+                "value", start="2020-01-01", end="2020-01-02", extra="ORDER BY value"
+            ).fetchall()
+        ] == [1, 16]
+        table.close()
+
+    def test_normal_view_window(self, con, tmpdir):
+        table = PartitionedTable(
+            con,
+            TEST_TABLE_NAME,
+            ATTR_DESCRIPTIONS,
+            "ts",
+            "day",
+            attach_dir=str(tmpdir.join("partitions")),
+            view_window=0,
+        )
+        table.insert_many(self.RECORDS)
+
+        assert (
+            con.execute_query("SELECT name FROM sqlite_temp_master WHERE type='view'").fetchall()
+            == []
+        )
+        values = [value for value, in table.select("value", start="2020-01-14").fetchall()]
+        assert values == [14, 15]
+        table.close()
+
+    def test_normal_write_through_con(self, con, tmpdir):
+        con.set_autocommit_policy(max_rows=2)
+        table = PartitionedTable(
+            con,
+            TEST_TABLE_NAME,
+            ["ts TEXT", "value INTEGER NOT NULL"],
+            "ts",
+            "day",
+            attach_dir=str(tmpdir.join("partitions")),
+        )
+
+        assert table.insert_many([["2020-01-01 10:00:00", 1], ["2020-01-01 11:00:00", 2]]) == 2
+        assert not con.connection.in_transaction  # committed by the autocommit policy
+
+        with pytest.raises(OperationalError):
+            table.insert_many([["2020-01-01 11:00:00", None]])
+        table.close()
+
+    def test_exception(self, con, tmpdir):
+        attach_dir = str(tmpdir.join("partitions"))
+
+        with pytest.raises(ValueError):
+            PartitionedTable(
+                con,
+                TEST_TABLE_NAME,
+                ATTR_DESCRIPTIONS,
+                "ts",
+                "day",
+                attach_dir=attach_dir,
+                view_window=10,
+            )
+
+        table = PartitionedTable(
+            con, TEST_TABLE_NAME, ATTR_DESCRIPTIONS, "ts", "day", attach_dir=attach_dir
+        )
+        table.insert_many(self.RECORDS)
+
+        with pytest.raises(ValueError):
+            table.select("value")
+        table.close()
@@ -0,0 +1,135 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import threading
+
+import pytest
+from simplesqlite import DatabaseError, PoolTimeoutError, SimpleSQLite, SimpleSQLitePool
+
+from .fixture import TEST_TABLE_NAME
+
+
+@pytest.fixture
+def db_path(tmpdir):
+    p = tmpdir.join("tmp_pool.db")
+
+    with SimpleSQLite(str(p), "w") as con:
+        con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a", "attr_b"], [[1, 2], [3, 4]])
+
+    return str(p)
+
+
+class Test_SimpleSQLitePool_init(object):
+    @pytest.mark.parametrize(
+        ["path", "size", "mode", "expected"],
+        [
+            ["tmp.db", 5, "w", ValueError],
+            ["tmp.db", 0, "r", ValueError],
+            [":memory:", 5, "r", ValueError],
+        ],
+    )
+    def test_exception(self, path, size, mode, expected):
+        with pytest.raises(expected):
+            SimpleSQLitePool(path, size=size, mode=mode)
+
+
+class Test_SimpleSQLitePool_acquire(object):
+    def test_normal(self, db_path):
+        pool = SimpleSQLitePool(db_path, size=2)
+
+        con = pool.acquire()
+        assert con.mode == "r"
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+        assert pool.num_checked_out == 1
+
+        pool.release(con)
+        assert pool.num_checked_out == 0
+        assert pool.num_idle == 1
+        assert pool.acquire() is con
+
+    def test_exception_timeout(self, db_path):
+        pool = SimpleSQLitePool(db_path, size=1)
+        pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(timeout=0.05)
+
+    def test_exception_closed(self, db_path):
+        pool = SimpleSQLitePool(db_path)
+        pool.close()
+
+        with pytest.raises(DatabaseError):
+            pool.acquire()
+
+    def test_normal_idle_eviction(self, db_path):
+        pool = SimpleSQLitePool(db_path, max_idle_time=0)
+
+        con = pool.acquire()
+        pool.release(con)
+        new_con = pool.acquire()
+
+        assert new_con is not con
+        assert not con.is_connected()
+
+    def test_normal_health_check(self, db_path):
+        pool = SimpleSQLitePool(db_path)
+
+        con = pool.acquire()
+        pool.release(con)
+        con.connection.close()
+
+        new_con = pool.acquire()
+        assert new_con is not con
+        assert new_con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+
+class Test_SimpleSQLitePool_connection(object):
+    def test_normal_nested(self, db_path):
+        pool = SimpleSQLitePool(db_path, size=1)
+
+        with pool.connection() as con:
+            with pool.connection() as nested_con:
+                assert nested_con is con
+            assert pool.num_checked_out == 1
+
+        assert pool.num_checked_out == 0
+
+    def test_normal_threads(self, db_path):
+        pool = SimpleSQLitePool(db_path, size=3)
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                with pool.connection() as con:
+                    num_records = con.fetch_num_records(TEST_TABLE_NAME)
+                with lock:
+                    results.append(num_records)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [2] * 160
+        assert pool.num_checked_out == 0
+        assert pool.num_idle <= 3
+
+    def test_normal_schema_cache(self, db_path):
+        pool = SimpleSQLitePool(db_path, size=2)
+
+        with pool.connection() as con:
+            assert con.fetch_table_names() == [TEST_TABLE_NAME]
+
+        with SimpleSQLite(db_path, "a") as writer:
+            writer.create_table_from_data_matrix("new_table", ["attr"], [[1]])
+
+        with pool.connection() as con:
+            assert set(con.fetch_table_names()) == set([TEST_TABLE_NAME, "new_table"])
+            assert con.fetch_attr_names("new_table") == ["attr"]
@@ -22,6 +22,7 @@ from simplesqlite.query import (
     Or,
     Select,
     Table,
+    Upsert,
     Value,
     Where,
     make_index_name,
@@ -156,6 +157,13 @@ class Test_Attr(object):
     def test_normal_reserved(self, value, expected):
         assert_query_item(Attr(value), expected)
 
+    def test_normal_repeat(self):
+        # rendered names are cached by (name, operation) pairs
+        for _ in range(2):
+            assert_query_item(Attr("te st"), "[te st]")
+            assert_query_item(Attr("te st", "SUM"), "SUM([te st])")
+            assert_query_item(Attr("where"), '"where"')
+
     @pytest.mark.parametrize(
         ["value", "expected"], [[None, TypeError], [1, TypeError], [False, TypeError]]
     )
@@ -392,6 +400,61 @@ class Test_Insert(object):
             Insert(table, attrs)
 
 
+class Test_Insert_conflict_resolution(object):
+    @pytest.mark.parametrize(
+        ["conflict_resolution", "expected"],
+        [
+            [None, "INSERT INTO A(B,C) VALUES (?,?)"],
+            ["ignore", "INSERT OR IGNORE INTO A(B,C) VALUES (?,?)"],
+            ["REPLACE", "INSERT OR REPLACE INTO A(B,C) VALUES (?,?)"],
+        ],
+    )
+    def test_normal(self, conflict_resolution, expected):
+        assert_query_item(
+            Insert("A", AttrList(["B", "C"]), conflict_resolution=conflict_resolution), expected
+        )
+
+    def test_exception(self):
+        with pytest.raises(SqlSyntaxError):
+            Insert("A", AttrList(["B"]), conflict_resolution="UPDATE")
+
+
+class Test_Upsert(object):
+    @pytest.mark.parametrize(
+        ["attrs", "conflict_target", "update_attrs", "expected"],
+        [
+            [
+                ["B", "C", "D"],
+                ["B"],
+                ["C", "D"],
+                "INSERT INTO A(B,C,D) VALUES (?,?,?) "
+                "ON CONFLICT(B) DO UPDATE SET C=excluded.C,D=excluded.D",
+            ],
+            [
+                ["B", "C", "a+b"],
+                ["B", "C"],
+                ["a+b"],
+                "INSERT INTO A(B,C,[a+b]) VALUES (?,?,?) "
+                "ON CONFLICT(B,C) DO UPDATE SET [a+b]=excluded.[a+b]",
+            ],
+            [["B", "C"], ["B"], [], "INSERT INTO A(B,C) VALUES (?,?) ON CONFLICT(B) DO NOTHING"],
+        ],
+    )
+    def test_normal(self, attrs, conflict_target, update_attrs, expected):
+        assert_query_item(
+            Upsert("A", AttrList(attrs), AttrList(conflict_target), AttrList(update_attrs)),
+            expected,
+        )
+
+    @pytest.mark.parametrize(
+        ["conflict_target", "update_attrs", "expected"],
+        [[AttrList([]), AttrList(["C"]), ValueError], [["B"], AttrList(["C"]), TypeError]],
+    )
+    def test_exception(self, conflict_target, update_attrs, expected):
+        with pytest.raises(expected):
+            Upsert("A", AttrList(["B", "C"]), conflict_target, update_attrs)
+
+
 class Test_make_index_name(object):
     SANITIZE_CHAR_LIST = [
         ":",
@@ -0,0 +1,162 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pytest
+from simplesqlite import AttributeNotFoundError, ShardedSimpleSQLite
+from simplesqlite.shard import default_hash
+from tabledata import TableData
+
+from .fixture import TEST_TABLE_NAME
+
+
+def mod_hash(value):
+    return value
+
+
+@pytest.fixture
+def shard_paths(tmpdir):
+    return [str(tmpdir.join("tmp_shard{:d}.db".format(i))) for i in range(3)]
+
+
+@pytest.fixture
+def con_shard(shard_paths):
+    con = ShardedSimpleSQLite(shard_paths, "attr_a", hash_fn=mod_hash)
+    con.create_table(TEST_TABLE_NAME, ["attr_a INTEGER", "attr_b TEXT"])
+    con.insert_many(TEST_TABLE_NAME, [[i, "value{:d}".format(i)] for i in range(30)])
+    con.commit()
+
+    yield con
+
+    con.close()
+
+
+class Test_default_hash(object):
+    @pytest.mark.parametrize(
+        ["value", "expected"],
+        [[3, 3], [-3, 3], [3.0, 3], ["a", 3904355907], [b"a", 3904355907], [None, 3751981041]],
+    )
+    def test_normal(self, value, expected):
+        assert default_hash(value) == expected
+
+
+class Test_ShardedSimpleSQLite_init(object):
+    @pytest.mark.parametrize(
+        ["paths", "shard_key", "expected"],
+        [
+            [[], "attr_a", ValueError],
+            [["a.db", "a.db"], "attr_a", ValueError],
+            [["a.db"], "", ValueError],
+        ],
+    )
+    def test_exception(self, paths, shard_key, expected):
+        with pytest.raises(expected):
+            ShardedSimpleSQLite(paths, shard_key)
+
+
+class Test_ShardedSimpleSQLite_insert_many(object):
+    def test_normal(self, con_shard):
+        for i, shard in enumerate(con_shard.shards):
+            assert shard.fetch_num_records(TEST_TABLE_NAME) == 10
+            assert [
+                attr_a for attr_a, in shard.select("attr_a", TEST_TABLE_NAME).fetchall()
+            ] == list(range(i, 30, 3))
+
+    def test_normal_dict(self, con_shard):
+        assert (
+            con_shard.insert_many(
+                TEST_TABLE_NAME, [{"attr_a": 31, "attr_b": "a"}, {"attr_a": 32, "attr_b": "b"}]
+            )
+            == 2
+        )
+        con_shard.commit()
+
+        assert con_shard.shards[1].fetch_num_records(TEST_TABLE_NAME) == 11
+        assert con_shard.shards[2].fetch_num_records(TEST_TABLE_NAME) == 11
+
+    def test_normal_affinity(self, shard_paths):
+        with ShardedSimpleSQLite(shard_paths, "key") as con:
+            con.create_table("int_key", ["key INTEGER", "value TEXT"])
+            con.create_table("text_key", ["key TEXT", "value TEXT"])
+            con.insert_many("int_key", [["1", "a"], [2.0, "b"], ["x", "c"]])
+            con.insert_many("text_key", [[1, "a"], ["2", "b"]])
+            con.commit()
+
+            assert con.fetch_value("value", "int_key", key=1) == "a"
+            assert con.fetch_value("value", "int_key", key="1") == "a"
+            assert con.fetch_value("value", "int_key", key=2) == "b"
+            assert con.fetch_value("value", "int_key", key="x") == "c"
+            assert con.get_shard_index("1", "int_key") == con.get_shard_index(1)
+            assert con.fetch_value("value", "text_key", key="1") == "a"
+            assert con.fetch_value("value", "text_key", key=2) == "b"
+
+    def test_exception(self, con_shard):
+        with pytest.raises(AttributeNotFoundError):
+            con_shard.insert_many(TEST_TABLE_NAME, [["a"]], attr_names=["attr_b"])
+
+
+class Test_ShardedSimpleSQLite_select(object):
+    def test_normal(self, con_shard):
+        assert con_shard.select("attr_b", TEST_TABLE_NAME, key=7).fetchall() == [("value7",)]
+        assert (
+            con_shard.select("attr_b", TEST_TABLE_NAME, key=7, where="attr_b = 'x'").fetchall()
+            == []
+        )
+        assert con_shard.fetch_value("attr_b", TEST_TABLE_NAME, key=8) == "value8"
+
+    def test_normal_select_all(self, con_shard):
+        assert con_shard.select_all("attr_a", TEST_TABLE_NAME, where="attr_a < 6") == [
+            (0,),
+            (3,),
+            (1,),
+            (4,),
+            (2,),
+            (5,),
+        ]
+
+    def test_normal_fetch_num_records(self, con_shard):
+        assert con_shard.fetch_num_records(TEST_TABLE_NAME) == 30
+        assert con_shard.fetch_num_records(TEST_TABLE_NAME, where="attr_a >= 20") == 10
+
+
+class Test_ShardedSimpleSQLite_create_table_from_data_matrix(object):
+    def test_normal(self, shard_paths):
+        with ShardedSimpleSQLite(shard_paths, "attr_a", hash_fn=mod_hash) as con:
+            con.create_table_from_data_matrix(
+                TEST_TABLE_NAME,
+                ["attr_a", "attr_b"],
+                [[1, 1.1], [2, 2.2], [3, 3.3], [4, 4.4]],
+                add_primary_key_column=True,
+                index_attrs=["attr_b"],
+            )
+
+            for shard in con.shards:
+                assert shard.fetch_attr_names(TEST_TABLE_NAME) == ["id", "attr_a", "attr_b"]
+                index_names = [
+                    record["name"]
+                    for record in shard.fetch_sqlite_master()
+                    if record["type"] == "index" and record["tbl_name"] == TEST_TABLE_NAME
+                ]
+                assert len(index_names) == 1
+
+            assert con.select("id, attr_b", TEST_TABLE_NAME, key=4).fetchall() == [(4, 4.4)]
+            assert con.shards[0].fetch_num_records(TEST_TABLE_NAME) == 1
+            assert con.fetch_num_records(TEST_TABLE_NAME) == 4
+
+    def test_normal_tabledata(self, shard_paths):
+        with ShardedSimpleSQLite(shard_paths, "attr_a") as con:
+            con.create_table_from_tabledata(
+                TableData(TEST_TABLE_NAME, ["attr_a", "attr_b"], [["a", 1], ["b", 2]])
+            )
+
+            assert con.fetch_value("attr_b", TEST_TABLE_NAME, key="b") == 2
+            assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+    def test_exception(self, shard_paths):
+        with ShardedSimpleSQLite(shard_paths, "not_exist") as con:
+            with pytest.raises(AttributeNotFoundError):
+                con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1]])
@@ -9,6 +9,9 @@ from __future__ import print_function, unicode_literals
 import datetime
 import itertools
 import json
+import sqlite3
+import threading
+import time
 from collections import OrderedDict, namedtuple
 from decimal import Decimal
 
@@ -117,6 +120,75 @@ class Test_SimpleSQLite_check_connection(object):
             con_null.check_connection()
 
 
+class Test_SimpleSQLite_connect(object):
+    def test_normal_read_only(self, con_ro):
+        assert con_ro.mode == "r"
+        assert con_ro.fetch_num_records(TEST_TABLE_NAME) == 2
+
+        with pytest.raises(OperationalError):
+            con_ro.execute_query("INSERT INTO {} VALUES (5, 6)".format(TEST_TABLE_NAME))
+
+    def test_normal_read_only_py2(self, tmpdir, monkeypatch):
+        # fallback for sqlite3 module that does not support URI filenames
+        monkeypatch.setattr("simplesqlite.core.six.PY2", True)
+
+        p = tmpdir.join("tmp_ro.db")
+        with SimpleSQLite(str(p), "w") as con:
+            con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1], [2]])
+
+        con = SimpleSQLite(str(p), "r")
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+        with pytest.raises(OperationalError):
+            con.execute_query("DELETE FROM {}".format(TEST_TABLE_NAME))
+        with pytest.raises(ValueError):
+            SimpleSQLite(str(p), "r", immutable=True).connection
+
+    def test_normal_immutable(self, tmpdir):
+        p = tmpdir.join("tmp_immutable.db")
+        with SimpleSQLite(str(p), "w") as con:
+            con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1], [2]])
+
+        con = SimpleSQLite(str(p), "r", immutable=True)
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+        assert con.database_path == str(p)
+
+        with pytest.raises(OperationalError):
+            con.execute_query("DELETE FROM {}".format(TEST_TABLE_NAME))
+
+    @pytest.mark.parametrize(["mode"], [["w"], ["a"]])
+    def test_exception_immutable(self, tmpdir, mode):
+        p = tmpdir.join("tmp_immutable.db")
+
+        with pytest.raises(ValueError):
+            SimpleSQLite(str(p), mode, immutable=True).connection
+
+    def test_normal_connect_options(self, tmpdir):
+        p = tmpdir.join("tmp_options.db")
+        con = SimpleSQLite(
+            "file:{}?cache=private".format(p),
+            "w",
+            timeout=0.5,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,
+            cached_statements=16,
+            uri=True,
+        )
+
+        con.execute_query("CREATE TABLE tbl (dt timestamp)")
+        con.execute_query("INSERT INTO tbl VALUES ('2019-01-02 03:04:05')")
+        assert not con.connection.in_transaction
+        assert con.connection.isolation_level is None
+        assert con.fetch_value("dt", "tbl") == datetime.datetime(2019, 1, 2, 3, 4, 5)
+        assert p.check()
+
+    def test_exception_uri(self, tmpdir):
+        p = tmpdir.join("tmp_options.db")
+
+        with pytest.raises(ValueError):
+            SimpleSQLite("file:{}?mode=ro".format(p), "r", uri=True).connection
+
+
 class Test_SimpleSQLite_select(object):
     def test_smoke(self, con):
         result = con.select(select="*", table_name=TEST_TABLE_NAME)
@@ -146,6 +218,35 @@ class Test_SimpleSQLite_select(object):
             con_null.select(select="*", table_name=TEST_TABLE_NAME)
 
 
+class Test_SimpleSQLite_prepare_select(object):
+    def test_normal(self, con):
+        select_by_a = con.prepare_select(TEST_TABLE_NAME, ["attr_b"], "attr_a = ?")
+
+        assert select_by_a.query == 'SELECT "attr_b" FROM test_table WHERE attr_a = ?'
+        assert select_by_a(1).fetchall() == [(2,)]
+        assert select_by_a(3).fetchall() == [(4,)]
+        assert select_by_a(5).fetchall() == []
+
+    def test_normal_named_params(self, con):
+        select_by_a = con.prepare_select(
+            TEST_TABLE_NAME, ["attr_a", "attr_b"], "attr_a >= :min", extra="ORDER BY attr_a"
+        )
+
+        assert select_by_a(min=2).fetchall() == [(3, 4)]
+
+    def test_exception(self, con):
+        with pytest.raises(TableNotFoundError):
+            con.prepare_select("not_exist_table", ["attr_a"])
+
+        select_by_a = con.prepare_select(TEST_TABLE_NAME, ["attr_a"], "attr_a = :value")
+        with pytest.raises(ValueError):
+            select_by_a(1, value=1)
+
+    def test_null(self, con_null):
+        with pytest.raises(NullDatabaseConnectionError):
+            con_null.prepare_select(TEST_TABLE_NAME, ["attr_a"])
+
+
 class Test_SimpleSQLite_select_as_dict(object):
     @pytest.mark.parametrize(
         ["value", "expected"],
@@ -189,6 +290,125 @@ class Test_SimpleSQLite_dump(object):
         )
 
 
+class Test_SimpleSQLite_fetch_page(object):
+    def test_normal(self, con):
+        con.insert_many(TEST_TABLE_NAME, [[i, i % 3] for i in range(5, 12)])
+
+        page = con.fetch_page(TEST_TABLE_NAME, order_by=["attr_b", "attr_a"], page_size=4)
+        assert page.records == [(6, 0), (9, 0), (7, 1), (10, 1)]
+
+        page = con.fetch_page(
+            TEST_TABLE_NAME, order_by=["attr_b", "attr_a"], page_size=4, cursor=page.cursor
+        )
+        assert page.records == [(1, 2), (5, 2), (8, 2), (11, 2)]
+
+        page = con.fetch_page(
+            TEST_TABLE_NAME, order_by=["attr_b", "attr_a"], page_size=4, cursor=page.cursor
+        )
+        assert page.records == [(3, 4)]
+        assert page.cursor is None
+
+    def test_normal_columns_where(self, con):
+        con.insert_many(TEST_TABLE_NAME, [[i, i] for i in range(5, 12)])
+
+        records = [
+            record
+            for page in con.iter_pages(
+                TEST_TABLE_NAME, "attr_a", page_size=2, columns=["attr_b"], where="attr_a > 6"
+            )
+            for record in page.records
+        ]
+        assert records == [(7,), (8,), (9,), (10,), (11,)]
+
+    def test_normal_iter_pages(self, con):
+        pages = list(con.iter_pages(TEST_TABLE_NAME, "attr_a", page_size=2))
+
+        assert len(pages) == 1
+        assert pages[0] == ([(1, 2), (3, 4)], None)
+
+    @pytest.mark.parametrize(
+        ["order_by", "page_size", "cursor", "expected"],
+        [
+            ["attr_a", 0, None, ValueError],
+            ["attr_a", 1, "invalid", ValueError],
+            ["attr_b", 1, "from_attr_a", ValueError],
+        ],
+    )
+    def test_exception(self, con, order_by, page_size, cursor, expected):
+        if cursor == "from_attr_a":
+            cursor = con.fetch_page(TEST_TABLE_NAME, "attr_a", page_size=1).cursor
+
+        with pytest.raises(expected):
+            con.fetch_page(TEST_TABLE_NAME, order_by, page_size=page_size, cursor=cursor)
+
+
+class Test_SimpleSQLite_where_in(object):
+    @pytest.mark.parametrize(
+        ["negate", "threshold", "method", "expected"],
+        [
+            [False, 1000, "temp_table", [1, 5, 7]],
+            [False, 2, "temp_table", [1, 5, 7]],
+            [False, 2, "json", [1, 5, 7]],
+            [True, 1000, "temp_table", [3, 9]],
+            [True, 2, "temp_table", [3, 9]],
+            [True, 2, "json", [3, 9]],
+        ],
+    )
+    def test_normal(self, con, negate, threshold, method, expected):
+        con.insert_many(TEST_TABLE_NAME, [[5, 6], [7, 8], [9, 10]])
+        values = [1, 5, 7, 7, "a'b", 100]
+
+        with con.where_in(
+            "attr_a", values, negate=negate, threshold=threshold, method=method
+        ) as where:
+            params = None
+            if method == "json":
+                where, params = where
+
+            result = con.select("attr_a", TEST_TABLE_NAME, where=where, params=params)
+            assert [record[0] for record in result.fetchall()] == expected
+
+        assert con.fetch_table_names() == [TEST_TABLE_NAME]
+
+    def test_normal_json_query_size(self, con):
+        queries = set()
+        for num_values in (10, 1000, 10000):
+            values = range(num_values)
+            with con.where_in("attr_a", values, threshold=1, method="json") as (where, params):
+                result = con.select("COUNT(*)", TEST_TABLE_NAME, where=where, params=params)
+                assert result.fetchone() == (2,)
+                queries.add(where)
+
+        assert len(queries) == 1
+
+    def test_normal_read_only(self, con_ro):
+        with con_ro.where_in("attr_a", range(10), threshold=1) as where:
+            assert con_ro.fetch_num_records(TEST_TABLE_NAME, where=where) == 2
+
+    def test_normal_transaction(self, con_ro):
+        with con_ro.where_in("attr_a", range(10), threshold=1) as where:
+            assert con_ro.fetch_num_records(TEST_TABLE_NAME, where=where) == 2
+
+        assert not con_ro.connection.in_transaction
+
+        writer = SimpleSQLite(con_ro.database_path, "a", timeout=0)
+        writer.insert(TEST_TABLE_NAME, [5, 6])
+        writer.commit()
+        writer.close()
+
+        assert con_ro.fetch_num_records(TEST_TABLE_NAME) == 3
+
+    def test_exception(self, con):
+        with pytest.raises(ValueError):
+            with con.where_in("attr_a", [1], method="invalid"):
+                pass
+
+    def test_null(self, con_null):
+        with pytest.raises(NullDatabaseConnectionError):
+            with con_null.where_in("attr_a", [1]):
+                pass
+
+
 class Test_SimpleSQLite_insert(object):
     @pytest.mark.parametrize(
         ["value", "expeted"],
@@ -283,6 +503,224 @@ class Test_SimpleSQLite_insert_many(object):
             con_null.insert_many(TEST_TABLE_NAME, [])
 
 
+class Test_SimpleSQLite_prepare_insert(object):
+    def test_normal(self, con):
+        insert = con.prepare_insert(TEST_TABLE_NAME)
+
+        assert insert.query == 'INSERT INTO test_table("attr_a","attr_b") VALUES (?,?)'
+        assert insert([[5, 6]]) == 1
+        assert insert([{"attr_a": 7, "attr_b": 8}, NamedTuple(9, 10)]) == 2
+        assert insert([]) == 0
+        assert con.select(select="*", table_name=TEST_TABLE_NAME).fetchall() == [
+            (1, 2),
+            (3, 4),
+            (5, 6),
+            (7, 8),
+            (9, 10),
+        ]
+
+    def test_normal_columns(self, con):
+        insert = con.prepare_insert(TEST_TABLE_NAME, ["attr_b"])
+
+        assert insert([{"attr_b": 6}]) == 1
+        assert con.select(
+            select="*", table_name=TEST_TABLE_NAME, where="attr_b = 6"
+        ).fetchall() == [(None, 6)]
+
+    def test_normal_schema(self, con, tmpdir):
+        con.execute_query("ATTACH DATABASE ? AS attached", params=[str(tmpdir.join("attached.db"))])
+        con.execute_query("CREATE TABLE attached.{} (a INTEGER, b TEXT)".format(TEST_TABLE_NAME))
+        insert = con.prepare_insert(TEST_TABLE_NAME, schema_name="attached")
+
+        assert insert.query == "INSERT INTO attached.test_table(a,b) VALUES (?,?)"
+        assert insert([[1, "x"], {"a": 2, "b": "y"}]) == 2
+        assert con.execute_query(
+            "SELECT * FROM attached.{}".format(TEST_TABLE_NAME)
+        ).fetchall() == [(1, "x"), (2, "y")]
+
+        with pytest.raises(TableNotFoundError):
+            con.prepare_insert("not_exist_table", schema_name="attached")
+
+    def test_exception(self, con):
+        with pytest.raises(TableNotFoundError):
+            con.prepare_insert("not_exist_table")
+
+        insert = con.prepare_insert(TEST_TABLE_NAME)
+        con.drop_table(TEST_TABLE_NAME)
+        with pytest.raises(OperationalError):
+            insert([[1, 2]])
+
+    def test_read_only(self, con_ro):
+        with pytest.raises(IOError):
+            con_ro.prepare_insert(TEST_TABLE_NAME)
+
+
+class Test_SimpleSQLite_insert_many_quarantine(object):
+    @pytest.fixture
+    def con_unique(self, con):
+        con.execute_query("CREATE UNIQUE INDEX unique_attr_a ON {}(attr_a)".format(TEST_TABLE_NAME))
+        con.commit()
+
+        return con
+
+    def test_normal_callback(self, con_unique):
+        rejected_list = []
+        records = [[i, i] for i in range(5, 105)] + [[1, 0], [50, 0], [200, 200], [7, 0]]
+
+        num_inserted = con_unique.insert_many(
+            TEST_TABLE_NAME,
+            records,
+            on_error="quarantine",
+            quarantine=lambda record, error: rejected_list.append((record, error)),
+        )
+
+        assert num_inserted == 101
+        assert [record for record, _error in rejected_list] == [[1, 0], [50, 0], [7, 0]]
+        assert all("UNIQUE" in error for _record, error in rejected_list)
+        assert not con_unique.is_in_transaction()
+        assert SimpleSQLite(con_unique.database_path, "r").fetch_num_records(TEST_TABLE_NAME) == 103
+
+    def test_normal_table(self, con_unique):
+        num_inserted = con_unique.insert_many(
+            TEST_TABLE_NAME, [[5, 6], [3, 0]], on_error="quarantine", quarantine="rejected"
+        )
+
+        assert num_inserted == 1
+        assert con_unique.select_as_tabledata("rejected").rows[0][:2] == (
+            TEST_TABLE_NAME,
+            "[3, 0]",
+        )
+
+    @pytest.mark.parametrize(
+        ["on_error", "quarantine", "returning"],
+        [["invalid", None, None], ["quarantine", None, None], ["quarantine", "rejected", ["id"]]],
+    )
+    def test_exception(self, con_unique, on_error, quarantine, returning):
+        with pytest.raises(ValueError):
+            con_unique.insert_many(
+                TEST_TABLE_NAME,
+                [[5, 6]],
+                returning=returning,
+                on_error=on_error,
+                quarantine=quarantine,
+            )
+
+
+class Test_SimpleSQLite_insert_many_returning(object):
+    @pytest.fixture
+    def con_pk(self, tmpdir):
+        con = SimpleSQLite(str(tmpdir.join("tmp_returning.db")), "w")
+        con.create_table_from_data_matrix(
+            TEST_TABLE_NAME, ["attr_a"], [["a"], ["b"]], add_primary_key_column=True
+        )
+
+        return con
+
+    def test_normal(self, con_pk):
+        assert con_pk.insert_many(
+            TEST_TABLE_NAME, [[None, "c"], [None, "d"]], returning=["id", "attr_a"]
+        ) == [(3, "c"), (4, "d")]
+        assert con_pk.insert_many(TEST_TABLE_NAME, [], returning=["id"]) == []
+
+    def test_normal_fallback(self, monkeypatch, con_pk):
+        monkeypatch.setattr("sqlite3.sqlite_version_info", (3, 34, 0))
+
+        assert con_pk.insert_many(
+            TEST_TABLE_NAME, [{"attr_a": "c"}, {"attr_a": "d"}], returning="id"
+        ) == [(3,), (4,)]
+
+        with pytest.raises(ValueError):
+            con_pk.insert_many(TEST_TABLE_NAME, [[None, "e"]], returning=["attr_a"])
+        with pytest.raises(ValueError):
+            con_pk.insert_many(TEST_TABLE_NAME, [[10, "e"]], returning=["id"])
+        with pytest.raises(ValueError):
+            con_pk.update(TEST_TABLE_NAME, set_query="attr_a = 'x'", returning=["id"])
+
+    def test_normal_update_delete(self, con_pk):
+        assert con_pk.update(
+            TEST_TABLE_NAME, set_query="attr_a = 'x'", where="id = 2", returning=["id", "attr_a"]
+        ) == [(2, "x")]
+        assert con_pk.delete(TEST_TABLE_NAME, where="id < 3", returning="id") == [(1,), (2,)]
+        assert con_pk.fetch_num_records(TEST_TABLE_NAME) == 0
+
+    def test_exception(self, con_pk):
+        with pytest.raises(OperationalError):
+            con_pk.insert_many(TEST_TABLE_NAME, [[1, "c"]], returning=["id"])
+
+
+class Test_SimpleSQLite_upsert_many(object):
+    @pytest.fixture
+    def con_unique(self, con):
+        con.execute_query("CREATE UNIQUE INDEX unique_attr_a ON {}(attr_a)".format(TEST_TABLE_NAME))
+
+        return con
+
+    def test_normal(self, con_unique):
+        records = ([i, i * 10] for i in range(1, 6))
+
+        assert con_unique.upsert_many(TEST_TABLE_NAME, records, "attr_a", chunk_size=2) == 5
+        assert con_unique.select(select="*", table_name=TEST_TABLE_NAME).fetchall() == [
+            (1, 10),
+            (3, 30),
+            (2, 20),
+            (4, 40),
+            (5, 50),
+        ]
+
+    def test_normal_do_nothing(self, con_unique):
+        assert (
+            con_unique.upsert_many(
+                TEST_TABLE_NAME,
+                [{"attr_a": 1, "attr_b": 0}, {"attr_a": 5, "attr_b": 6}],
+                ["attr_a"],
+                update_columns=[],
+            )
+            == 1
+        )
+        assert con_unique.fetch_values("attr_b", TEST_TABLE_NAME) == [2, 4, 6]
+
+    def test_normal_fallback(self, monkeypatch, con_unique):
+        monkeypatch.setattr("sqlite3.sqlite_version_info", (3, 23, 0))
+
+        assert con_unique.upsert_many(TEST_TABLE_NAME, [[1, 0], [5, 6]], "attr_a") == 2
+        assert con_unique.fetch_value("attr_b", TEST_TABLE_NAME, where="attr_a = 1") == 0
+        assert con_unique.upsert_many(TEST_TABLE_NAME, [[1, 1]], "attr_a", update_columns=[]) == 0
+
+        con_unique.create_table("partial", ["key INTEGER PRIMARY KEY", "a INTEGER", "b INTEGER"])
+        con_unique.insert("partial", [1, 2, 3])
+        con_unique.upsert_many("partial", [[1, 4, 5]], "key", update_columns=["a"])
+        assert con_unique.select("*", "partial").fetchall() == [(1, 4, 3)]
+
+    def test_exception_fallback_constraint(self, monkeypatch, con_unique):
+        monkeypatch.setattr("sqlite3.sqlite_version_info", (3, 23, 0))
+        con_unique.create_table(
+            "not_null", ["key INTEGER PRIMARY KEY", "a INTEGER NOT NULL", "b INTEGER"]
+        )
+
+        with pytest.raises(OperationalError):
+            con_unique.upsert_many("not_null", [[1, None, 2]], "key")
+        assert con_unique.fetch_num_records("not_null") == 0
+
+    def test_normal_fallback_row_counter(self, monkeypatch, con_unique):
+        monkeypatch.setattr("sqlite3.sqlite_version_info", (3, 23, 0))
+        con_unique.enable_row_counter(TEST_TABLE_NAME)
+
+        con_unique.upsert_many(TEST_TABLE_NAME, [[1, 0], [3, 0], [5, 6]], "attr_a")
+        assert con_unique.fetch_num_records(TEST_TABLE_NAME) == 3
+        assert con_unique.fetch_num_records(TEST_TABLE_NAME, where="1 = 1") == 3
+
+    def test_normal_empty(self, con_unique):
+        assert con_unique.upsert_many(TEST_TABLE_NAME, [], "attr_a") == 0
+
+    def test_exception(self, con, con_ro):
+        # no uniqueness constraint
+        with pytest.raises(OperationalError):
+            con.upsert_many(TEST_TABLE_NAME, [[1, 0]], "attr_a")
+
+        with pytest.raises(IOError):
+            con_ro.upsert_many(TEST_TABLE_NAME, [[1, 0]], "attr_a")
+
+
 class Test_SimpleSQLite_update(object):
     def test_normal(self, con):
         table_name = TEST_TABLE_NAME
@@ -320,6 +758,58 @@ class Test_SimpleSQLite_update(object):
             con_null.update(table_name=TEST_TABLE_NAME, set_query="hoge")
 
 
+class Test_SimpleSQLite_update_many(object):
+    def test_normal(self, con):
+        con.insert_many(TEST_TABLE_NAME, [[i, 0] for i in range(5, 100)])
+
+        num_updated = con.update_many(
+            TEST_TABLE_NAME,
+            [[i, -i] for i in range(0, 100, 2)] + [{"attr_a": 3, "attr_b": -3}],
+            key_columns="attr_a",
+            chunk_size=7,
+        )
+
+        assert num_updated == 48
+        assert con.fetch_value("SUM(attr_b)", TEST_TABLE_NAME, where="attr_b < 0") == -sum(
+            list(range(6, 100, 2)) + [3]
+        )
+        assert not con.is_in_transaction()
+
+    def test_normal_multiple_keys(self, con):
+        con.create_table("multi", ["a INTEGER", "b INTEGER", "c INTEGER"])
+        con.insert_many("multi", [[1, 2, 0], [1, 3, 0]])
+        assert con.update_many("multi", [[1, 3, 10]], key_columns=["a", "b"]) == 1
+        assert con.fetch_values("c", "multi") == [0, 10]
+
+    def test_exception(self, con, con_ro):
+        con.execute_query("CREATE UNIQUE INDEX unique_attr_b ON {}(attr_b)".format(TEST_TABLE_NAME))
+        with pytest.raises(OperationalError):
+            con.update_many(TEST_TABLE_NAME, [[1, 0], [3, 0]], key_columns="attr_a")
+        assert con.fetch_values("attr_b", TEST_TABLE_NAME) == [2, 4]
+
+        with pytest.raises(ValueError):
+            con.update_many(TEST_TABLE_NAME, [[1]], key_columns="attr_a", set_columns=[])
+
+        with pytest.raises(IOError):
+            con_ro.update_many(TEST_TABLE_NAME, [[1, 0]], key_columns="attr_a")
+
+
+class Test_SimpleSQLite_delete_many(object):
+    def test_normal(self, con):
+        con.insert_many(TEST_TABLE_NAME, [[i, i] for i in range(5, 100)])
+
+        assert con.delete_many(TEST_TABLE_NAME, range(0, 100, 2), "attr_a", chunk_size=9) == 47
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 50
+
+    def test_normal_multiple_keys(self, con):
+        assert con.delete_many(TEST_TABLE_NAME, [[1, 2], [3, 0]], ["attr_a", "attr_b"]) == 1
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [3]
+
+    def test_exception(self, con):
+        with pytest.raises(TableNotFoundError):
+            con.delete_many("not_existing", [1], "attr_a")
+
+
 class Test_SimpleSQLite_total_changes(object):
     def test_smoke(self, con):
         assert con.total_changes > 0
@@ -443,6 +933,27 @@ class Test_SimpleSQLite_get_profile(object):
         assert typepy.is_not_empty_sequence(profile_list)
 
 
+class Test_SimpleSQLite_get_statement_cache_profile(object):
+    def test_normal(self, con):
+        assert con.get_statement_cache_profile() is None
+
+    def test_normal_profile(self, tmpdir):
+        p = tmpdir.join("tmp_profile.db")
+        con = SimpleSQLite(str(p), "w", profile=True, cached_statements=2)
+        con.execute_query("CREATE TABLE tbl (a INTEGER)")
+
+        for _ in range(2):
+            for i in range(3):
+                con.execute_query("SELECT {:d} FROM tbl".format(i))
+        con.execute_query("SELECT 2 FROM tbl")
+
+        stats = con.get_statement_cache_profile()
+        assert stats.cached_statements == 2
+        assert stats.hits == 1
+        assert stats.misses == stats.executions - 1
+        assert stats.max_distinct_per_window >= 3
+
+
 class Test_SimpleSQLite_fetch_sqlite_master(object):
     def test_normal(self, con_index):
         expected = [
@@ -1067,6 +1578,342 @@ class Test_SimpleSQLite_create_table_from_json(object):
         assert result_matrix == expected_data_matrix
 
 
+class Test_SimpleSQLite_transaction(object):
+    def test_normal(self, con):
+        other_con = SimpleSQLite(con.database_path, "r")
+
+        with con.transaction(mode="immediate"):
+            assert con.is_in_transaction()
+
+            con.insert(TEST_TABLE_NAME, [5, 6])
+            con.create_table_from_data_matrix("new_table", ["attr"], [[1], [2]])
+            con.commit()  # deferred to the end of the transaction
+
+            assert other_con.fetch_num_records(TEST_TABLE_NAME) == 2
+            assert not other_con.has_table("new_table")
+
+        assert not con.is_in_transaction()
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 3
+        assert other_con.fetch_num_records("new_table") == 2
+
+    def test_normal_rollback(self, con):
+        with pytest.raises(ValueError):
+            with con.transaction():
+                con.insert(TEST_TABLE_NAME, [5, 6])
+                raise ValueError()
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+    def test_normal_savepoint(self, con):
+        with con.transaction():
+            con.insert(TEST_TABLE_NAME, [5, 6])
+
+            with pytest.raises(ValueError):
+                with con.transaction():
+                    con.insert(TEST_TABLE_NAME, [7, 8])
+                    raise ValueError()
+
+            with con.transaction():
+                con.insert(TEST_TABLE_NAME, [9, 10])
+
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3, 5, 9]
+
+    def test_normal_implicit_transaction(self, con):
+        con.insert(TEST_TABLE_NAME, [5, 6])  # not committed
+
+        with con.transaction():
+            con.insert(TEST_TABLE_NAME, [7, 8])
+
+        with pytest.raises(ValueError):
+            with con.transaction():
+                con.insert(TEST_TABLE_NAME, [9, 10])
+                raise ValueError()
+
+        assert con.connection.in_transaction
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3, 5, 7]
+
+        con.rollback()
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3]
+
+    def test_exception(self, con):
+        with pytest.raises(ValueError):
+            with con.transaction(mode="invalid"):
+                pass
+
+    def test_null(self, con_null):
+        with pytest.raises(NullDatabaseConnectionError):
+            with con_null.transaction():
+                pass
+
+
+class Test_SimpleSQLite_enable_row_counter(object):
+    def test_normal(self, con):
+        con.enable_row_counter(TEST_TABLE_NAME)
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+        con.insert_many(TEST_TABLE_NAME, [[5, 6], [7, 8], [9, 10]])
+        con.delete(TEST_TABLE_NAME, where="attr_a = 1")
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 4
+        assert con.fetch_num_records(TEST_TABLE_NAME, where="attr_a > 3") == 3
+
+        con.delete(TEST_TABLE_NAME)
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 0
+        assert con.fetch_table_names() == [TEST_TABLE_NAME]
+
+    def test_normal_disable(self, con):
+        con.enable_row_counter(TEST_TABLE_NAME)
+        con.disable_row_counter(TEST_TABLE_NAME)
+        con.insert(TEST_TABLE_NAME, [5, 6])
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 3
+
+    def test_normal_drop_table(self, con):
+        con.enable_row_counter(TEST_TABLE_NAME)
+        con.drop_table(TEST_TABLE_NAME)
+        con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1]])
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 1
+
+    def test_normal_disable_trigger(self, con):
+        con.enable_row_counter(TEST_TABLE_NAME)
+        con.disable_row_counter(TEST_TABLE_NAME)
+
+        assert con.execute_query(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'"
+        ).fetchone() == (0,)
+
+    def test_normal_reopen_write_mode(self, con):
+        database_path = con.database_path
+        con.enable_row_counter(TEST_TABLE_NAME)
+        con.close()
+
+        con = SimpleSQLite(database_path, "w")
+        assert "simplesqlite_row_counter" not in con.fetch_table_names(include_system_table=True)
+
+        con.create_table_from_data_matrix(TEST_TABLE_NAME, ["attr_a"], [[1]])
+        con.enable_row_counter(TEST_TABLE_NAME)
+        con.insert(TEST_TABLE_NAME, [2])
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+    def test_exception(self, con, con_ro):
+        with pytest.raises(TableNotFoundError):
+            con.enable_row_counter("not_existing")
+
+        with pytest.raises(IOError):
+            con_ro.enable_row_counter(TEST_TABLE_NAME)
+
+
+class Test_SimpleSQLite_fetch_num_records(object):
+    def test_normal_estimate(self, con):
+        con.insert_many(TEST_TABLE_NAME, [[i, i] for i in range(100)])
+        con.execute_query("ANALYZE")
+        con.commit()
+        con.insert(TEST_TABLE_NAME, [1, 1])
+
+        assert con.fetch_num_records(TEST_TABLE_NAME, estimate=True) == 102
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 103
+
+    def test_normal_estimate_without_stat(self, con):
+        assert con.fetch_num_records(TEST_TABLE_NAME, estimate=True) == 2
+        assert con.fetch_num_records("not_existing", estimate=True) is None
+
+    def test_null(self, con_null):
+        with pytest.raises(NullDatabaseConnectionError):
+            con_null.fetch_num_records(TEST_TABLE_NAME)
+
+
+class Test_SimpleSQLite_set_autocommit_policy(object):
+    def test_normal_max_rows(self, con):
+        other_con = SimpleSQLite(con.database_path, "r")
+        con.set_autocommit_policy(max_rows=3)
+
+        con.insert_many(TEST_TABLE_NAME, [[5, 6], [7, 8]])
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+        con.insert(TEST_TABLE_NAME, [9, 10])
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 5
+
+    def test_normal_max_interval(self, con):
+        other_con = SimpleSQLite(con.database_path, "r")
+        con.set_autocommit_policy(max_interval=0)
+
+        con.insert(TEST_TABLE_NAME, [5, 6])
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 3
+
+    def test_normal_transaction(self, con):
+        other_con = SimpleSQLite(con.database_path, "r")
+        con.set_autocommit_policy(max_rows=1)
+
+        with con.transaction():
+            con.insert(TEST_TABLE_NAME, [5, 6])
+            assert other_con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 3
+
+
+class Test_SimpleSQLite_set_retry_policy(object):
+    def test_normal(self, con):
+        con.commit()
+        other_con = SimpleSQLite(con.database_path, "a", timeout=0)
+        other_con.set_retry_policy(max_attempts=100, initial_backoff=0.01, max_backoff=0.02)
+
+        locked = threading.Event()
+
+        def hold_lock():
+            lock_con = sqlite3.connect(con.database_path)
+            lock_con.execute("BEGIN IMMEDIATE")
+            locked.set()
+            time.sleep(0.1)
+            lock_con.rollback()
+            lock_con.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+
+        other_con.insert(TEST_TABLE_NAME, [7, 8])
+        other_con.commit()
+        thread.join()
+
+        stats = other_con.retry_stats
+        assert stats.num_lock_errors >= 1
+        assert stats.num_retries == stats.num_lock_errors
+        assert stats.num_failures == 0
+        assert stats.backoff_time > 0
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 3
+
+    @pytest.mark.parametrize(["max_attempts"], [[None], [1], [3]])
+    def test_exception_locked(self, con, max_attempts):
+        con.commit()
+        other_con = SimpleSQLite(con.database_path, "a", timeout=0)
+        other_con.set_retry_policy(max_attempts=max_attempts, initial_backoff=0, jitter=False)
+
+        with con.transaction("immediate"):
+            with pytest.raises(OperationalError):
+                other_con.insert(TEST_TABLE_NAME, [7, 8])
+
+        expected_attempts = max_attempts or 1
+        stats = other_con.retry_stats
+        assert stats.num_lock_errors == expected_attempts
+        assert stats.num_retries == expected_attempts - 1
+        assert stats.num_failures == 1
+
+    def test_exception_in_transaction(self, con):
+        con.commit()
+        other_con = SimpleSQLite(con.database_path, "a", timeout=0)
+        other_con.set_retry_policy(max_attempts=3, initial_backoff=0, jitter=False)
+
+        with con.transaction("immediate"):
+            with pytest.raises(OperationalError):
+                with other_con.transaction():
+                    other_con.fetch_num_records(TEST_TABLE_NAME)
+                    other_con.insert(TEST_TABLE_NAME, [7, 8])
+
+        stats = other_con.retry_stats
+        assert stats.num_lock_errors == 1
+        assert stats.num_retries == 0
+        assert stats.num_failures == 1
+        assert other_con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+    def test_exception_not_retried(self, con):
+        con.set_retry_policy(max_attempts=3)
+
+        with pytest.raises(OperationalError):
+            con.execute_query("SELECT * FROM not_exist_table")
+
+        assert con.retry_stats.num_lock_errors == 0
+
+    @pytest.mark.parametrize(
+        ["kwargs"],
+        [
+            [{"max_attempts": 0}],
+            [{"max_attempts": 3, "initial_backoff": -1}],
+            [{"max_attempts": 3, "backoff_multiplier": 0.5}],
+        ],
+    )
+    def test_exception_invalid(self, con, kwargs):
+        with pytest.raises(ValueError):
+            con.set_retry_policy(**kwargs)
+
+
+class Test_SimpleSQLite_enable_result_cache(object):
+    def test_normal(self, con):
+        con.commit()
+        con.enable_result_cache(maxsize=10)
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+        assert con.select_as_dict(TEST_TABLE_NAME) == con.select_as_dict(TEST_TABLE_NAME)
+        assert con.result_cache_info == (2, 2, 10, 2)
+
+        con.insert(TEST_TABLE_NAME, [5, 6])
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 3
+        assert con.result_cache_info.currsize == 1
+
+        con.disable_result_cache()
+        assert con.result_cache_info is None
+
+    def test_normal_external_changes(self, con):
+        con.commit()
+        other_con = SimpleSQLite(con.database_path, "a")
+        con.enable_result_cache()
+
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3]
+
+        other_con.insert(TEST_TABLE_NAME, [5, 6])
+        other_con.commit()
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3, 5]
+
+    def test_normal_rollback(self, con):
+        con.commit()
+        con.enable_result_cache(detect_external_changes=False)
+
+        with con.transaction():
+            con.insert(TEST_TABLE_NAME, [5, 6])
+            assert con.fetch_num_records(TEST_TABLE_NAME) == 3
+            con.rollback()
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2
+
+    def test_normal_schema_change(self, con):
+        con.enable_result_cache()
+
+        assert con.fetch_value("COUNT(*)", "new_table") is None
+        con.create_table("new_table", ["attr INTEGER"])
+        assert con.fetch_value("COUNT(*)", "new_table") == 0
+
+    def test_normal_maxsize(self, con):
+        con.enable_result_cache(maxsize=1)
+
+        con.fetch_value("attr_b", TEST_TABLE_NAME, where="attr_a = 1")
+        con.fetch_value("attr_b", TEST_TABLE_NAME, where="attr_a = 3")
+        con.fetch_value("attr_b", TEST_TABLE_NAME, where="attr_a = 1")
+
+        assert con.result_cache_info == (0, 3, 1, 1)
+
+    def test_normal_ttl(self, con):
+        con.enable_result_cache(ttl=0)
+
+        con.fetch_num_records(TEST_TABLE_NAME)
+        time.sleep(0.01)
+        con.fetch_num_records(TEST_TABLE_NAME)
+
+        assert con.result_cache_info.hits == 0
+
+    def test_normal_copy(self, con):
+        con.enable_result_cache()
+
+        con.fetch_values("attr_a", TEST_TABLE_NAME).append(100)
+        con.select_as_dict(TEST_TABLE_NAME)[0]["attr_a"] = 100
+
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3]
+        assert con.select_as_dict(TEST_TABLE_NAME)[0]["attr_a"] == 1
+
+    def test_exception(self, con):
+        with pytest.raises(ValueError):
+            con.enable_result_cache(maxsize=0)
+
+
 class Test_SimpleSQLite_rollback(object):
     def test_normal(self, con):
         con.rollback()
@@ -299,3 +299,12 @@ class Test_validate_sqlite_attr_name(object):
     def test_exception_reserved_invalid_name(self, value, expected):
         with pytest.raises(expected):
             validate_sqlite_attr_name(value)
+
+    @pytest.mark.parametrize(
+        ["value", "expected"], [["where", InvalidReservedNameError], ["if", ValidReservedNameError]]
+    )
+    def test_exception_repeat(self, value, expected):
+        # validation results are cached
+        for _ in range(2):
+            with pytest.raises(expected):
+                validate_sqlite_attr_name(value)
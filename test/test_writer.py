@@ -0,0 +1,142 @@
+# encoding: utf-8
+
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import threading
+
+import pytest
+from simplesqlite import (
+    DatabaseError,
+    OperationalError,
+    SimpleSQLite,
+    TableNotFoundError,
+    WriterService,
+    connect_memdb,
+)
+
+from .fixture import TEST_TABLE_NAME, con, con_ro  # noqa: W0611
+
+
+class Test_WriterService_init(object):
+    def test_exception_memdb(self):
+        with pytest.raises(ValueError):
+            WriterService(connect_memdb())
+
+    def test_exception_read_only(self, con_ro):
+        with pytest.raises(IOError):
+            WriterService(con_ro)
+
+
+class Test_WriterService_submit(object):
+    def test_normal(self, con):
+        with WriterService(con, max_batch=10, max_latency=0.01) as writer:
+            insert_future = writer.submit_insert(TEST_TABLE_NAME, [[5, 6], [7, 8]])
+            update_future = writer.submit_update(
+                TEST_TABLE_NAME, set_query="attr_b = 0", where="attr_a > 4"
+            )
+            delete_future = writer.submit_delete(TEST_TABLE_NAME, where="attr_a = 1")
+
+            assert insert_future.result() == 2
+            assert update_future.result() == 2
+            assert delete_future.result() == 1
+
+        assert con.select_as_tabledata(TEST_TABLE_NAME).rows == [(3, 4), (5, 0), (7, 0)]
+
+    def test_normal_concurrent_producers(self, con):
+        num_threads = 8
+        num_records = 50
+
+        with WriterService(con, max_batch=100, max_latency=0.05) as writer:
+
+            def produce(thread_id):
+                futures = [
+                    writer.submit_insert(TEST_TABLE_NAME, [[thread_id, i]])
+                    for i in range(num_records)
+                ]
+                for future in futures:
+                    assert future.result() == 1
+
+            threads = [
+                threading.Thread(target=produce, args=(thread_id,))
+                for thread_id in range(100, 100 + num_threads)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            stats = writer.stats
+
+        assert con.fetch_num_records(TEST_TABLE_NAME) == 2 + num_threads * num_records
+        assert stats.num_operations == num_threads * num_records
+        assert stats.num_batches < stats.num_operations
+        assert stats.num_failed_operations == 0
+
+    def test_normal_failed_operation(self, con):
+        con.execute_query("CREATE UNIQUE INDEX unique_attr_a ON {}(attr_a)".format(TEST_TABLE_NAME))
+        con.commit()
+
+        with WriterService(con, max_latency=0.1) as writer:
+            ok_future = writer.submit_insert(TEST_TABLE_NAME, [[10, 10]])
+            dup_future = writer.submit_insert(TEST_TABLE_NAME, [[20, 20], [1, 1]])
+            not_found_future = writer.submit_insert("not_existing", [[1, 1]])
+
+            assert ok_future.result() == 1
+            with pytest.raises(OperationalError):
+                dup_future.result()
+            with pytest.raises(TableNotFoundError):
+                not_found_future.result()
+
+            assert writer.stats.num_failed_operations == 2
+
+        assert con.fetch_values("attr_a", TEST_TABLE_NAME) == [1, 3, 10]
+
+    def test_exception_stopped(self, con):
+        writer = WriterService(con)
+        writer.stop()
+
+        with pytest.raises(DatabaseError):
+            writer.submit_insert(TEST_TABLE_NAME, [[5, 6]])
+
+    def test_exception_stop_while_submitting(self, con):
+        futures = []
+
+        for _ in range(5):
+            writer = WriterService(con, max_latency=0.001)
+
+            def produce():
+                for _ in range(100):
+                    try:
+                        futures.append(writer.submit_insert(TEST_TABLE_NAME, [[5, 6]]))
+                    except DatabaseError:
+                        return
+
+            threads = [threading.Thread(target=produce) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            writer.stop()
+            for thread in threads:
+                thread.join()
+
+        for future in futures:
+            assert future.result(timeout=5) == 1
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_exception_writer_thread_died(self, con):
+        writer = WriterService(con, max_latency=0.1)
+
+        def exit_thread(_con):
+            raise SystemExit()
+
+        exit_future = writer.submit(exit_thread)
+        writer.submit_insert(TEST_TABLE_NAME, [[5, 6]])
+        writer.stop()
+
+        with pytest.raises(DatabaseError):
+            exit_future.result(timeout=5)
+        with pytest.raises(DatabaseError):
+            writer.submit_insert(TEST_TABLE_NAME, [[7, 8]])